@@ -185,6 +185,8 @@ class ArgHandler:
         self.removes = parser.removes
         self.username = parser.username
         self.password = parser.password
+        self.snapshot = parser.snapshot
+        self.in_memory = parser.in_memory
 
         self.open = self.__handle_open_option(parser.open, parser.create)
         self.sanitize_args(parser.imports, parser.exports)
@@ -473,6 +475,7 @@ class ArgHandler:
 
         self.__open_action()
         self.__import_action()
+        self.__snapshot_action()
 
         for action, op_string in self.actions:
             print(_("Performing action: %s.") % action, file=sys.stderr)
@@ -557,13 +560,32 @@ class ArgHandler:
 
             # we load this file for use
             try:
-                self.smgr.open_activate(self.open, self.username, self.password)
+                self.smgr.open_activate(
+                    self.open, self.username, self.password, self.in_memory
+                )
                 print(_("Opened successfully!"), file=sys.stderr)
             except:
                 print(_("Error opening the file."), file=sys.stderr)
                 print(_("Exiting..."), file=sys.stderr)
                 sys.exit(1)
 
+    def __snapshot_action(self):
+        """
+        Replace the open family tree by a read-only copy of it in memory, if
+        a snapshot was asked for, and close the tree.
+        """
+        if self.snapshot and self.dbstate.is_open():
+            database = self.dbstate.db
+            try:
+                snapshot = database.snapshot(callback=self.user.callback)
+            except NotImplementedError:
+                print(_("The database backend cannot take snapshots."), file=sys.stderr)
+                print(_("Exiting..."), file=sys.stderr)
+                sys.exit(1)
+            self.user.end_progress()
+            self.dbstate.change_database(snapshot)
+            print(_("Took a snapshot of the Family Tree."), file=sys.stderr)
+
     def check_db(self, dbpath, force_unlock=False):
         """
         Test a given family tree path if it can be opened.
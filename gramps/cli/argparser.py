@@ -92,6 +92,8 @@ Application options
   -c, --config=[config.setting[:value]]  Set config setting(s) and start Gramps
   -y, --yes                              Don't ask to confirm dangerous actions (non-GUI mode only)
   -q, --quiet                            Suppress progress indication output (non-GUI mode only)
+  --snapshot                             Run actions on an in-memory snapshot of the Family Tree (non-GUI mode only)
+  --in-memory                            Open a read-only copy of the Family Tree in memory
   -v, --version                          Show versions
   -S, --safe                             Start Gramps in 'Safe mode'
                                           (temporarily use default settings)
@@ -182,6 +184,8 @@ class ArgParser:
     -c, --config=SETTINGS           Set config setting(s) and start Gramps
     -y, --yes                       Don't ask to confirm dangerous actions
     -q, --quiet                     Suppress progress indication output
+    --snapshot                      Run actions on a snapshot of the Family Tree
+    --in-memory                     Open a read-only copy of the Family Tree
     -v, --version                   Show versions
     -h, --help                      Display the help
     --usage                         Display usage information
@@ -214,6 +218,14 @@ class ArgParser:
 
     If the -q option is given, extra noise on sys.stderr, such as progress
     indicators, is suppressed.
+
+    If the --snapshot option is given, the Family Tree is copied to memory
+    when it is opened, and the actions and exports read the copy, so that
+    they see the tree as it was then and do not hold it open.
+
+    If the --in-memory option is given, the Family Tree is opened read-only
+    and copied to memory, which makes reports and exports of large trees
+    faster.
     """
 
     def __init__(self, args):
@@ -241,6 +253,8 @@ class ArgParser:
         self.create = None
         self.quiet = False
         self.auto_accept = False
+        self.snapshot = False
+        self.in_memory = False
 
         self.errors = []
         self.parse_args()
@@ -417,6 +431,10 @@ class ArgParser:
                 self.auto_accept = True
             elif option in ["-q", "--quiet"]:
                 self.quiet = True
+            elif option in ["--snapshot"]:
+                self.snapshot = True
+            elif option in ["--in-memory"]:
+                self.in_memory = True
             elif option in ["-S", "--safe"]:
                 cleandbg += [opt_ix]
             elif option in ["-D", "--default"]:
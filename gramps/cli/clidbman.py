@@ -39,6 +39,7 @@ from urllib.parse import urlparse
 from urllib.request import urlopen, url2pathname
 import tempfile
 import logging
+from concurrent.futures import ThreadPoolExecutor
 
 # -------------------------------------------------------------------------
 #
@@ -48,7 +49,12 @@ import logging
 from gramps.gen.plug import BasePluginManager
 from gramps.gen.config import config
 from gramps.gen.constfunc import win
-from gramps.gen.db.dbconst import DBLOGNAME, DBBACKEND
+from gramps.gen.db.dbconst import DBLOGNAME, DBBACKEND, DBMODE_R
+from gramps.gen.db.exceptions import (
+    DbConnectionError,
+    DbSupportedError,
+    DbVersionError,
+)
 from gramps.gen.db.utils import make_database, get_dbid_from_path
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 
@@ -162,16 +168,20 @@ class CLIDbManager:
         _("Schema version")
         """
         dbid = get_dbid_from_path(dirpath)
-        if not self.is_locked(dirpath):
-            try:
-                database = make_database(dbid)
-                database.load(dirpath, None, update=False)
-                retval = database.get_summary()
-                database.close(update=False)
-            except Exception as msg:
-                retval = {_("Unavailable"): str(msg)[:74] + "..."}
-        else:
-            retval = {_("Unavailable"): "locked"}
+        try:
+            database = make_database(dbid)
+            # The stored summary can be read without loading the database,
+            # even while it is in use.
+            retval = database.read_summary(dirpath)
+            if retval is None:
+                if self.is_locked(dirpath):
+                    retval = {_("Unavailable"): "locked"}
+                else:
+                    database.load(dirpath, None, update=False)
+                    retval = database.get_summary()
+                    database.close(update=False)
+        except Exception as msg:
+            retval = {_("Unavailable"): str(msg)[:74] + "..."}
         retval.update(
             {
                 _("Family Tree"): name,
@@ -195,40 +205,24 @@ class CLIDbManager:
         Prints a detailed list of the known family trees.
         """
         print(_("Gramps Family Trees:"))
-        for item in self.current_names:
-            (
-                name,
-                dirpath,
-                path_name,
-                last,
-                tval,
-                enable,
-                stock_id,
-                backend_type,
-            ) = item
-            if database_names is None or any(
-                [
-                    (re.match("^" + dbname + "$", name) or dbname == name)
-                    for dbname in database_names
-                ]
-            ):
-                summary = self.get_dbdir_summary(dirpath, name)
-                print(_('Family Tree "%s":') % summary[_("Family Tree")])
-                for item in sorted(summary):
-                    if item != "Family Tree":
-                        # Translators: needed for French, ignore otherwise
-                        print(
-                            "   "
-                            + _("%(str1)s: %(str2)s")
-                            % {"str1": item, "str2": summary[item]}
-                        )
+        for summary in self.family_tree_summary(database_names):
+            print(_('Family Tree "%s":') % summary[_("Family Tree")])
+            for item in sorted(summary):
+                if item != "Family Tree":
+                    # Translators: needed for French, ignore otherwise
+                    print(
+                        "   "
+                        + _("%(str1)s: %(str2)s")
+                        % {"str1": item, "str2": summary[item]}
+                    )
 
     def family_tree_summary(self, database_names=None):
         """
         Return a list of dictionaries of the known family trees.
+
+        The family trees are read in parallel.
         """
-        # make the default directory if it does not exist
-        summary_list = []
+        trees = []
         for item in self.current_names:
             (
                 name,
@@ -246,9 +240,9 @@ class CLIDbManager:
                     for dbname in database_names
                 ]
             ):
-                retval = self.get_dbdir_summary(dirpath, name)
-                summary_list.append(retval)
-        return summary_list
+                trees.append((dirpath, name))
+        with ThreadPoolExecutor() as executor:
+            return list(executor.map(lambda tree: self.get_dbdir_summary(*tree), trees))
 
     def _populate_cli(self):
         """
@@ -493,6 +487,58 @@ class CLIDbManager:
             return None, None
         return old_text, new_text
 
+    def copy_database(self, dbpath, title=None, user=None):
+        """
+        Copy the database in dbpath to a new family tree, without closing
+        it if it is open.
+
+        :param dbpath: directory of the database to copy.
+        :param title: name of the new family tree, or None for a name based
+                      on that of the database.
+        :param user: a :class:`.cli.user.User` or :class:`.gui.user.User`
+                     instance for showing the progress, or None.
+        :returns: A tuple of (new_path, name) for the new database
+                  or (None, None) if it could not be copied.
+        """
+        if title is None:
+            name_list = [name[0] for name in self.current_names]
+            name = os.path.basename(dbpath)
+            for data in self.current_names:
+                if data[1] == dbpath:
+                    name = data[0]
+            title = _("%s (copy)") % name
+            i = 2
+            while title in name_list:
+                title = _("%(name)s (copy %(number)d)") % {"name": name, "number": i}
+                i += 1
+
+        dbid = get_dbid_from_path(dbpath)
+        new_path, title = self.create_new_db_cli(title, dbid=dbid)
+        callback = user.callback if user else None
+        try:
+            dbase = make_database(dbid)
+            dbase.load(dbpath, mode=DBMODE_R, update=False)
+            try:
+                dbase.snapshot(new_path, callback)
+            finally:
+                dbase.close(update=False)
+        except (
+            NotImplementedError,
+            OSError,
+            DbConnectionError,
+            DbSupportedError,
+            DbVersionError,
+        ) as msg:
+            self.current_names.pop()
+            for filename in os.listdir(new_path):
+                os.unlink(os.path.join(new_path, filename))
+            os.rmdir(new_path)
+            if isinstance(msg, NotImplementedError):
+                msg = _("The database backend cannot copy family trees.")
+            CLIDbManager.ERROR(_("Could not copy Family Tree"), str(msg))
+            return None, None
+        return new_path, title
+
     def break_lock(self, dbpath):
         """
         Breaks the lock on a database
@@ -123,7 +123,7 @@ class CLIDbLoader:
         """
         pass
 
-    def _pulse_progress(self, value):
+    def _pulse_progress(self, value, text=None):
         """
         Convenience method to allow to show a progress bar if wanted on load
         actions. Inherit if needed
@@ -137,7 +137,7 @@ class CLIDbLoader:
         """
         pass
 
-    def read_file(self, filename, username, password):
+    def read_file(self, filename, username, password, in_memory=False):
         """
         This method takes care of changing database, and loading the data.
         In 3.0 we only allow reading of real databases of filetype
@@ -150,6 +150,9 @@ class CLIDbLoader:
 
         On success, return with the disabled signals. The post-load routine
         should enable signals, as well as finish up with other UI goodies.
+
+        If in_memory is True, a read-only copy of the database in memory is
+        loaded.
         """
 
         if os.path.exists(filename):
@@ -185,6 +188,7 @@ class CLIDbLoader:
                 mode,
                 username=username,
                 password=password,
+                in_memory=in_memory,
             )
         except (
             DbConnectionError,
@@ -234,11 +238,12 @@ class CLIManager:
         self._pmgr = BasePluginManager.get_instance()
         self.user = user
 
-    def open_activate(self, path, username=None, password=None):
+    def open_activate(self, path, username=None, password=None, in_memory=False):
         """
-        Open and make a family tree active
+        Open and make a family tree active, or a read-only copy of it in
+        memory if in_memory is True
         """
-        self._read_recent_file(path, username, password)
+        self._read_recent_file(path, username, password, in_memory)
 
     def _errordialog(self, title, errormessage):
         """
@@ -247,7 +252,9 @@ class CLIManager:
         print(_("ERROR: %s") % errormessage, file=sys.stderr)
         sys.exit(1)
 
-    def _read_recent_file(self, filename, username=None, password=None):
+    def _read_recent_file(
+        self, filename, username=None, password=None, in_memory=False
+    ):
         """
         Called when a file needs to be loaded
         """
@@ -272,7 +279,7 @@ class CLIManager:
             )
             return
 
-        if self.db_loader.read_file(filename, username, password):
+        if self.db_loader.read_file(filename, username, password, in_memory):
             # Attempt to figure out the database title
             path = os.path.join(filename, "name.txt")
             try:
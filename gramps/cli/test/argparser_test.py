@@ -72,6 +72,16 @@ class TestArgParser(unittest.TestCase):
         assert not bad, ap.errors
         assert ap.quiet
 
+    def test_snapshot_longopt_sets_snapshot(self):
+        bad, ap = self.triggers_option_error("--snapshot")
+        assert not bad, ap.errors
+        assert ap.snapshot
+
+    def test_in_memory_longopt_sets_in_memory(self):
+        bad, ap = self.triggers_option_error("--in-memory")
+        assert not bad, ap.errors
+        assert ap.in_memory
+
     def test_quiet_exists_by_default(self):
         ap = self.create_parser()
         assert hasattr(ap, "quiet")
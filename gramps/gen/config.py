@@ -195,6 +195,10 @@ register("csv.dialect", "excel")
 register("csv.delimiter", ",")
 
 register("database.backend", "sqlite")
+register("database.bulk-chunk-size", 1000)
+register("database.cache-size", 16383)
+register("database.changelog-size", 100000)
+register("database.lazy-objects", False)
 register("database.compress-backup", True)
 register("database.backup-path", USER_HOME)
 register("database.backup-on-exit", True)
@@ -202,6 +206,9 @@ register("database.autobackup", 0)
 register("database.path", os.path.join(USER_DATA, "grampsdb"))
 register("database.host", "")
 register("database.port", "")
+register("database.rebuild-processes", 0)
+register("database.undo-window", 1000)
+register("database.wal-mode", False)
 
 register(
     "export.proxy-order",
@@ -320,6 +320,7 @@ LONGOPTS = [
     "g-fatal-warnings",
     "help",
     "import=",
+    "in-memory",
     "load-modules=",
     "list" "name=",
     "oaf-activate-iid=",
@@ -336,6 +337,7 @@ LONGOPTS = [
     "sm-client-id=",
     "sm-config-prefix=",
     "sm-disable",
+    "snapshot",
     "sync",
     "remove=",
     "usage",
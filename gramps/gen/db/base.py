@@ -32,6 +32,7 @@ from this class.
 # -------------------------------------------------------------------------
 import re
 import time
+from heapq import nsmallest
 from operator import itemgetter
 import logging
 
@@ -40,7 +41,7 @@ import logging
 # Gramps libraries
 #
 # -------------------------------------------------------------------------
-from ..db.dbconst import DBLOGNAME
+from ..db.dbconst import DBLOGNAME, ARRAYSIZE, CLASS_TO_KEY_MAP, TXNUPD
 from ..const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.gettext
@@ -48,6 +49,8 @@ from ..lib.childreftype import ChildRefType
 from ..lib.childref import ChildRef
 from .txn import DbTxn
 from .exceptions import DbTransactionCancel, DbException
+from ..errors import HandleError
+from .vitals import VITALS, make_person_vitals
 
 _LOG = logging.getLogger(DBLOGNAME)
 
@@ -124,6 +127,297 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def count_backlinks(self, handle, include_classes=None):
+        """
+        Return the number of objects that hold a reference to the object
+        handle.
+
+        :param handle: handle of the object to search for.
+        :type handle: str database handle
+        :param include_classes: list of class names to include in the count.
+            Default is None which includes all classes.
+        :type include_classes: list of class names
+        """
+        return sum(1 for item in self.find_backlink_handles(handle, include_classes))
+
+    def count_backlinks_many(self, handles, include_classes=None):
+        """
+        Return a dictionary mapping each of the object handles to the number
+        of objects that hold a reference to it.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list of str database handles
+        :param include_classes: list of class names to include in the counts.
+            Default is None which includes all classes.
+        :type include_classes: list of class names
+        """
+        return {
+            handle: self.count_backlinks(handle, include_classes) for handle in handles
+        }
+
+    def get_ancestor_handles(self, handle, max_gen=None, main_family=False):
+        """
+        Return a dictionary mapping the handle of each ancestor of a person
+        to the generation it is first found in: 1 for the parents, 2 for the
+        grandparents and so on.
+
+        :param handle: handle of the person
+        :type handle: str
+        :param max_gen: number of generations to search, or None for all
+        :type max_gen: int
+        :param main_family: if True, follow only the main parent family of
+            each person
+        :type main_family: bool
+        :returns: dictionary of handle -> generation
+        :rtype: dict
+        """
+        return self._get_generations(
+            handle,
+            max_gen,
+            lambda person_handle: self._get_parent_handles(person_handle, main_family),
+        )
+
+    def get_descendant_handles(self, handle, max_gen=None):
+        """
+        Return a dictionary mapping the handle of each descendant of a person
+        to the generation it is first found in: 1 for the children, 2 for
+        the grandchildren and so on.
+
+        :param handle: handle of the person
+        :type handle: str
+        :param max_gen: number of generations to search, or None for all
+        :type max_gen: int
+        :returns: dictionary of handle -> generation
+        :rtype: dict
+        """
+        return self._get_generations(handle, max_gen, self._get_child_handles)
+
+    def get_families_of_parent(self, handle):
+        """
+        Return the handles of the families in which a person is the father
+        or the mother.
+
+        :param handle: handle of the person
+        :type handle: str
+        :returns: list of family handles
+        :rtype: list
+        """
+        return [
+            family.handle
+            for family in self.iter_families()
+            if handle in (family.get_father_handle(), family.get_mother_handle())
+        ]
+
+    def _get_generations(self, handle, max_gen, get_next):
+        """
+        Search the generations of a person breadth first, and return the
+        lowest generation of each person reached.
+        """
+        generations = {}
+        current = [handle]
+        number = 0
+        while current and (max_gen is None or number < max_gen):
+            number += 1
+            following = []
+            for person_handle in current:
+                for next_handle in get_next(person_handle):
+                    if next_handle not in generations:
+                        generations[next_handle] = number
+                        following.append(next_handle)
+            current = following
+        return generations
+
+    def _get_parent_handles(self, handle, main_family=False):
+        """
+        Return the handles of the parents of a person in all of the families
+        they are a child of, or only in their main parent family.
+        """
+        try:
+            person = self.get_person_from_handle(handle)
+        except HandleError:
+            return []
+        if person is None:
+            return []
+        family_handles = person.get_parent_family_handle_list()
+        if main_family:
+            family_handles = family_handles[:1]
+        parents = []
+        for family_handle in family_handles:
+            try:
+                family = self.get_family_from_handle(family_handle)
+            except HandleError:
+                continue
+            if family is None:
+                continue
+            for parent in (family.get_father_handle(), family.get_mother_handle()):
+                if parent:
+                    parents.append(parent)
+        return parents
+
+    def _get_child_handles(self, handle):
+        """
+        Return the handles of the children of a person in all of the families
+        they are a parent of.
+        """
+        try:
+            person = self.get_person_from_handle(handle)
+        except HandleError:
+            return []
+        if person is None:
+            return []
+        children = []
+        for family_handle in person.get_family_handle_list():
+            try:
+                family = self.get_family_from_handle(family_handle)
+            except HandleError:
+                continue
+            if family is None:
+                continue
+            children.extend(ref.ref for ref in family.get_child_ref_list())
+        return children
+
+    def get_person_vitals(self, handle):
+        """
+        Return the :class:`~.vitals.PersonVitals` of a person, or None if
+        there is no such person.
+        """
+        try:
+            person = self.get_person_from_handle(handle)
+        except HandleError:
+            return None
+        if person is None:
+            return None
+        return make_person_vitals(person, self._get_vital_event)
+
+    def _get_vital_event(self, handle):
+        """
+        Return the event with a handle, or None if there is no such event.
+        """
+        try:
+            return self.get_event_from_handle(handle)
+        except HandleError:
+            return None
+
+    def find_person_handles_by_date(self, vital, start=None, stop=None):
+        """
+        Return the handles of the people whose vital event has a date with a
+        sort value between start and stop, inclusive.
+
+        :param vital: one of "birth", "death", "baptism" or "burial"
+        :type vital: str
+        :param start: lowest sort value, or None for no limit
+        :type start: int
+        :param stop: highest sort value, or None for no limit
+        :type stop: int
+        :returns: list of person handles
+        :rtype: list
+        """
+        if vital not in VITALS:
+            raise ValueError("unknown vital event: %s" % vital)
+        handles = []
+        for person in self.iter_people():
+            vitals = make_person_vitals(person, self._get_vital_event)
+            sortval = getattr(vitals, vital + "_sortval")
+            if sortval is None:
+                continue
+            if start is not None and sortval < start:
+                continue
+            if stop is not None and sortval > stop:
+                continue
+            handles.append(person.handle)
+        return handles
+
+    def find_handles_where(self, obj_class, condition, args):
+        """
+        Return the handles of the objects of a class that satisfy an SQL
+        condition on the secondary columns of their table.
+
+        :param obj_class: class name of the objects, such as "Person"
+        :type obj_class: str
+        :param condition: SQL condition, with ? for each argument
+        :type condition: str
+        :param args: arguments of the condition
+        :type args: list
+        :returns: list of handles, or None if the database does not support
+                  SQL queries
+        :rtype: list
+        """
+        return None
+
+    def iter_changed_since(self, timestamp, classes=None):
+        """
+        Return an iterator over the changes made to primary objects at or
+        after a time, in time order.
+
+        Each change is a tuple of the class name of the object, its handle,
+        the kind of change, as TXNADD, TXNUPD or TXNDEL from
+        :mod:`~gramps.gen.db.dbconst`, and the time of the change, in
+        seconds since the epoch.
+
+        The default implementation reads the change time of every object, so
+        it only returns the last change to each object, as TXNUPD, and not
+        the objects that were removed.
+
+        :param timestamp: time of the earliest change to return
+        :type timestamp: int
+        :param classes: class names of the objects to include, or None for
+            all primary objects
+        :type classes: list
+        :returns: iterator over (obj_class, handle, op, time) tuples
+        :rtype: iterator
+        """
+        changes = []
+        for obj_class in classes or CLASS_TO_KEY_MAP:
+            get_object = self.method("get_%s_from_handle", obj_class)
+            for handle in self.method("get_%s_handles", obj_class)():
+                obj = get_object(handle)
+                if obj is not None and obj.change >= timestamp:
+                    changes.append((obj_class, handle, TXNUPD, obj.change))
+        changes.sort(key=itemgetter(3))
+        return iter(changes)
+
+    def search_text(self, query, classes=None, regex=False, case_sensitive=False):
+        """
+        Search the full-text index of the database for objects whose text,
+        as searched by :meth:`~.BaseObject.matches_string`, matches a query.
+
+        The results may include objects that do not match, for example where
+        the query spans two strings of an object, so callers should check
+        each object they use.  They include every object that matches.
+
+        :param query: substring, or regular expression, to search for
+        :type query: str
+        :param classes: class names of the objects to search, or None for all
+        :type classes: list of str
+        :param regex: True if the query is a regular expression
+        :type regex: bool
+        :param case_sensitive: True if the search is case sensitive
+        :type case_sensitive: bool
+        :returns: list of (class name, handle), or None if the database has
+                  no index that can answer the query
+        :rtype: list
+        """
+        return None
+
+    def snapshot(self, target=":memory:", callback=None):
+        """
+        Copy the committed state of the database, while it is open, to the
+        family tree directory target, or to memory.
+
+        The directory must exist and hold no database.  A copy in memory is
+        returned as a read-only database, which is not changed by later
+        commits to this one, and which is closed by its caller.
+
+        :param target: directory of the copy, or ":memory:"
+        :type target: str
+        :param callback: function called with the percentage of the copy
+            that is done
+        :type callback: callable
+        :returns: the copy if it is in memory, otherwise None
+        :rtype: :class:`.DbReadBase`
+        """
+        raise NotImplementedError
+
     def find_initial_person(self):
         """
         Returns first person in the database
@@ -606,6 +900,146 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def get_citations_from_handles(self, handles):
+        """
+        Return a list of Citation objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Citation does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Citation that is filtered out.
+        """
+        return [self.get_citation_from_handle(handle) for handle in handles]
+
+    def get_events_from_handles(self, handles):
+        """
+        Return a list of Event objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Event does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Event that is filtered out.
+        """
+        return [self.get_event_from_handle(handle) for handle in handles]
+
+    def get_families_from_handles(self, handles):
+        """
+        Return a list of Family objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Family does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Family that is filtered out.
+        """
+        return [self.get_family_from_handle(handle) for handle in handles]
+
+    def get_media_from_handles(self, handles):
+        """
+        Return a list of Media objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Media does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Media that is filtered out.
+        """
+        return [self.get_media_from_handle(handle) for handle in handles]
+
+    def get_notes_from_handles(self, handles):
+        """
+        Return a list of Note objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Note does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Note that is filtered out.
+        """
+        return [self.get_note_from_handle(handle) for handle in handles]
+
+    def get_people_from_handles(self, handles):
+        """
+        Return a list of Person objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Person does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Person that is filtered out.
+        """
+        return [self.get_person_from_handle(handle) for handle in handles]
+
+    def get_places_from_handles(self, handles):
+        """
+        Return a list of Place objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Place does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Place that is filtered out.
+        """
+        return [self.get_place_from_handle(handle) for handle in handles]
+
+    def get_repositories_from_handles(self, handles):
+        """
+        Return a list of Repository objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Repository does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Repository that is filtered out.
+        """
+        return [self.get_repository_from_handle(handle) for handle in handles]
+
+    def get_sources_from_handles(self, handles):
+        """
+        Return a list of Source objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Source does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Source that is filtered out.
+        """
+        return [self.get_source_from_handle(handle) for handle in handles]
+
+    def get_tags_from_handles(self, handles):
+        """
+        Return a list of Tag objects in the database from the passed
+        handles, in the same order.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list
+
+        If any Tag does not exist, a HandleError is raised.
+        Note: if used through a proxy (Filter for reports etc.) a 'None' is
+        returned in place of each Tag that is filtered out.
+        """
+        return [self.get_tag_from_handle(handle) for handle in handles]
+
     def get_citation_handles(self, sort_handles=False, locale=glocale):
         """
         Return a list of database handles, one handle for each Citation in
@@ -992,6 +1426,76 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def get_raw_citation_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Citation objects from the passed
+        handles, in the same order, with None for each missing Citation.
+        """
+        return [self.get_raw_citation_data(handle) for handle in handles]
+
+    def get_raw_event_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Event objects from the passed
+        handles, in the same order, with None for each missing Event.
+        """
+        return [self.get_raw_event_data(handle) for handle in handles]
+
+    def get_raw_family_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Family objects from the passed
+        handles, in the same order, with None for each missing Family.
+        """
+        return [self.get_raw_family_data(handle) for handle in handles]
+
+    def get_raw_media_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Media objects from the passed
+        handles, in the same order, with None for each missing Media.
+        """
+        return [self.get_raw_media_data(handle) for handle in handles]
+
+    def get_raw_note_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Note objects from the passed
+        handles, in the same order, with None for each missing Note.
+        """
+        return [self.get_raw_note_data(handle) for handle in handles]
+
+    def get_raw_person_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Person objects from the passed
+        handles, in the same order, with None for each missing Person.
+        """
+        return [self.get_raw_person_data(handle) for handle in handles]
+
+    def get_raw_place_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Place objects from the passed
+        handles, in the same order, with None for each missing Place.
+        """
+        return [self.get_raw_place_data(handle) for handle in handles]
+
+    def get_raw_repository_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Repository objects from the passed
+        handles, in the same order, with None for each missing Repository.
+        """
+        return [self.get_raw_repository_data(handle) for handle in handles]
+
+    def get_raw_source_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Source objects from the passed
+        handles, in the same order, with None for each missing Source.
+        """
+        return [self.get_raw_source_data(handle) for handle in handles]
+
+    def get_raw_tag_data_from_handles(self, handles):
+        """
+        Return a list of raw (serialized) Tag objects from the passed
+        handles, in the same order, with None for each missing Tag.
+        """
+        return [self.get_raw_tag_data(handle) for handle in handles]
+
     def get_researcher(self):
         """
         Return the Researcher instance, providing information about the owner
@@ -1011,6 +1515,20 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def iter_surnames(self, prefix=""):
+        """
+        Return an iterator over the sorted surnames contained in the
+        database that start with the prefix.
+        """
+        raise NotImplementedError
+
+    def surname_frequency(self):
+        """
+        Return a dictionary of the surnames contained in the database, and
+        the number of people with each one.
+        """
+        raise NotImplementedError
+
     def get_tag_from_name(self, val):
         """
         Find a Tag in the database from the passed Tag name.
@@ -1265,6 +1783,145 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def _page_handles(self, handles, after, limit):
+        """
+        Return the first limit handles, in handle order, that sort after the
+        given handle.
+        """
+        if after is not None:
+            handles = (handle for handle in handles if handle > after)
+        return nsmallest(limit, handles)
+
+    def get_citation_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Citations in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_citation_handles(), after, limit)
+
+    def get_event_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Events in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_event_handles(), after, limit)
+
+    def get_family_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Families in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_family_handles(), after, limit)
+
+    def get_media_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Media in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_media_handles(), after, limit)
+
+    def get_note_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Notes in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_note_handles(), after, limit)
+
+    def get_person_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Persons in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_person_handles(), after, limit)
+
+    def get_place_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Places in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_place_handles(), after, limit)
+
+    def get_repository_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Repositories in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_repository_handles(), after, limit)
+
+    def get_source_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Sources in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_source_handles(), after, limit)
+
+    def get_tag_handles_page(self, after=None, limit=ARRAYSIZE):
+        """
+        Return a list of at most limit handles for Tags in the database,
+        in handle order, starting after the given handle.
+
+        :param after: The last handle of the previous page, or None for the
+                      first page.
+        :type after: str
+        :param limit: The maximum number of handles to return.
+        :type limit: int
+        """
+        return self._page_handles(self.iter_tag_handles(), after, limit)
+
     def load(
         self,
         name,
@@ -1435,6 +2092,19 @@ class DbReadBase:
         """
         raise NotImplementedError
 
+    def read_summary(self, directory):
+        """
+        Return the summary of the database in a family tree directory, like
+        :meth:`get_summary`, without loading it, so that it may be in use.
+
+        :param directory: directory of the family tree
+        :type directory: str
+        :returns: dictionary of summary items, or None if the database must
+                  be loaded to get them
+        :rtype: dict
+        """
+        return None
+
     def requires_login(self):
         """
         Returns True for backends that require a login dialog, else False.
@@ -1600,6 +2270,17 @@ class DbWriteBase(DbReadBase):
         """
         raise NotImplementedError
 
+    def commit_many(self, objs, transaction, change_time=None):
+        """
+        Commit a sequence of primary objects, possibly of different types, to
+        the database, storing the changes as part of the transaction.
+
+        Backends may write the objects in chunks, so if objs is a generator
+        that reads from the database it may not see the changes made to the
+        objects it yielded earlier.
+        """
+        raise NotImplementedError
+
     def commit_media(self, obj, transaction, change_time=None):
         """
         Commit the specified Media to the database, storing the changes
@@ -0,0 +1,53 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Encoding of serialized primary objects for storage in the database.
+
+The serialized form of a primary object, as returned by its serialize()
+method, is stored as a pickle, whose format does not depend on the Python
+version.
+"""
+
+# ------------------------------------------------------------------------
+#
+# Python modules
+#
+# ------------------------------------------------------------------------
+import pickle
+
+
+# ------------------------------------------------------------------------
+#
+# Functions
+#
+# ------------------------------------------------------------------------
+def encode(data):
+    """
+    Encode the serialized data of a primary object.
+    """
+    return pickle.dumps(data)
+
+
+def decode(blob):
+    """
+    Decode the serialized data of a primary object.
+    """
+    return pickle.loads(blob)
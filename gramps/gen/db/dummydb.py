@@ -1440,6 +1440,15 @@ class DummyDb(
             LOG.debug("database is closed")
         return []
 
+    def iter_surnames(self, prefix=""):
+        """
+        Return an iterator over the sorted surnames contained in the
+        database that start with the prefix.
+        """
+        if not self.db_is_open:
+            LOG.debug("database is closed")
+        return []
+
     def iter_tag_handles(self):
         """
         Return an iterator over handles for Tags in the database
@@ -1603,6 +1612,15 @@ class DummyDb(
         if not self.db_is_open:
             LOG.debug("database is closed")
 
+    def surname_frequency(self):
+        """
+        Return a dictionary of the surnames contained in the database, and
+        the number of people with each one.
+        """
+        if not self.db_is_open:
+            LOG.debug("database is closed")
+        return {}
+
     def get_dbid(self):
         """
         A unique ID for this database on this computer.
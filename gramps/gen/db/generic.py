@@ -35,6 +35,9 @@ import ast
 import sys
 import datetime
 import glob
+import sqlite3
+import zlib
+from contextlib import contextmanager
 from pathlib import Path
 
 # ------------------------------------------------------------------------
@@ -66,6 +69,10 @@ from . import (
     DBMODE_R,
     DBMODE_W,
 )
+from .codec import decode
+from .dbconst import ARRAYSIZE
+from .idallocator import IdAllocator
+from .txn import DbChanges
 from .utils import write_lock_file, clear_lock_file
 from .exceptions import DbVersionError, DbUpgradeRequiredError
 from ..errors import HandleError
@@ -89,6 +96,8 @@ from ..lib import (
     NameOriginType,
 )
 from ..lib.genderstats import GenderStats
+from ..lib.lazybase import LazyBase
+from ..utils.lru import LRU
 from ..config import config
 from ..const import GRAMPS_LOCALE as glocale
 
@@ -112,50 +121,119 @@ SIGBASE = (
 
 
 class DbGenericUndo(DbUndo):
+    """
+    Undo manager that keeps the most recent undo records in memory and
+    moves older ones, compressed, to a SQLite database.
+
+    The database is the undo file in the tree directory, or a temporary
+    file for a tree without a directory.  It is created when the first
+    records are moved out of memory and removed when the tree is closed.
+    """
+
     def __init__(self, grampsdb, path):
         super(DbGenericUndo, self).__init__(grampsdb)
-        self.undodb = []
+        self.path = path
+        self.undodb = None
+        self.window = {}
+        self.window_size = max(1, config.get("database.undo-window"))
+        self.count = 0
 
     def open(self, value=None):
         """
-        Open the backing storage.  Needs to be overridden in the derived
-        class.
+        Open the backing storage.
         """
-        pass
+        self.window = {}
+        self.count = 0
 
     def close(self):
         """
-        Close the backing storage.  Needs to be overridden in the derived
-        class.
+        Close the backing storage, and remove it.
         """
-        pass
+        self.window = {}
+        self.count = 0
+        if self.undodb is not None:
+            self.undodb.close()
+            self.undodb = None
+            if self.path and os.path.isfile(self.path):
+                os.remove(self.path)
+
+    def __get_storage(self):
+        """
+        Return the connection to the undo database, creating it if needed.
+        """
+        if self.undodb is None:
+            # An empty name makes SQLite use a temporary file.
+            self.undodb = sqlite3.connect(self.path or "")
+            self.undodb.execute("PRAGMA journal_mode = OFF")
+            self.undodb.execute("PRAGMA synchronous = OFF")
+            self.undodb.execute("DROP TABLE IF EXISTS undo")
+            self.undodb.execute(
+                "CREATE TABLE undo (recno INTEGER PRIMARY KEY, data BLOB)"
+            )
+        return self.undodb
+
+    def __spill(self):
+        """
+        Move the older half of the records in memory to the undo database.
+        """
+        recnos = sorted(self.window)[: len(self.window) - self.window_size // 2]
+        storage = self.__get_storage()
+        storage.executemany(
+            "INSERT OR REPLACE INTO undo (recno, data) VALUES (?, ?)",
+            [(recno, zlib.compress(self.window.pop(recno), 1)) for recno in recnos],
+        )
+        storage.commit()
 
     def append(self, value):
         """
-        Add a new entry on the end.  Needs to be overridden in the derived
-        class.
+        Add a new entry on the end, and return its index.
         """
-        self.undodb.append(value)
+        recno = self.count
+        self.count += 1
+        self.window[recno] = value
+        if len(self.window) > self.window_size:
+            self.__spill()
+        return recno
 
     def __getitem__(self, index):
         """
-        Returns an entry by index number.  Needs to be overridden in the
-        derived class.
-        """
-        return self.undodb[index]
+        Returns an entry by index number.
+        """
+        if index < 0:
+            index += self.count
+        if index in self.window:
+            return self.window[index]
+        if not 0 <= index < self.count or self.undodb is None:
+            raise IndexError(index)
+        row = self.undodb.execute(
+            "SELECT data FROM undo WHERE recno = ?", [index]
+        ).fetchone()
+        if row is None:
+            raise IndexError(index)
+        return zlib.decompress(row[0])
 
     def __setitem__(self, index, value):
         """
-        Set an entry to a value.  Needs to be overridden in the derived class.
+        Set an entry to a value.
         """
-        self.undodb[index] = value
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        if index in self.window:
+            self.window[index] = value
+        else:
+            self.undodb.execute(
+                "UPDATE undo SET data = ? WHERE recno = ?",
+                [zlib.compress(value, 1), index],
+            )
+            self.undodb.commit()
 
     def __len__(self):
         """
-        Returns the number of entries.  Needs to be overridden in the derived
-        class.
+        Returns the number of entries.
         """
-        return len(self.undodb)
+        return self.count
 
     def _redo(self, update_history):
         """
@@ -175,7 +253,7 @@ class DbGenericUndo(DbUndo):
             self.db._txn_begin()
             for record_id in subitems:
                 (key, trans_type, handle, old_data, new_data) = pickle.loads(
-                    self.undodb[record_id]
+                    self[record_id]
                 )
 
                 if key == REFERENCE_KEY:
@@ -224,7 +302,7 @@ class DbGenericUndo(DbUndo):
             self.db._txn_begin()
             for record_id in subitems:
                 (key, trans_type, handle, old_data, new_data) = pickle.loads(
-                    self.undodb[record_id]
+                    self[record_id]
                 )
 
                 if key == REFERENCE_KEY:
@@ -332,6 +410,141 @@ class Cursor:
         pass
 
 
+class Metadata:
+    """
+    An attribute of the database kept in the metadata table.
+
+    The value is read from the database the first time it is used, rather
+    than when the database is loaded, and is written back when the
+    database is closed, only if it has changed.
+    """
+
+    def __init__(self, key, default=None):
+        self.key = key
+        self.default = default
+        self.name = None
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, db, owner=None):
+        if db is None:
+            return self
+        if db._metadata_state is None:
+            # Not loaded yet:
+            value = self.default()
+        else:
+            value = self.read(db)
+            db._metadata_state[self.name] = pickle.dumps(self.dump(value))
+        # Later lookups find the value in the instance dictionary.
+        db.__dict__[self.name] = value
+        return value
+
+    def read(self, db):
+        """
+        Read the value from the database.
+        """
+        return db._get_metadata(self.key, self.default())
+
+    def dump(self, value):
+        """
+        Return the value as it is stored in the database.
+        """
+        return value
+
+    def write(self, db, value):
+        """
+        Write the value to the database.
+        """
+        db._set_metadata(self.key, self.dump(value))
+
+    def is_changed(self, db):
+        """
+        Return True if the value has been used and changed since it was
+        read from the database, or replaced.
+        """
+        if self.name not in db.__dict__:
+            return False
+        state = db._metadata_state.get(self.name)
+        return state != pickle.dumps(self.dump(db.__dict__[self.name]))
+
+
+class BookmarksMetadata(Metadata):
+    """
+    A bookmark list kept in the metadata table.
+    """
+
+    def __init__(self, key):
+        super().__init__(key, DbBookmarks)
+
+    def read(self, db):
+        bookmarks = DbBookmarks()
+        bookmarks.load(db._get_metadata(self.key))
+        return bookmarks
+
+    def dump(self, value):
+        return value.get()
+
+
+class IdAllocatorsMetadata(Metadata):
+    """
+    The gramps id allocators, per object type.  Only the pattern and the
+    floor of each one are kept in the metadata table, the numbers in use
+    are read again from the Gramps IDs in the database.
+    """
+
+    def __init__(self, key):
+        super().__init__(key, dict)
+
+    def read(self, db):
+        allocators = {}
+        for obj_key, (pattern, floor) in db._get_metadata(self.key, {}).items():
+            allocator = IdAllocator(pattern, floor)
+            allocator.update(db._get_gramps_ids(obj_key))
+            allocators[obj_key] = allocator
+        return allocators
+
+    def dump(self, value):
+        return {
+            obj_key: (alloc.pattern, alloc.floor) for obj_key, alloc in value.items()
+        }
+
+
+class GenderStatsMetadata(Metadata):
+    """
+    The gender statistics, kept in their own table.
+    """
+
+    def __init__(self):
+        super().__init__(None, GenderStats)
+
+    def read(self, db):
+        return GenderStats(db.get_gender_stats())
+
+    def dump(self, value):
+        return value.save_stats()
+
+    def write(self, db, value):
+        if db.has_changed:
+            db.save_gender_stats(value)
+
+
+class SurnameListMetadata(Metadata):
+    """
+    The sorted list of surnames, read from the people in the database.
+    It is never written back.
+    """
+
+    def __init__(self):
+        super().__init__(None, list)
+
+    def read(self, db):
+        return db.get_surname_list()
+
+    def is_changed(self, db):
+        return False
+
+
 class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     """
     A Gramps Database Backend. This replicates the grampsdb functions.
@@ -370,7 +583,52 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     __callback_map = {}
 
-    VERSION = (20, 0, 0)
+    VERSION = (30, 0, 0)
+
+    # Metadata, read when first used:
+    bookmarks = BookmarksMetadata("bookmarks")
+    family_bookmarks = BookmarksMetadata("family_bookmarks")
+    event_bookmarks = BookmarksMetadata("event_bookmarks")
+    place_bookmarks = BookmarksMetadata("place_bookmarks")
+    citation_bookmarks = BookmarksMetadata("citation_bookmarks")
+    source_bookmarks = BookmarksMetadata("source_bookmarks")
+    repo_bookmarks = BookmarksMetadata("repo_bookmarks")
+    media_bookmarks = BookmarksMetadata("media_bookmarks")
+    note_bookmarks = BookmarksMetadata("note_bookmarks")
+
+    # Custom type values:
+    event_names = Metadata("event_names", set)
+    family_attributes = Metadata("fattr_names", set)
+    individual_attributes = Metadata("pattr_names", set)
+    source_attributes = Metadata("sattr_names", set)
+    marker_names = Metadata("marker_names", set)
+    child_ref_types = Metadata("child_refs", set)
+    family_rel_types = Metadata("family_rels", set)
+    event_role_names = Metadata("event_roles", set)
+    name_types = Metadata("name_types", set)
+    origin_types = Metadata("origin_types", set)
+    repository_types = Metadata("repo_types", set)
+    note_types = Metadata("note_types", set)
+    source_media_types = Metadata("sm_types", set)
+    url_types = Metadata("url_types", set)
+    media_attributes = Metadata("mattr_names", set)
+    event_attributes = Metadata("eattr_names", set)
+    place_types = Metadata("place_types", set)
+
+    # Indexes:
+    cmap_index = Metadata("cmap_index", int)
+    smap_index = Metadata("smap_index", int)
+    emap_index = Metadata("emap_index", int)
+    pmap_index = Metadata("pmap_index", int)
+    fmap_index = Metadata("fmap_index", int)
+    lmap_index = Metadata("lmap_index", int)
+    omap_index = Metadata("omap_index", int)
+    rmap_index = Metadata("rmap_index", int)
+    nmap_index = Metadata("nmap_index", int)
+    _id_allocators = IdAllocatorsMetadata("id_allocators")
+
+    surname_list = SurnameListMetadata()
+    genderStats = GenderStatsMetadata()
 
     def __init__(self, directory=None):
         DbReadBase.__init__(self)
@@ -547,17 +805,17 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         }
         self.readonly = False
         self.db_is_open = False
+        self.lazy_objects = config.get("database.lazy-objects")
+        # Object cache of encoded data, per object type.  A hit saves the
+        # database query; each hit still decodes the data, so that every
+        # caller gets its own copy to build an object from.
+        cache_size = config.get("database.cache-size")
+        self._cache = {obj_key: LRU(cache_size) for obj_key in KEY_TO_NAME_MAP}
+        self._cache_hits = dict.fromkeys(KEY_TO_NAME_MAP, 0)
+        self._cache_misses = dict.fromkeys(KEY_TO_NAME_MAP, 0)
         self.name_formats = []
-        # Bookmarks:
-        self.bookmarks = DbBookmarks()
-        self.family_bookmarks = DbBookmarks()
-        self.event_bookmarks = DbBookmarks()
-        self.place_bookmarks = DbBookmarks()
-        self.citation_bookmarks = DbBookmarks()
-        self.source_bookmarks = DbBookmarks()
-        self.repo_bookmarks = DbBookmarks()
-        self.media_bookmarks = DbBookmarks()
-        self.note_bookmarks = DbBookmarks()
+        # Metadata values read so far, as stored:
+        self._metadata_state = None
         self.set_person_id_prefix("I%04d")
         self.set_media_id_prefix("O%04d")
         self.set_family_id_prefix("F%04d")
@@ -569,15 +827,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.set_note_id_prefix("N%04d")
         # ----------------------------------
         self.undodb = None
-        self.cmap_index = 0
-        self.smap_index = 0
-        self.emap_index = 0
-        self.pmap_index = 0
-        self.fmap_index = 0
-        self.lmap_index = 0
-        self.omap_index = 0
-        self.rmap_index = 0
-        self.nmap_index = 0
+        self._signals_held = 0
+        self._held_changes = DbChanges()
         self.undo_callback = None
         self.redo_callback = None
         self.undo_history_callback = None
@@ -586,8 +837,6 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.abort_possible = True
         self._bm_changes = 0
         self.has_changed = 0  # Also gives commits since startup
-        self.surname_list = []
-        self.genderStats = GenderStats()  # can pass in loaded stats as dict
         self.owner = Researcher()
         if directory:
             self.load(directory)
@@ -598,6 +847,40 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         raise NotImplementedError
 
+    def _copy_to_memory(self):
+        """
+        Copy the database to memory, and read from the copy.  Backends that
+        cannot do so read from the database itself.
+        """
+        pass
+
+    def _warm_cache(self):
+        """
+        Fill the object cache with the objects it can hold.
+        """
+        pass
+
+    def _check_sort_keys(self):
+        """
+        Rebuild the sort keys stored with the objects, if they were made for
+        another locale.  Backends that do not store sort keys do nothing.
+        """
+        pass
+
+    def _check_journal_mode(self):
+        """
+        Set the journal mode of the database from the preferences.  Backends
+        without journal modes do nothing.
+        """
+        pass
+
+    def _prune_changelog(self):
+        """
+        Remove the oldest changes from the changelog, if it is longer than
+        the preferences allow.  Backends without a changelog do nothing.
+        """
+        pass
+
     def __check_readonly(self, name):
         """
         Return True if we don't have read/write access to the database,
@@ -631,11 +914,16 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         update=True,
         username=None,
         password=None,
+        in_memory=False,
     ):
         """
         If update is False: then don't update any files
+
+        If in_memory is True: open the database read-only, copy it to memory
+        if the backend can, and fill the object cache, for fast reading of
+        the whole database, such as by reports run from the command line.
         """
-        if self.__check_readonly(directory):
+        if in_memory or self.__check_readonly(directory):
             mode = DBMODE_R
 
         self.readonly = mode == DBMODE_R
@@ -645,6 +933,10 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
         # run backend-specific code:
         self._initialize(directory, username, password)
+        if in_memory:
+            self._copy_to_memory()
+        self.clear_cache()
+        self._reset_metadata()
 
         if not self._schema_exists():
             self._create_schema()
@@ -654,63 +946,15 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.name_formats = self._get_metadata("name_formats")
         self.owner = self._get_metadata("researcher", default=Researcher())
 
-        # Load bookmarks
-        self.bookmarks.load(self._get_metadata("bookmarks"))
-        self.family_bookmarks.load(self._get_metadata("family_bookmarks"))
-        self.event_bookmarks.load(self._get_metadata("event_bookmarks"))
-        self.source_bookmarks.load(self._get_metadata("source_bookmarks"))
-        self.citation_bookmarks.load(self._get_metadata("citation_bookmarks"))
-        self.repo_bookmarks.load(self._get_metadata("repo_bookmarks"))
-        self.media_bookmarks.load(self._get_metadata("media_bookmarks"))
-        self.place_bookmarks.load(self._get_metadata("place_bookmarks"))
-        self.note_bookmarks.load(self._get_metadata("note_bookmarks"))
-
-        # Custom type values
-        self.event_names = self._get_metadata("event_names", set())
-        self.family_attributes = self._get_metadata("fattr_names", set())
-        self.individual_attributes = self._get_metadata("pattr_names", set())
-        self.source_attributes = self._get_metadata("sattr_names", set())
-        self.marker_names = self._get_metadata("marker_names", set())
-        self.child_ref_types = self._get_metadata("child_refs", set())
-        self.family_rel_types = self._get_metadata("family_rels", set())
-        self.event_role_names = self._get_metadata("event_roles", set())
-        self.name_types = self._get_metadata("name_types", set())
-        self.origin_types = self._get_metadata("origin_types", set())
-        self.repository_types = self._get_metadata("repo_types", set())
-        self.note_types = self._get_metadata("note_types", set())
-        self.source_media_types = self._get_metadata("sm_types", set())
-        self.url_types = self._get_metadata("url_types", set())
-        self.media_attributes = self._get_metadata("mattr_names", set())
-        self.event_attributes = self._get_metadata("eattr_names", set())
-        self.place_types = self._get_metadata("place_types", set())
-
-        # surname list
-        self.surname_list = self.get_surname_list()
-
         self._set_save_path(directory)
 
-        if self._directory and self._directory != ":memory:":
+        if self._directory and self._directory != ":memory:" and not self.readonly:
             self.undolog = os.path.join(self._directory, DBUNDOFN)
         else:
             self.undolog = None
         self.undodb = self._create_undo_manager()
         self.undodb.open()
 
-        # Other items to load
-        gstats = self.get_gender_stats()
-        self.genderStats = GenderStats(gstats)
-
-        # Indexes:
-        self.cmap_index = self._get_metadata("cmap_index", 0)
-        self.smap_index = self._get_metadata("smap_index", 0)
-        self.emap_index = self._get_metadata("emap_index", 0)
-        self.pmap_index = self._get_metadata("pmap_index", 0)
-        self.fmap_index = self._get_metadata("fmap_index", 0)
-        self.lmap_index = self._get_metadata("lmap_index", 0)
-        self.omap_index = self._get_metadata("omap_index", 0)
-        self.rmap_index = self._get_metadata("rmap_index", 0)
-        self.nmap_index = self._get_metadata("nmap_index", 0)
-
         self.db_is_open = True
 
         # Check on db version to see if we need upgrade or too new
@@ -728,6 +972,36 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             else:
                 self.close()
                 raise DbUpgradeRequiredError(dbversion, self.VERSION[0])
+        elif not self.readonly and self._get_metadata("rebuild", None) is not None:
+            # An upgrade was interrupted while rebuilding the indexes.
+            self._rebuild_indexes(callback)
+        self._check_sort_keys()
+        self._check_journal_mode()
+        if not self.readonly:
+            self._prune_changelog()
+
+        if in_memory:
+            self._warm_cache()
+
+    def _metadata_properties(self):
+        """
+        Return the attributes of the database kept in the metadata table.
+        """
+        return [
+            prop
+            for cls in type(self).__mro__
+            for prop in vars(cls).values()
+            if isinstance(prop, Metadata)
+        ]
+
+    def _reset_metadata(self):
+        """
+        Forget the metadata values, so that they are read from the database
+        when next used.
+        """
+        for prop in self._metadata_properties():
+            self.__dict__.pop(prop.name, None)
+        self._metadata_state = {}
 
     def _create_undo_manager(self):
         """
@@ -757,58 +1031,22 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                 self._set_metadata("name_formats", self.name_formats)
                 self._set_metadata("researcher", self.owner)
 
-                # Bookmarks
-                self._set_metadata("bookmarks", self.bookmarks.get())
-                self._set_metadata("family_bookmarks", self.family_bookmarks.get())
-                self._set_metadata("event_bookmarks", self.event_bookmarks.get())
-                self._set_metadata("place_bookmarks", self.place_bookmarks.get())
-                self._set_metadata("repo_bookmarks", self.repo_bookmarks.get())
-                self._set_metadata("source_bookmarks", self.source_bookmarks.get())
-                self._set_metadata("citation_bookmarks", self.citation_bookmarks.get())
-                self._set_metadata("media_bookmarks", self.media_bookmarks.get())
-                self._set_metadata("note_bookmarks", self.note_bookmarks.get())
-
-                # Custom type values, sets
-                self._set_metadata("event_names", self.event_names)
-                self._set_metadata("fattr_names", self.family_attributes)
-                self._set_metadata("pattr_names", self.individual_attributes)
-                self._set_metadata("sattr_names", self.source_attributes)
-                self._set_metadata("marker_names", self.marker_names)
-                self._set_metadata("child_refs", self.child_ref_types)
-                self._set_metadata("family_rels", self.family_rel_types)
-                self._set_metadata("event_roles", self.event_role_names)
-                self._set_metadata("name_types", self.name_types)
-                self._set_metadata("origin_types", self.origin_types)
-                self._set_metadata("repo_types", self.repository_types)
-                self._set_metadata("note_types", self.note_types)
-                self._set_metadata("sm_types", self.source_media_types)
-                self._set_metadata("url_types", self.url_types)
-                self._set_metadata("mattr_names", self.media_attributes)
-                self._set_metadata("eattr_names", self.event_attributes)
-                self._set_metadata("place_types", self.place_types)
-
-                # Save misc items:
-                if self.has_changed:
-                    self.save_gender_stats(self.genderStats)
-
-                # Indexes:
-                self._set_metadata("cmap_index", self.cmap_index)
-                self._set_metadata("smap_index", self.smap_index)
-                self._set_metadata("emap_index", self.emap_index)
-                self._set_metadata("pmap_index", self.pmap_index)
-                self._set_metadata("fmap_index", self.fmap_index)
-                self._set_metadata("lmap_index", self.lmap_index)
-                self._set_metadata("omap_index", self.omap_index)
-                self._set_metadata("rmap_index", self.rmap_index)
-                self._set_metadata("nmap_index", self.nmap_index)
+                # Bookmarks, custom types, indexes, if they have changed
+                for prop in self._metadata_properties():
+                    if prop.is_changed(self):
+                        prop.write(self, getattr(self, prop.name))
 
             self._close()
+            self._metadata_state = None
 
             try:
                 clear_lock_file(self.get_save_path())
             except IOError:
                 pass
 
+        if self.undodb is not None:
+            self.undodb.close()
+        self.clear_cache()
         self.db_is_open = False
         self._directory = None
 
@@ -881,6 +1119,44 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         self.transaction = transaction
         return transaction
 
+    @contextmanager
+    def coalesce_signals(self):
+        """
+        Context manager that holds back the object signals of the
+        transactions committed inside it, and emits them once on exit with
+        the changes merged.
+
+        Use it around a series of transactions, such as a scripted edit, so
+        that listeners are only updated once.  It can be nested.
+        """
+        self._signals_held += 1
+        try:
+            yield self
+        finally:
+            self._signals_held -= 1
+            if self._signals_held == 0:
+                changes = self._held_changes
+                self._held_changes = DbChanges()
+                self._emit_changes(changes)
+
+    def _emit_changes(self, changes):
+        """
+        Emit one -delete, -add and -update signal for each object type with
+        the net changes of a transaction, or hold them back while inside
+        coalesce_signals.
+        """
+        if self._signals_held:
+            self._held_changes.update(changes)
+            return
+        action = {TXNADD: "-add", TXNUPD: "-update", TXNDEL: "-delete"}
+        # do deletes and adds first
+        for trans_type in (TXNDEL, TXNADD, TXNUPD):
+            for obj_type in range(11):
+                handles = changes.get_handles(obj_type, trans_type)
+                if handles:
+                    signal = KEY_TO_NAME_MAP[obj_type] + action[trans_type]
+                    self.emit(signal, (handles,))
+
     def _get_metadata(self, key, default=[]):
         """
         Get an item from the database.
@@ -1077,14 +1353,43 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def _find_next_gramps_id(self, prefix, map_index, obj_key):
         """
         Helper function for find_next_<object>_gramps_id methods
-        """
+
+        The IDs in use are read once per ID pattern into an IdAllocator,
+        which is kept up to date on commit and remove.  Its pattern and
+        floor are saved in the metadata.  The chosen ID is still checked
+        against the database, in case it was changed without the allocator
+        knowing.
+        """
+        allocator = self._id_allocators.get(obj_key)
+        if allocator is None or allocator.pattern != prefix:
+            allocator = IdAllocator(prefix, map_index)
+            allocator.update(self._get_gramps_ids(obj_key))
+            self._id_allocators[obj_key] = allocator
+        map_index = allocator.find_next(map_index)
         index = prefix % map_index
         while self._has_gramps_id(obj_key, index):
-            map_index += 1
+            map_index = allocator.find_next(map_index + 1)
             index = prefix % map_index
         map_index += 1
         return (map_index, index)
 
+    def _update_gramps_id(self, obj_key, old_data, new_data):
+        """
+        Update the ID allocator of an object type after an object has been
+        committed or removed.
+
+        :param old_data: the serialized object before the change, or None.
+        :param new_data: the serialized object after the change, or None.
+        """
+        allocator = self._id_allocators.get(obj_key)
+        if allocator is None:
+            return
+        old_id = old_data[1] if old_data else None
+        new_id = new_data[1] if new_data else None
+        if old_id != new_id:
+            allocator.discard(old_id)
+            allocator.add(new_id)
+
     def find_next_person_gramps_id(self):
         """
         Return the next available GRAMPS' ID for a Person object based off the
@@ -1336,10 +1641,20 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             raise HandleError("Handle is empty")
         data = self._get_raw_data(obj_key, handle)
         if data:
-            return obj_class.create(data)
+            return self._create_object(obj_class, data)
         else:
             raise HandleError("Handle %s not found" % handle)
 
+    def _create_object(self, obj_class, data):
+        """
+        Create an object from serialized data.  If lazy objects are enabled,
+        the secondary objects of classes that support it are unserialized
+        when they are first accessed.
+        """
+        if self.lazy_objects and issubclass(obj_class, LazyBase):
+            return obj_class.create_lazy(data)
+        return obj_class.create(data)
+
     def get_event_from_handle(self, handle):
         return self._get_from_handle(EVENT_KEY, Event, handle)
 
@@ -1370,6 +1685,53 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def get_tag_from_handle(self, handle):
         return self._get_from_handle(TAG_KEY, Tag, handle)
 
+    ################################################################
+    #
+    # get_*_from_handles methods
+    #
+    ################################################################
+
+    def _get_from_handles(self, obj_key, obj_class, handles):
+        handles = list(handles)
+        objects = []
+        for handle, data in zip(
+            handles, self._get_raw_data_from_handles(obj_key, handles)
+        ):
+            if data is None:
+                raise HandleError("Handle %s not found" % handle)
+            objects.append(self._create_object(obj_class, data))
+        return objects
+
+    def get_citations_from_handles(self, handles):
+        return self._get_from_handles(CITATION_KEY, Citation, handles)
+
+    def get_events_from_handles(self, handles):
+        return self._get_from_handles(EVENT_KEY, Event, handles)
+
+    def get_families_from_handles(self, handles):
+        return self._get_from_handles(FAMILY_KEY, Family, handles)
+
+    def get_media_from_handles(self, handles):
+        return self._get_from_handles(MEDIA_KEY, Media, handles)
+
+    def get_notes_from_handles(self, handles):
+        return self._get_from_handles(NOTE_KEY, Note, handles)
+
+    def get_people_from_handles(self, handles):
+        return self._get_from_handles(PERSON_KEY, Person, handles)
+
+    def get_places_from_handles(self, handles):
+        return self._get_from_handles(PLACE_KEY, Place, handles)
+
+    def get_repositories_from_handles(self, handles):
+        return self._get_from_handles(REPOSITORY_KEY, Repository, handles)
+
+    def get_sources_from_handles(self, handles):
+        return self._get_from_handles(SOURCE_KEY, Source, handles)
+
+    def get_tags_from_handles(self, handles):
+        return self._get_from_handles(TAG_KEY, Tag, handles)
+
     ################################################################
     #
     # get_*_from_gramps_id methods
@@ -1378,11 +1740,11 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     def get_person_from_gramps_id(self, gramps_id):
         data = self._get_raw_person_from_id_data(gramps_id)
-        return Person.create(data)
+        return self._create_object(Person, data)
 
     def get_family_from_gramps_id(self, gramps_id):
         data = self._get_raw_family_from_id_data(gramps_id)
-        return Family.create(data)
+        return self._create_object(Family, data)
 
     def get_citation_from_gramps_id(self, gramps_id):
         data = self._get_raw_citation_from_id_data(gramps_id)
@@ -1394,7 +1756,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     def get_event_from_gramps_id(self, gramps_id):
         data = self._get_raw_event_from_id_data(gramps_id)
-        return Event.create(data)
+        return self._create_object(Event, data)
 
     def get_media_from_gramps_id(self, gramps_id):
         data = self._get_raw_media_from_id_data(gramps_id)
@@ -1402,7 +1764,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     def get_place_from_gramps_id(self, gramps_id):
         data = self._get_raw_place_from_id_data(gramps_id)
-        return Place.create(data)
+        return self._create_object(Place, data)
 
     def get_repository_from_gramps_id(self, gramps_id):
         data = self._get_raw_repository_from_id_data(gramps_id)
@@ -1599,6 +1961,50 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         return self._iter_handles(TAG_KEY)
 
+    ################################################################
+    #
+    # get_*_handles_page methods
+    #
+    ################################################################
+
+    def _get_handles_page(self, obj_key, after, limit):
+        """
+        Return the first limit handles of a table, in handle order, that
+        sort after the given handle.  Derived classes may override this to
+        use an index.
+        """
+        return self._page_handles(self._iter_handles(obj_key), after, limit)
+
+    def get_citation_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(CITATION_KEY, after, limit)
+
+    def get_event_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(EVENT_KEY, after, limit)
+
+    def get_family_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(FAMILY_KEY, after, limit)
+
+    def get_media_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(MEDIA_KEY, after, limit)
+
+    def get_note_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(NOTE_KEY, after, limit)
+
+    def get_person_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(PERSON_KEY, after, limit)
+
+    def get_place_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(PLACE_KEY, after, limit)
+
+    def get_repository_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(REPOSITORY_KEY, after, limit)
+
+    def get_source_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(SOURCE_KEY, after, limit)
+
+    def get_tag_handles_page(self, after=None, limit=ARRAYSIZE):
+        return self._get_handles_page(TAG_KEY, after, limit)
+
     ################################################################
     #
     # iter_* methods
@@ -1611,7 +2017,7 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
         """
         cursor = self._get_table_func(class_.__name__, "cursor_func")
         for data in cursor():
-            yield class_.create(data[1])
+            yield self._create_object(class_, data[1])
 
     def iter_people(self):
         return self._iter_objects(Person)
@@ -1726,10 +2132,78 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
     def _get_raw_data(self, obj_key, handle):
         """
-        Return raw (serialized and pickled) object from handle.
+        Return raw (serialized) object from handle, using the object cache.
+
+        The cache holds the encoded data rather than the decoded data, as
+        objects take over the lists of the data they are made from, and
+        may then change them.  Decoding the cached data gives a fresh copy
+        for a fraction of the cost of the query, and faster than copying
+        the decoded data would.
+        """
+        if not self._use_cache():
+            blob = self._get_raw_blob(obj_key, handle)
+            return None if blob is None else decode(blob)
+        cache = self._cache[obj_key]
+        if handle in cache:
+            self._cache_hits[obj_key] += 1
+            return decode(cache[handle])
+        self._cache_misses[obj_key] += 1
+        blob = self._get_raw_blob(obj_key, handle)
+        if blob is None:
+            return None
+        cache[handle] = blob
+        return decode(blob)
+
+    def _get_raw_blob(self, obj_key, handle):
+        """
+        Return the encoded data of an object from handle, or None if there
+        is no such object.  Needs to be overridden in the derived class.
         """
         raise NotImplementedError
 
+    def _use_cache(self):
+        """
+        Return True if the object cache may be used in the current thread.
+        """
+        return True
+
+    def _cache_update(self, obj_key, handle, blob=None):
+        """
+        Store the encoded data of an object in the object cache, or remove
+        the object from the cache if blob is None.
+        """
+        cache = self._cache[obj_key]
+        if blob is not None:
+            cache[handle] = blob
+        elif handle in cache:
+            del cache[handle]
+
+    def clear_cache(self):
+        """
+        Remove all objects from the object cache.
+        """
+        for cache in self._cache.values():
+            cache.clear()
+
+    def get_cache_statistics(self):
+        """
+        Return the object cache statistics.
+
+        Each hit is a database query saved.
+
+        :returns: Returns a dictionary, keyed by table name, of
+                  (hits, misses, entries) tuples.
+        :rtype: dict
+        """
+        return {
+            KEY_TO_NAME_MAP[obj_key]: (
+                self._cache_hits[obj_key],
+                self._cache_misses[obj_key],
+                len(self._cache[obj_key].data),
+            )
+            for obj_key in self._cache
+        }
+
     def get_raw_person_data(self, handle):
         return self._get_raw_data(PERSON_KEY, handle)
 
@@ -1760,6 +2234,73 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
     def get_raw_tag_data(self, handle):
         return self._get_raw_data(TAG_KEY, handle)
 
+    def _get_raw_data_from_handles(self, obj_key, handles):
+        """
+        Return a list of raw (serialized) objects from handles, in the same
+        order, with None for each missing object.  Uses the object cache.
+        """
+        handles = list(handles)
+        blobs = {}
+        if self._use_cache():
+            cache = self._cache[obj_key]
+            missing = []
+            for handle in handles:
+                if handle in cache:
+                    blobs[handle] = cache[handle]
+                else:
+                    missing.append(handle)
+            self._cache_hits[obj_key] += len(handles) - len(missing)
+            self._cache_misses[obj_key] += len(missing)
+            for handle, blob in self._get_raw_blobs(obj_key, missing):
+                blobs[handle] = blob
+                cache[handle] = blob
+        else:
+            blobs.update(self._get_raw_blobs(obj_key, handles))
+        return [
+            decode(blobs[handle]) if handle in blobs else None for handle in handles
+        ]
+
+    def _get_raw_blobs(self, obj_key, handles):
+        """
+        Return an iterator over (handle, encoded data) for the given handles
+        that exist in the database.  Derived classes may override this to
+        fetch the objects in fewer queries.
+        """
+        for handle in handles:
+            blob = self._get_raw_blob(obj_key, handle)
+            if blob is not None:
+                yield (handle, blob)
+
+    def get_raw_citation_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(CITATION_KEY, handles)
+
+    def get_raw_event_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(EVENT_KEY, handles)
+
+    def get_raw_family_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(FAMILY_KEY, handles)
+
+    def get_raw_media_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(MEDIA_KEY, handles)
+
+    def get_raw_note_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(NOTE_KEY, handles)
+
+    def get_raw_person_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(PERSON_KEY, handles)
+
+    def get_raw_place_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(PLACE_KEY, handles)
+
+    def get_raw_repository_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(REPOSITORY_KEY, handles)
+
+    def get_raw_source_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(SOURCE_KEY, handles)
+
+    def get_raw_tag_data_from_handles(self, handles):
+        return self._get_raw_data_from_handles(TAG_KEY, handles)
+
     ################################################################
     #
     # get_raw_*_from_id_data methods
@@ -2146,6 +2687,15 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             ]
         )
 
+    def commit_many(self, objs, trans, change_time=None):
+        """
+        Commit a sequence of primary objects, possibly of different types, to
+        the database, storing the changes as part of the transaction.
+        """
+        for obj in objs:
+            commit_func = self._get_table_func(obj.__class__.__name__, "commit_func")
+            commit_func(obj, trans, change_time)
+
     def _after_commit(self, transaction):
         """
         Post-transaction commit processing
@@ -2578,7 +3128,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             order_by = " ".join(order_by_list)
         return glocale.sort_key(order_by)
 
-    def _get_person_data(self, person):
+    @staticmethod
+    def _get_person_data(person):
         """
         Given a Person, return primary_name.first_name and surname.
         """
@@ -2595,7 +3146,8 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
                         surname = surname_obj.surname
         return (given_name, surname)
 
-    def _get_place_data(self, place):
+    @staticmethod
+    def _get_place_data(place):
         """
         Given a Place, return the first PlaceRef handle.
         """
@@ -2614,6 +3166,12 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
 
         start = time.time()
 
+        # Mark the secondary indexes and reference map as out of date, so
+        # that they are rebuilt even if the upgrade is interrupted after the
+        # schema version is set.
+        if self._get_metadata("rebuild", None) is None:
+            self._set_metadata("rebuild", ())
+
         from gramps.gen.db.upgrade import (
             gramps_upgrade_14,
             gramps_upgrade_15,
@@ -2622,6 +3180,16 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             gramps_upgrade_18,
             gramps_upgrade_19,
             gramps_upgrade_20,
+            gramps_upgrade_21,
+            gramps_upgrade_22,
+            gramps_upgrade_23,
+            gramps_upgrade_24,
+            gramps_upgrade_25,
+            gramps_upgrade_26,
+            gramps_upgrade_27,
+            gramps_upgrade_28,
+            gramps_upgrade_29,
+            gramps_upgrade_30,
         )
 
         if version < 14:
@@ -2638,14 +3206,43 @@ class DbGeneric(DbWriteBase, DbReadBase, UpdateCallback, Callback):
             gramps_upgrade_19(self)
         if version < 20:
             gramps_upgrade_20(self)
-
-        self.rebuild_secondary(callback)
-        self.reindex_reference_map(callback)
+        if version < 21:
+            gramps_upgrade_21(self)
+        if version < 22:
+            gramps_upgrade_22(self)
+        if version < 23:
+            gramps_upgrade_23(self)
+        if version < 24:
+            gramps_upgrade_24(self)
+        if version < 25:
+            gramps_upgrade_25(self)
+        if version < 26:
+            gramps_upgrade_26(self)
+        if version < 27:
+            gramps_upgrade_27(self)
+        if version < 28:
+            gramps_upgrade_28(self)
+        if version < 29:
+            gramps_upgrade_29(self)
+        if version < 30:
+            gramps_upgrade_30(self)
+
+        self._rebuild_indexes(callback)
         self.reset()
 
         self.set_schema_version(self.VERSION[0])
         LOG.debug("Upgrade time: %d seconds" % int(time.time() - start))
 
+    def _rebuild_indexes(self, callback=None):
+        """
+        Rebuild the secondary indexes and the reference map at the end of
+        an upgrade, and clear the "rebuild" metadata that marks them as out
+        of date.
+        """
+        self.rebuild_secondary(callback)
+        self.reindex_reference_map(callback)
+        self._set_metadata("rebuild", None)
+
     def get_schema_version(self):
         """Return current schema version as an int"""
         return int(self._get_metadata("version", default="0"))
@@ -0,0 +1,132 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Allocation of Gramps IDs.
+
+New Gramps IDs are made by formatting a counter with the ID pattern of the
+object type, such as I%04d.  IDs at or above the counter may already be in
+use, for example after an import, so the allocator keeps the set of those
+numbers and skips them without querying the database.
+"""
+
+# ------------------------------------------------------------------------
+#
+# Python modules
+#
+# ------------------------------------------------------------------------
+import re
+
+# ------------------------------------------------------------------------
+#
+# Constants
+#
+# ------------------------------------------------------------------------
+_CONVERSION = re.compile(r"%[-+ #0]*\d*[diu]")
+
+
+# ------------------------------------------------------------------------
+#
+# IdAllocator class
+#
+# ------------------------------------------------------------------------
+class IdAllocator:
+    """
+    Keep track of the numbers used by the Gramps IDs of one object type
+    that match an ID pattern.
+
+    Only numbers at or above the floor are kept, since the counter used to
+    create new IDs never goes back.
+    """
+
+    def __init__(self, pattern, floor=0, numbers=()):
+        """
+        :param pattern: the ID pattern, such as I%04d
+        :type pattern: str
+        :param floor: the lowest number of interest
+        :type floor: int
+        :param numbers: numbers already known to be in use
+        :type numbers: iterable of int
+        """
+        self.pattern = pattern
+        self.floor = floor
+        self.numbers = {number for number in numbers if number >= floor}
+        match = _CONVERSION.search(pattern)
+        if match:
+            self.__regex = re.compile(
+                re.escape(pattern[: match.start()])
+                + r"(\d+)"
+                + re.escape(pattern[match.end() :])
+                + "$"
+            )
+        else:
+            self.__regex = None
+
+    def parse(self, gramps_id):
+        """
+        Return the number of a Gramps ID made with the pattern, or None if
+        the pattern could not have made the ID.
+        """
+        if self.__regex is None or not gramps_id:
+            return None
+        match = self.__regex.match(gramps_id)
+        if match is None:
+            return None
+        number = int(match.group(1))
+        if self.pattern % number != gramps_id:
+            # For example I12 does not match the pattern I%04d.
+            return None
+        return number
+
+    def add(self, gramps_id):
+        """
+        Record that a Gramps ID is in use.
+        """
+        number = self.parse(gramps_id)
+        if number is not None and number >= self.floor:
+            self.numbers.add(number)
+
+    def update(self, gramps_ids):
+        """
+        Record that the Gramps IDs are in use.
+        """
+        for gramps_id in gramps_ids:
+            self.add(gramps_id)
+
+    def discard(self, gramps_id):
+        """
+        Record that a Gramps ID is no longer in use.
+        """
+        number = self.parse(gramps_id)
+        if number is not None:
+            self.numbers.discard(number)
+
+    def find_next(self, index):
+        """
+        Return the first number from index on that is not in use, and raise
+        the floor above it.
+        """
+        if index > self.floor:
+            self.numbers = {number for number in self.numbers if number >= index}
+        while index in self.numbers:
+            self.numbers.discard(index)
+            index += 1
+        self.floor = index + 1
+        return index
@@ -0,0 +1,79 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the database codec """
+
+import os
+import pickle
+import unittest
+
+from ..codec import encode, decode
+from ..utils import import_as_dict
+from ...const import DATA_DIR
+from ...lib import Person
+from ...user import User
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class CodecTest(unittest.TestCase):
+    def test_round_trip(self):
+        data = Person().serialize()
+        self.assertEqual(decode(encode(data)), data)
+
+    def test_pickle(self):
+        data = Person().serialize()
+        self.assertEqual(encode(data), pickle.dumps(data))
+        self.assertEqual(decode(pickle.dumps(data)), data)
+
+    def test_memoryview(self):
+        data = Person().serialize()
+        self.assertEqual(decode(memoryview(encode(data))), data)
+
+
+class DatabaseCheck(unittest.TestCase):
+    maxDiff = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def test_example(self):
+        for obj_class in (
+            "Person",
+            "Family",
+            "Event",
+            "Place",
+            "Repository",
+            "Source",
+            "Citation",
+            "Media",
+            "Note",
+            "Tag",
+        ):
+            for handle in self.db.method("get_%s_handles", obj_class)():
+                obj = self.db.method("get_%s_from_handle", obj_class)(handle)
+                data = obj.serialize()
+                self.assertEqual(decode(encode(data)), data)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the Gramps ID allocator """
+
+import unittest
+
+from ..idallocator import IdAllocator
+
+
+class IdAllocatorTest(unittest.TestCase):
+    def test_parse(self):
+        allocator = IdAllocator("I%04d")
+        self.assertEqual(allocator.parse("I0012"), 12)
+        self.assertEqual(allocator.parse("I12345"), 12345)
+        self.assertIsNone(allocator.parse("I12"))
+        self.assertIsNone(allocator.parse("F0012"))
+        self.assertIsNone(allocator.parse(""))
+
+    def test_suffix(self):
+        allocator = IdAllocator("Fam%d-x")
+        self.assertEqual(allocator.parse("Fam5-x"), 5)
+        self.assertIsNone(allocator.parse("Fam05-x"))
+
+    def test_find_next(self):
+        allocator = IdAllocator("I%04d")
+        allocator.update(["I0000", "I0001", "I0003"])
+        self.assertEqual(allocator.find_next(0), 2)
+        self.assertEqual(allocator.find_next(3), 4)
+        self.assertEqual(allocator.numbers, set())
+
+    def test_discard(self):
+        allocator = IdAllocator("I%04d")
+        allocator.update(["I0000", "I0001"])
+        allocator.discard("I0000")
+        self.assertEqual(allocator.find_next(0), 0)
+
+    def test_floor(self):
+        allocator = IdAllocator("I%04d", 10)
+        allocator.update(["I0005", "I0010"])
+        self.assertEqual(allocator.numbers, {10})
+        self.assertEqual(allocator.find_next(10), 11)
+        allocator.add("I0011")
+        self.assertEqual(allocator.numbers, set())
+
+
+if __name__ == "__main__":
+    unittest.main()
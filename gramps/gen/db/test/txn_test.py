@@ -0,0 +1,71 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for the net changes of transactions """
+
+import unittest
+
+from ..dbconst import PERSON_KEY, NOTE_KEY, TXNADD, TXNUPD, TXNDEL
+from ..txn import DbChanges
+
+
+class DbChangesTest(unittest.TestCase):
+    def __changes(self, *trans_types):
+        changes = DbChanges()
+        for trans_type in trans_types:
+            changes.add(PERSON_KEY, trans_type, "h1")
+        return [
+            trans_type
+            for trans_type in (TXNADD, TXNUPD, TXNDEL)
+            if changes.get_handles(PERSON_KEY, trans_type)
+        ]
+
+    def test_duplicates(self):
+        changes = DbChanges()
+        for handle in ("h1", "h2", "h1", "h3", "h2"):
+            changes.add(PERSON_KEY, TXNUPD, handle)
+        self.assertEqual(changes.get_handles(PERSON_KEY, TXNUPD), ["h1", "h2", "h3"])
+
+    def test_net_change(self):
+        self.assertEqual(self.__changes(TXNADD, TXNUPD), [TXNADD, TXNUPD])
+        self.assertEqual(self.__changes(TXNADD, TXNUPD, TXNDEL), [])
+        self.assertEqual(self.__changes(TXNADD, TXNDEL), [])
+        self.assertEqual(self.__changes(TXNUPD, TXNDEL), [TXNDEL])
+        self.assertEqual(self.__changes(TXNDEL, TXNADD), [TXNUPD])
+        self.assertEqual(self.__changes(TXNADD, TXNDEL, TXNADD), [TXNADD])
+
+    def test_update(self):
+        first = DbChanges()
+        first.add(PERSON_KEY, TXNADD, "h1")
+        first.add(NOTE_KEY, TXNUPD, "n1")
+        second = DbChanges()
+        second.add(PERSON_KEY, TXNDEL, "h1")
+        second.add(NOTE_KEY, TXNUPD, "n1")
+        first.update(second)
+        self.assertEqual(first.get_handles(PERSON_KEY, TXNDEL), [])
+        self.assertEqual(first.get_handles(NOTE_KEY, TXNUPD), ["n1"])
+        first.update(DbChanges())
+        self.assertTrue(first)
+        first.clear()
+        self.assertFalse(first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -40,11 +40,83 @@ import os
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from .dbconst import DBLOGNAME
+from .dbconst import DBLOGNAME, REFERENCE_KEY, TXNADD, TXNUPD, TXNDEL
 
 _LOG = logging.getLogger(DBLOGNAME)
 
 
+# -------------------------------------------------------------------------
+#
+# DbChanges class
+#
+# -------------------------------------------------------------------------
+class DbChanges:
+    """
+    The net changes made to primary objects, from which the database
+    signals are emitted.
+
+    Changes must be added in the order they were made.  Only the net change
+    of each object is kept: an object that is added and then updated counts
+    as added and updated, an object that is added and then deleted is
+    dropped, and an object that is deleted and then added again counts as
+    updated.
+    """
+
+    __slots__ = ("changes",)
+
+    def __init__(self):
+        # object type -> {handle: tuple of transaction types}, in order of
+        # change
+        self.changes = defaultdict(dict)
+
+    def add(self, obj_type, trans_type, handle):
+        """
+        Add a change of one object.
+        """
+        handles = self.changes[obj_type]
+        state = handles.get(handle)
+        if state is None:
+            state = (trans_type,)
+        elif trans_type == TXNDEL:
+            state = None if TXNADD in state else (TXNDEL,)
+        elif TXNADD in state:
+            state = (TXNADD, TXNUPD)
+        else:
+            state = (TXNUPD,)
+        if state is None:
+            del handles[handle]
+        else:
+            handles[handle] = state
+
+    def update(self, other):
+        """
+        Add the changes of another DbChanges, made after these changes.
+        """
+        for obj_type, handles in other.changes.items():
+            for handle, state in handles.items():
+                for trans_type in state:
+                    self.add(obj_type, trans_type, handle)
+
+    def get_handles(self, obj_type, trans_type):
+        """
+        Return the handles of the objects of a type with a given net change.
+        """
+        return [
+            handle
+            for handle, state in self.changes.get(obj_type, {}).items()
+            if trans_type in state
+        ]
+
+    def clear(self):
+        """
+        Forget all changes.
+        """
+        self.changes.clear()
+
+    def __bool__(self):
+        return any(self.changes.values())
+
+
 # -------------------------------------------------------------------------
 #
 # Gramps transaction class
@@ -63,6 +135,7 @@ class DbTxn(defaultdict):
         "first",
         "last",
         "timestamp",
+        "changes",
         "__dict__",
     )
 
@@ -169,6 +242,7 @@ class DbTxn(defaultdict):
         self.first = None
         self.last = None
         self.timestamp = 0
+        self.changes = DbChanges()
 
     def get_description(self):
         """
@@ -200,9 +274,17 @@ class DbTxn(defaultdict):
         if self.first is None:
             self.first = self.last
         _LOG.debug("added to trans: %d %d %s" % (obj_type, trans_type, handle))
-        self[(obj_type, trans_type)] += [(handle, new_data)]
+        if obj_type != REFERENCE_KEY:
+            self.changes.add(obj_type, trans_type, handle)
         return
 
+    def clear(self):
+        """
+        Remove the commit operations and changes from the Transaction.
+        """
+        defaultdict.clear(self)
+        self.changes.clear()
+
     def get_recnos(self, reverse=False):
         """
         Return a list of record numbers associated with the transaction.
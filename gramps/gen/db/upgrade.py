@@ -40,6 +40,9 @@ from gramps.gen.utils.file import create_checksum
 from gramps.gen.utils.id import create_id
 from gramps.gui.dialog import InfoDialog
 from .dbconst import (
+    KEY_TO_CLASS_MAP,
+    KEY_TO_NAME_MAP,
+    TXNUPD,
     PERSON_KEY,
     FAMILY_KEY,
     EVENT_KEY,
@@ -51,6 +54,7 @@ from .dbconst import (
     NOTE_KEY,
     TAG_KEY,
 )
+from .vitals import VITALS
 from ..const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.gettext
@@ -58,23 +62,262 @@ _ = glocale.translation.gettext
 LOG = logging.getLogger(".upgrade")
 
 
-def gramps_upgrade_20(self):
+def gramps_upgrade_30(self):
     """
-    Placeholder update.
+    Upgrade database from version 29 to 30.
+
+    Add the main_family column of the family_link table.  It is filled by
+    the rebuild of the secondary values that follows the upgrade.
     """
-    length = 0
-    self.set_total(length)
     self._txn_begin()
+    self.dbapi.execute("ALTER TABLE family_link ADD COLUMN main_family INTEGER")
+    # Bump up database version in the same transaction, as the column
+    # cannot be added twice.
+    self._put_metadata("version", 30)
+    self._txn_commit()
 
-    # uid and place upgrade code goes here
 
-    # ----------------------------------------
-    # Modify Person
-    # ----------------------------------------
-    # Add citation_list to person eventref objects
-    for person_handle in self.get_person_handles():
-        person = self.get_raw_person_data(person_handle)
-        (
+def gramps_upgrade_29(self):
+    """
+    Upgrade database from version 28 to 29.
+
+    Add the indexes on the parents of families.
+    """
+    self._txn_begin()
+    self.dbapi.execute(
+        "CREATE INDEX IF NOT EXISTS family_father_handle ON family(father_handle)"
+    )
+    self.dbapi.execute(
+        "CREATE INDEX IF NOT EXISTS family_mother_handle ON family(mother_handle)"
+    )
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 29)
+
+
+def gramps_upgrade_28(self):
+    """
+    Upgrade database from version 27 to 28.
+
+    Add the sort key columns.  They are filled by the rebuild of the
+    secondary values that follows the upgrade.
+    """
+    self._txn_begin()
+    for table, column in (
+        ("person", "given_name_key"),
+        ("person", "surname_key"),
+        ("place", "title_key"),
+        ("source", "title_key"),
+    ):
+        self.dbapi.execute("ALTER TABLE %s ADD COLUMN %s TEXT" % (table, column))
+    # Bump up database version in the same transaction, as the columns
+    # cannot be added twice.
+    self._put_metadata("version", 28)
+    self._txn_commit()
+
+
+def gramps_upgrade_27(self):
+    """
+    Upgrade database from version 26 to 27.
+
+    Add the surname counts, if the database keeps them.
+    """
+    self._txn_begin()
+    if not self.dbapi.table_exists("surname_count"):
+        self._create_surname_counts()
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 27)
+
+
+def gramps_upgrade_26(self):
+    """
+    Upgrade database from version 25 to 26.
+
+    Add the object counts, if the database keeps them.
+    """
+    self._txn_begin()
+    if not self.dbapi.table_exists("object_count"):
+        self._create_object_counts()
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 26)
+
+
+def gramps_upgrade_25(self):
+    """
+    Upgrade database from version 24 to 25.
+
+    Add the changelog table, starting it with the last change to each
+    object.  The indexes on the change columns are created by the rebuild
+    of the secondary values that follows the upgrade.
+    """
+    self._txn_begin()
+    self.dbapi.execute(
+        "CREATE TABLE IF NOT EXISTS changelog "
+        "("
+        "obj_class TEXT, "
+        "handle VARCHAR(50), "
+        "op INTEGER, "
+        "time INTEGER"
+        ")"
+    )
+    self.dbapi.execute("CREATE INDEX IF NOT EXISTS changelog_time ON changelog(time)")
+    for key, obj_class in KEY_TO_CLASS_MAP.items():
+        self.dbapi.execute(
+            "INSERT INTO changelog (obj_class, handle, op, time) "
+            "SELECT ?, handle, ?, change FROM %s" % KEY_TO_NAME_MAP[key],
+            [obj_class, TXNUPD],
+        )
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 25)
+
+
+def gramps_upgrade_24(self):
+    """
+    Upgrade database from version 23 to 24.
+
+    Add the person_vitals table.  It is filled by the rebuild of the
+    secondary values that follows the upgrade.
+    """
+    self._txn_begin()
+    self.dbapi.execute(
+        "CREATE TABLE IF NOT EXISTS person_vitals "
+        "("
+        "handle VARCHAR(50) PRIMARY KEY NOT NULL, "
+        "gender INTEGER, "
+        "birth_handle VARCHAR(50), "
+        "birth_sortval INTEGER, "
+        "birth_start INTEGER, "
+        "birth_stop INTEGER, "
+        "birth_place VARCHAR(50), "
+        "birth_fallback INTEGER, "
+        "death_handle VARCHAR(50), "
+        "death_sortval INTEGER, "
+        "death_start INTEGER, "
+        "death_stop INTEGER, "
+        "death_place VARCHAR(50), "
+        "death_fallback INTEGER, "
+        "baptism_sortval INTEGER, "
+        "burial_sortval INTEGER, "
+        "event_count INTEGER"
+        ")"
+    )
+    for vital in VITALS:
+        self.dbapi.execute(
+            "CREATE INDEX IF NOT EXISTS person_vitals_%s "
+            "ON person_vitals(%s_sortval)" % (vital, vital)
+        )
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 24)
+
+
+def gramps_upgrade_23(self):
+    """
+    Upgrade database from version 22 to 23.
+
+    Add the full-text index, if the database supports one.  It is filled
+    by the rebuild of the secondary values that follows the upgrade.
+    """
+    self._txn_begin()
+    if not self.dbapi.table_exists("text_data"):
+        self._create_text_index()
+    self._txn_commit()
+    self._text_index = None
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 23)
+
+
+def gramps_upgrade_22(self):
+    """
+    Upgrade database from version 21 to 22.
+
+    Add the family_link table of parent and child pairs.  It is filled by
+    the rebuild of the secondary values that follows the upgrade.
+    """
+    self._txn_begin()
+    self.dbapi.execute(
+        "CREATE TABLE IF NOT EXISTS family_link "
+        "("
+        "parent VARCHAR(50), "
+        "child VARCHAR(50), "
+        "family VARCHAR(50), "
+        "rel_type INTEGER"
+        ")"
+    )
+    self.dbapi.execute(
+        "CREATE INDEX IF NOT EXISTS family_link_parent " "ON family_link(parent, child)"
+    )
+    self.dbapi.execute(
+        "CREATE INDEX IF NOT EXISTS family_link_child " "ON family_link(child, parent)"
+    )
+    self.dbapi.execute(
+        "CREATE INDEX IF NOT EXISTS family_link_family ON family_link(family)"
+    )
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 22)
+
+
+def gramps_upgrade_21(self):
+    """
+    Upgrade database from version 20 to 21.
+
+    Add a covering index on the reference table for backlink queries.
+    """
+    self._txn_begin()
+    self.dbapi.execute(
+        "CREATE INDEX IF NOT EXISTS reference_ref_class "
+        "ON reference(ref_handle, obj_class, obj_handle)"
+    )
+    self._txn_commit()
+    # Bump up database version. Separate transaction to save metadata.
+    self._set_metadata("version", 21)
+
+
+def gramps_upgrade_20(self):
+    """
+    Upgrade database from version 19 to 20.
+
+    Add a citation_list to the event references of people and families.
+    """
+    self._upgrade_tables(
+        20, {PERSON_KEY: upgrade_person_20, FAMILY_KEY: upgrade_family_20}
+    )
+
+
+def upgrade_person_20(person):
+    """
+    Add citation_list to person eventref objects
+    """
+    (
+        handle,
+        gramps_id,
+        gender,
+        primary_name,
+        alternate_names,
+        death_ref_index,
+        birth_ref_index,
+        event_ref_list,
+        family_list,
+        parent_family_list,
+        media_list,
+        address_list,
+        attribute_list,
+        urls,
+        lds_seal_list,
+        citation_list,
+        note_list,
+        change,
+        tag_list,
+        private,
+        person_ref_list,
+    ) = person
+    if event_ref_list:
+        event_ref_list = upgrade_event_ref_list_20(event_ref_list)
+        new_person = (
             handle,
             gramps_id,
             gender,
@@ -96,42 +339,35 @@ def gramps_upgrade_20(self):
             tag_list,
             private,
             person_ref_list,
-        ) = person
-        if event_ref_list:
-            event_ref_list = upgrade_event_ref_list_20(event_ref_list)
-            new_person = (
-                handle,
-                gramps_id,
-                gender,
-                primary_name,
-                alternate_names,
-                death_ref_index,
-                birth_ref_index,
-                event_ref_list,
-                family_list,
-                parent_family_list,
-                media_list,
-                address_list,
-                attribute_list,
-                urls,
-                lds_seal_list,
-                citation_list,
-                note_list,
-                change,
-                tag_list,
-                private,
-                person_ref_list,
-            )
-            self._commit_raw(new_person, PERSON_KEY)
-        self.update()
+        )
+        return new_person
+    return None
 
-    # ----------------------------------------
-    # Modify Family
-    # ----------------------------------------
-    # Add citation_list to family eventref objects
-    for family_handle in self.get_family_handles():
-        family = self.get_raw_family_data(family_handle)
-        (
+
+def upgrade_family_20(family):
+    """
+    Add citation_list to family eventref objects
+    """
+    (
+        handle,
+        gramps_id,
+        father_handle,
+        mother_handle,
+        child_ref_list,
+        the_type,
+        event_ref_list,
+        media_list,
+        attribute_list,
+        lds_seal_list,
+        citation_list,
+        note_list,
+        change,
+        marker,
+        private,
+    ) = family
+    if event_ref_list:
+        event_ref_list = upgrade_event_ref_list_20(event_ref_list)
+        new_family = (
             handle,
             gramps_id,
             father_handle,
@@ -147,32 +383,9 @@ def gramps_upgrade_20(self):
             change,
             marker,
             private,
-        ) = family
-        if event_ref_list:
-            event_ref_list = upgrade_event_ref_list_20(event_ref_list)
-            new_family = (
-                handle,
-                gramps_id,
-                father_handle,
-                mother_handle,
-                child_ref_list,
-                the_type,
-                event_ref_list,
-                media_list,
-                attribute_list,
-                lds_seal_list,
-                citation_list,
-                note_list,
-                change,
-                marker,
-                private,
-            )
-            self._commit_raw(new_family, FAMILY_KEY)
-        self.update()
-
-    self._txn_commit()
-    # Bump up database version. Separate transaction to save metadata.
-    self._set_metadata("version", 20)
+        )
+        return new_family
+    return None
 
 
 def upgrade_event_ref_list_20(event_ref_list):
@@ -199,29 +412,20 @@ def gramps_upgrade_18(self):
     """
     Upgrade database from version 17 to 18.
     """
-    length = self.get_number_of_places()
-    self.set_total(length)
-    self._txn_begin()
+    self._upgrade_tables(18, {PLACE_KEY: upgrade_place_18})
 
-    # ---------------------------------
-    # Modify Place
-    # ---------------------------------
-    # Convert name fields to use PlaceName.
-    for handle in self.get_place_handles():
-        place = self.get_raw_place_data(handle)
-        new_place = list(place)
-        new_place[6] = (new_place[6], None, "")
-        alt_names = []
-        for name in new_place[7]:
-            alt_names.append((name, None, ""))
-        new_place[7] = alt_names
-        new_place = tuple(new_place)
-        self._commit_raw(new_place, PLACE_KEY)
-        self.update()
 
-    self._txn_commit()
-    # Bump up database version. Separate transaction to save metadata.
-    self._set_metadata("version", 18)
+def upgrade_place_18(place):
+    """
+    Convert name fields to use PlaceName.
+    """
+    new_place = list(place)
+    new_place[6] = (new_place[6], None, "")
+    alt_names = []
+    for name in new_place[7]:
+        alt_names.append((name, None, ""))
+    new_place[7] = alt_names
+    return tuple(new_place)
 
 
 def gramps_upgrade_17(self):
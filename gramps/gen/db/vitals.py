@@ -0,0 +1,170 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+Vital dates of people.
+
+The vitals of a person are the values of their birth, death, baptism and
+burial events that are needed to sort, filter and estimate the lives of
+people, so that they can be read without loading the events themselves.
+The birth and death are chosen as by
+:func:`~gramps.gen.utils.db.get_birth_or_fallback` and
+:func:`~gramps.gen.utils.db.get_death_or_fallback`.
+"""
+
+# ------------------------------------------------------------------------
+#
+# Python modules
+#
+# ------------------------------------------------------------------------
+from collections import namedtuple
+
+# ------------------------------------------------------------------------
+#
+# Gramps modules
+#
+# ------------------------------------------------------------------------
+from ..lib.date import Date
+from ..lib.eventtype import EventType
+from ..lib.eventroletype import EventRoleType
+
+# ------------------------------------------------------------------------
+#
+# Constants
+#
+# ------------------------------------------------------------------------
+VITALS = ("birth", "death", "baptism", "burial")
+
+_BAPTISM_TYPES = (EventType.BAPTISM, EventType.CHRISTEN)
+_BURIAL_TYPES = (EventType.BURIAL, EventType.CREMATION)
+
+# For the birth and death: the event handle, the sort value of the date,
+# the start and stop of the range the date may fall in, as sort values,
+# the place handle, and whether the event is a fallback.  For the baptism
+# and burial: the sort value.  Dates without a sort value are None.
+PersonVitals = namedtuple(
+    "PersonVitals",
+    [
+        "handle",
+        "gender",
+        "birth_handle",
+        "birth_sortval",
+        "birth_start",
+        "birth_stop",
+        "birth_place",
+        "birth_fallback",
+        "death_handle",
+        "death_sortval",
+        "death_start",
+        "death_stop",
+        "death_place",
+        "death_fallback",
+        "baptism_sortval",
+        "burial_sortval",
+        "event_count",
+    ],
+)
+
+
+# ------------------------------------------------------------------------
+#
+# Functions
+#
+# ------------------------------------------------------------------------
+def make_person_vitals(person, get_event):
+    """
+    Return the :class:`PersonVitals` of a person.
+
+    :param person: the person
+    :type person: :class:`~.person.Person`
+    :param get_event: function that returns the event with a handle, or None
+        if there is no such event
+    :type get_event: callable
+    """
+    primary = []
+    for event_ref in person.get_event_ref_list():
+        if event_ref.get_role() == EventRoleType.PRIMARY:
+            event = get_event(event_ref.ref)
+            if event:
+                primary.append(event)
+
+    birth = _get_vital(person.get_birth_ref(), primary, get_event, "birth")
+    death = _get_vital(person.get_death_ref(), primary, get_event, "death")
+    baptism = _get_first(primary, _BAPTISM_TYPES)
+    burial = _get_first(primary, _BURIAL_TYPES)
+    return PersonVitals(
+        person.handle,
+        person.get_gender(),
+        *birth,
+        *death,
+        _get_sortval(baptism),
+        _get_sortval(burial),
+        len(person.get_event_ref_list())
+    )
+
+
+def _get_vital(event_ref, primary, get_event, kind):
+    """
+    Return the values of the birth or death of a person, falling back to
+    the first primary event of a similar type.
+    """
+    event = get_event(event_ref.ref) if event_ref else None
+    fallback = event is None
+    if fallback:
+        for candidate in primary:
+            if getattr(candidate.get_type(), "is_%s_fallback" % kind)():
+                event = candidate
+                break
+        else:
+            return (None, None, None, None, None, False)
+    sortval = _get_sortval(event)
+    start = stop = None
+    if sortval is not None:
+        start, stop = event.get_date_object().get_start_stop_range()
+        start = Date(*start).sortval
+        stop = Date(*stop).sortval
+    return (
+        event.handle,
+        sortval,
+        start,
+        stop,
+        event.get_place_handle() or None,
+        fallback,
+    )
+
+
+def _get_first(events, types):
+    """
+    Return the first of the events with one of the types, or None.
+    """
+    for event in events:
+        if event.get_type() in types:
+            return event
+    return None
+
+
+def _get_sortval(event):
+    """
+    Return the sort value of the date of an event, or None if the event
+    has no regular date.
+    """
+    if event is None:
+        return None
+    return event.get_date_object().get_sort_value() or None
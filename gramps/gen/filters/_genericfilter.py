@@ -24,6 +24,13 @@
 Package providing filtering framework for Gramps.
 """
 
+# ------------------------------------------------------------------------
+#
+# Standard Python modules
+#
+# ------------------------------------------------------------------------
+from itertools import islice
+
 # ------------------------------------------------------------------------
 #
 # Gramps imports
@@ -39,11 +46,29 @@ from ..lib.repo import Repository
 from ..lib.media import Media
 from ..lib.note import Note
 from ..lib.tag import Tag
+from ..db.dbconst import ARRAYSIZE
 from ..const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.gettext
 
 
+def get_rule_sql(rule, obj_class):
+    """
+    Return the SQL condition of a rule, or None if it has none that can be
+    used.  A subclass that changes apply may not match the SQL of the class
+    it is derived from, so the condition is only used if it is defined by
+    the same class as apply.
+    """
+    for cls in type(rule).__mro__:
+        has_apply = "apply" in cls.__dict__
+        has_sql = "get_sql" in cls.__dict__
+        if has_apply or has_sql:
+            if has_apply and has_sql:
+                return rule.get_sql(obj_class)
+            return None
+    return None
+
+
 # -------------------------------------------------------------------------
 #
 # GenericFilter
@@ -135,9 +160,27 @@ class GenericFilter:
     def find_from_handle(self, db, handle):
         return db.get_person_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_people_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_people()
 
+    def iter_id_list(self, db, id_list, tupleind=None):
+        """
+        Iterate over (item, object) for the items in id_list, fetching the
+        objects from the database in batches.
+        """
+        id_iter = iter(id_list)
+        chunk = list(islice(id_iter, ARRAYSIZE))
+        while chunk:
+            if tupleind is None:
+                handles = chunk
+            else:
+                handles = [data[tupleind] for data in chunk]
+            yield from zip(chunk, self.find_from_handles(db, handles))
+            chunk = list(islice(id_iter, ARRAYSIZE))
+
     def check_func(self, db, id_list, task, user=None, tupleind=None, tree=False):
         final_list = []
         if user:
@@ -152,12 +195,7 @@ class GenericFilter:
                     if task(db, person) != self.invert:
                         final_list.append(handle)
         else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                person = self.find_from_handle(db, handle)
+            for data, person in self.iter_id_list(db, id_list, tupleind):
                 if user:
                     user.step_progress()
                 if task(db, person) != self.invert:
@@ -182,12 +220,7 @@ class GenericFilter:
                     if val != self.invert:
                         final_list.append(handle)
         else:
-            for data in id_list:
-                if tupleind is None:
-                    handle = data
-                else:
-                    handle = data[tupleind]
-                person = self.find_from_handle(db, handle)
+            for data, person in self.iter_id_list(db, id_list, tupleind):
                 if user:
                     user.step_progress()
                 val = all(rule.apply(db, person) for rule in flist if person)
@@ -234,6 +267,67 @@ class GenericFilter:
     def check(self, db, handle):
         return self.get_check_func()(db, [handle])
 
+    def check_sql(self, db, user=None):
+        """
+        Apply the filter with an SQL query on the secondary columns of the
+        database, and return the matching handles, or None if that cannot be
+        done.
+
+        The rules that can be expressed in SQL are combined with the logical
+        operator of the filter.  With the "and" operator, the other rules are
+        then applied to the objects that the query selects.
+        """
+        obj_class = self.make_obj().__class__.__name__
+        conditions = []
+        args = []
+        rest = []
+        for rule in self.flist:
+            sql = get_rule_sql(rule, obj_class)
+            if sql is None:
+                rest.append(rule)
+            else:
+                conditions.append("(%s)" % sql[0])
+                args.extend(sql[1])
+        if not conditions:
+            return None
+        logical_op = self.logical_op
+        if logical_op not in self.logical_functions:
+            logical_op = "and"
+        if rest and (logical_op != "and" or self.invert):
+            # The objects that the query leaves out could still match.
+            return None
+
+        if logical_op == "or":
+            where = " OR ".join(conditions)
+        elif logical_op in ("one", "xor"):
+            count = " + ".join(
+                "CASE WHEN %s THEN 1 ELSE 0 END" % condition for condition in conditions
+            )
+            if logical_op == "one":
+                where = "%s = 1" % count
+            else:
+                where = "(%s) %% 2 = 1" % count
+        else:
+            where = " AND ".join(conditions)
+        if self.invert:
+            where = "NOT (%s)" % where
+
+        handles = db.find_handles_where(obj_class, where, args)
+        if handles is None or not rest:
+            return handles
+
+        final_list = []
+        if user:
+            user.begin_progress(_("Filter"), _("Applying ..."), len(handles))
+        for handle, obj in self.iter_id_list(db, handles):
+            if user:
+                user.step_progress()
+            if all(rule.apply(db, obj) for rule in rest):
+                final_list.append(handle)
+        if user:
+            user.end_progress()
+        return final_list
+
     def apply(self, db, id_list=None, tupleind=None, user=None, tree=False):
         """
         Apply the filter using db.
@@ -254,7 +348,11 @@ class GenericFilter:
         m = self.get_check_func()
         for rule in self.flist:
             rule.requestprepare(db, user)
-        res = m(db, id_list, user, tupleind, tree)
+        res = None
+        if id_list is None and not tree:
+            res = self.check_sql(db, user)
+        if res is None:
+            res = m(db, id_list, user, tupleind, tree)
         for rule in self.flist:
             rule.requestreset()
         return res
@@ -273,6 +371,9 @@ class GenericFamilyFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_family_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_families_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_families()
 
@@ -290,6 +391,9 @@ class GenericEventFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_event_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_events_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_events()
 
@@ -307,6 +411,9 @@ class GenericSourceFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_source_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_sources_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_sources()
 
@@ -327,6 +434,9 @@ class GenericCitationFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_citation_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_citations_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_citations()
 
@@ -347,6 +457,9 @@ class GenericPlaceFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_place_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_places_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_places()
 
@@ -364,6 +477,9 @@ class GenericMediaFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_media_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_media_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_media()
 
@@ -381,6 +497,9 @@ class GenericRepoFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_repository_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_repositories_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_repositories()
 
@@ -398,6 +517,9 @@ class GenericNoteFilter(GenericFilter):
     def find_from_handle(self, db, handle):
         return db.get_note_from_handle(handle)
 
+    def find_from_handles(self, db, handles):
+        return db.get_notes_from_handles(handles)
+
     def get_number(self, db):
         return db.get_number_of_notes()
 
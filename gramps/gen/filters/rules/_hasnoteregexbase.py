@@ -51,8 +51,24 @@ class HasNoteRegexBase(Rule):
     category = _("General filters")
     allow_regex = True
 
+    def prepare(self, db, user):
+        # The handles of the notes that may match, if the database can tell.
+        self.note_handles = None
+        if self.list[0]:
+            if self.use_regex:
+                found = db.search_text(self.list[0], ["Note"], True, self.use_case)
+            else:
+                found = db.search_text(self.list[0], ["Note"])
+            if found is not None:
+                self.note_handles = {handle for obj_class, handle in found}
+
+    def reset(self):
+        self.note_handles = None
+
     def apply(self, db, person):
         for handle in person.get_note_list():
+            if self.note_handles is not None and handle not in self.note_handles:
+                continue
             note = db.get_note_from_handle(handle)
             if self.match_substring(0, note.get()):
                 return True
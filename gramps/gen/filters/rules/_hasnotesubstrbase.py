@@ -46,9 +46,22 @@ class HasNoteSubstrBase(Rule):
     description = "Matches objects whose notes contain text matching a " "substring"
     category = _("General filters")
 
+    def prepare(self, db, user):
+        # The handles of the notes that may match, if the database can tell.
+        self.note_handles = None
+        if self.list[0]:
+            found = db.search_text(self.list[0], ["Note"])
+            if found is not None:
+                self.note_handles = {handle for obj_class, handle in found}
+
+    def reset(self):
+        self.note_handles = None
+
     def apply(self, db, person):
         notelist = person.get_note_list()
         for notehandle in notelist:
+            if self.note_handles is not None and notehandle not in self.note_handles:
+                continue
             note = db.get_note_from_handle(notehandle)
             n = note.get()
             if n.upper().find(self.list[0].upper()) != -1:
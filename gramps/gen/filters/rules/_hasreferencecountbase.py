@@ -58,10 +58,7 @@ class HasReferenceCountBase(Rule):
         self.userSelectedCount = int(self.list[1])
 
     def apply(self, db, obj):
-        handle = obj.get_handle()
-        count = 0
-        for item in db.find_backlink_handles(handle):
-            count += 1
+        count = db.count_backlinks(obj.get_handle())
 
         if self.count_type == 0:  # "less than"
             return count < self.userSelectedCount
@@ -45,3 +45,6 @@ class IsPrivate(Rule):
 
     def apply(self, db, obj):
         return obj.get_privacy()
+
+    def get_sql(self, obj_class):
+        return ("private = 1", [])
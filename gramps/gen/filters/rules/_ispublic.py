@@ -42,3 +42,6 @@ class IsPublic(Rule):
 
     def apply(self, db, obj):
         return not obj.get_privacy()
+
+    def get_sql(self, obj_class):
+        return ("private = 0", [])
@@ -58,3 +58,6 @@ class RegExpIdBase(Rule):
 
     def apply(self, db, obj):
         return self.match_substring(0, obj.gramps_id)
+
+    def get_sql(self, obj_class):
+        return self.get_sql_substring(0, "gramps_id")
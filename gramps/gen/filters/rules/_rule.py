@@ -154,6 +154,39 @@ class Rule:
         """Apply the rule to some database entry; must be overwritten."""
         return True
 
+    def get_sql(self, obj_class):
+        """
+        Return an SQL condition on the secondary columns of the table being
+        filtered that is true for exactly the objects that the rule matches,
+        as a (condition, arguments) tuple, or None if the rule cannot be
+        expressed in SQL.
+
+        The condition may also use the reference table and the REGEXP
+        operator.  It is only used if the class that defines it also defines
+        the apply method.  It is called after prepare.
+
+        :param obj_class: class name of the objects being filtered
+        :type obj_class: str
+        """
+        return None
+
+    def get_sql_substring(self, param_index, column):
+        """
+        Return an SQL condition that is true where the column matches the
+        filter element indicated by param_index, in the same way as
+        match_substring.
+        """
+        if not self.list[param_index]:
+            return ("1 = 1", [])
+        if self.use_regex:
+            regex = self.regex[param_index]
+            pattern = regex.pattern
+            if regex.flags & re.IGNORECASE:
+                pattern = "(?i)" + pattern
+        else:
+            pattern = "(?i)" + re.escape(self.list[param_index])
+        return ("%s REGEXP ?" % column, [pattern])
+
     def display_values(self):
         """Return the labels and values of this rule."""
         l_v = (
@@ -68,9 +68,21 @@ class HasTextMatchingSubstringOf(Rule):
                 self.case_sensitive = False
         except IndexError:
             self.case_sensitive = False
+        self.cache_text_matches()
         self.cache_repos()
         self.cache_sources()
 
+    def cache_text_matches(self):
+        # The (class name, handle) of the objects that may match, if the
+        # database can tell.
+        self.text_matches = None
+        if self.list[0]:
+            found = self.db.search_text(
+                self.list[0], None, self.use_regex, self.case_sensitive
+            )
+            if found is not None:
+                self.text_matches = set(found)
+
     def reset(self):
         self.person_map.clear()
         self.event_map.clear()
@@ -79,6 +91,7 @@ class HasTextMatchingSubstringOf(Rule):
         self.family_map.clear()
         self.place_map.clear()
         self.media_map.clear()
+        self.text_matches = None
 
     def apply(self, db, person):
         if person.handle in self.person_map:  # Cached by matching Source?
@@ -176,6 +189,13 @@ class HasTextMatchingSubstringOf(Rule):
 
     def cache_repos(self):
         # search all matching repositories
+        if self.text_matches is not None:
+            for obj_class, handle in self.text_matches:
+                if obj_class == "Repository":
+                    repo = self.db.get_repository_from_handle(handle)
+                    if self.match_object(repo):
+                        self.repo_map.add(handle)
+            return
         self.repo_map.update(
             repo.handle
             for repo in self.db.iter_repositories()
@@ -239,6 +259,11 @@ class HasTextMatchingSubstringOf(Rule):
     def match_object(self, obj):
         if not obj:
             return False
+        if (
+            self.text_matches is not None
+            and (obj.__class__.__name__, obj.handle) not in self.text_matches
+        ):
+            return False
         if self.use_regex:
             return obj.matches_regexp(self.list[0], self.case_sensitive)
         return obj.matches_string(self.list[0], self.case_sensitive)
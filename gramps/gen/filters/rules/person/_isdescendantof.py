@@ -74,9 +74,4 @@ class IsDescendantOf(Rule):
             return
         if not first:
             self.map.add(person.handle)
-
-        for fam_id in person.get_family_handle_list():
-            fam = self.db.get_family_from_handle(fam_id)
-            if fam:
-                for child_ref in fam.get_child_ref_list():
-                    self.init_list(self.db.get_person_from_handle(child_ref.ref), 0)
+        self.map.update(self.db.get_descendant_handles(person.handle))
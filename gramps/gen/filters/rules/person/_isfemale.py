@@ -50,3 +50,6 @@ class IsFemale(Rule):
 
     def apply(self, db, person):
         return person.gender == Person.FEMALE
+
+    def get_sql(self, obj_class):
+        return ("gender = ?", [Person.FEMALE])
@@ -94,6 +94,7 @@ from ..person import (
     PeoplePublic,
     PersonWithIncompleteEvent,
     ProbablyAlive,
+    RegExpIdOf,
     RegExpName,
     RelationshipPathBetweenBookmarks,
 )
@@ -154,6 +155,30 @@ class BaseTest(unittest.TestCase):
         # print("%s: %.2f\n" % (rulename, perf_counter() - stime))
         return set(results)
 
+    def test_sql(self):
+        """
+        Test that filters applied with SQL match the same people as filters
+        applied to each person.
+        """
+        handles = list(self.db.iter_person_handles())
+        rule_lists = (
+            [IsMale([]), RegExpIdOf(["I00[0-4]"], use_regex=True)],
+            [IsFemale([]), HasIdOf(["I0044"]), PeoplePrivate([])],
+            [RegExpIdOf(["i01"]), HasUnknownGender([])],
+        )
+        for rules in rule_lists:
+            for l_op in ("and", "or", "one", "xor"):
+                for invert in (False, True):
+                    filter_ = GenericFilter()
+                    filter_.set_rules(rules)
+                    filter_.set_logical_op(l_op)
+                    filter_.set_invert(invert)
+                    self.assertEqual(
+                        set(filter_.apply(self.db)),
+                        set(filter_.apply(self.db, handles)),
+                        (rules, l_op, invert),
+                    )
+
     def test_Complex_1(self):
         """Test with two ancestor trees in base filter, and a complex
         'or' of a descendent tree, sibling of,"""
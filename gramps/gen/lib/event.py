@@ -45,6 +45,7 @@ from .attrbase import AttributeBase
 from .datebase import DateBase
 from .placebase import PlaceBase
 from .tagbase import TagBase
+from .lazybase import LazyBase
 from .eventtype import EventType
 from ..const import GRAMPS_LOCALE as glocale
 
@@ -59,7 +60,14 @@ LOG = logging.getLogger(".citation")
 #
 # -------------------------------------------------------------------------
 class Event(
-    CitationBase, NoteBase, MediaBase, AttributeBase, DateBase, PlaceBase, PrimaryObject
+    CitationBase,
+    NoteBase,
+    MediaBase,
+    AttributeBase,
+    DateBase,
+    PlaceBase,
+    LazyBase,
+    PrimaryObject,
 ):
     """
     The Event record is used to store information about some type of
@@ -73,6 +81,18 @@ class Event(
     Compare this with attribute: :class:`~.attribute.Attribute`
     """
 
+    _LAZY_ATTRIBUTES = {
+        "_Event__type": (
+            2,
+            lambda self, data: setattr(
+                self, "_Event__type", EventType().unserialize(data)
+            ),
+        ),
+        "date": (3, DateBase.unserialize),
+        "media_list": (8, MediaBase.unserialize),
+        "attribute_list": (9, AttributeBase.unserialize),
+    }
+
     def __init__(self, source=None):
         """
         Create a new Event instance, copying from the source if present.
@@ -225,6 +245,21 @@ class Event(
         TagBase.unserialize(self, tag_list)
         return self
 
+    def _unserialize_eager(self, data):
+        """
+        Set the attributes of a lazy Event that are not unserialized on
+        demand.
+        """
+        self.handle = data[0]
+        self.gramps_id = data[1]
+        self.__description = data[4]
+        self.place = data[5]
+        self.change = data[10]
+        self.private = data[12]
+        CitationBase.unserialize(self, data[6])
+        NoteBase.unserialize(self, data[7])
+        TagBase.unserialize(self, data[11])
+
     def _has_handle_reference(self, classname, handle):
         """
         Return True if the object has reference to a given handle of given
@@ -46,6 +46,7 @@ from .attrbase import AttributeBase
 from .eventref import EventRef
 from .ldsordbase import LdsOrdBase
 from .tagbase import TagBase
+from .lazybase import LazyBase
 from .childref import ChildRef
 from .familyreltype import FamilyRelType
 from .const import IDENTICAL, EQUAL, DIFFERENT
@@ -62,7 +63,13 @@ LOG = logging.getLogger(".citation")
 #
 # -------------------------------------------------------------------------
 class Family(
-    CitationBase, NoteBase, MediaBase, AttributeBase, LdsOrdBase, PrimaryObject
+    CitationBase,
+    NoteBase,
+    MediaBase,
+    AttributeBase,
+    LdsOrdBase,
+    LazyBase,
+    PrimaryObject,
 ):
     """
     The Family record is the Gramps in-memory representation of the
@@ -81,6 +88,28 @@ class Family(
     or the changes will be lost.
     """
 
+    _LAZY_ATTRIBUTES = {
+        "child_ref_list": (
+            4,
+            lambda self, data: setattr(
+                self, "child_ref_list", [ChildRef().unserialize(cr) for cr in data]
+            ),
+        ),
+        "type": (
+            5,
+            lambda self, data: setattr(self, "type", FamilyRelType().unserialize(data)),
+        ),
+        "event_ref_list": (
+            6,
+            lambda self, data: setattr(
+                self, "event_ref_list", [EventRef().unserialize(er) for er in data]
+            ),
+        ),
+        "media_list": (7, MediaBase.unserialize),
+        "attribute_list": (8, AttributeBase.unserialize),
+        "lds_ord_list": (9, LdsOrdBase.unserialize),
+    }
+
     def __init__(self):
         """
         Create a new Family instance.
@@ -248,6 +277,22 @@ class Family(
         TagBase.unserialize(self, tag_list)
         return self
 
+    def _unserialize_eager(self, data):
+        """
+        Set the attributes of a lazy Family that are not unserialized on
+        demand.
+        """
+        self.handle = data[0]
+        self.gramps_id = data[1]
+        self.father_handle = data[2]
+        self.mother_handle = data[3]
+        self.change = data[12]
+        self.private = data[14]
+        self.complete = 0
+        CitationBase.unserialize(self, data[10])
+        NoteBase.unserialize(self, data[11])
+        TagBase.unserialize(self, data[13])
+
     def _has_handle_reference(self, classname, handle):
         """
         Return True if the object has reference to a given handle of given
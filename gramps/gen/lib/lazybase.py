@@ -0,0 +1,90 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+"""
+LazyBase class for Gramps.
+"""
+
+
+# -------------------------------------------------------------------------
+#
+# LazyBase class
+#
+# -------------------------------------------------------------------------
+class LazyBase:
+    """
+    Base class for primary objects that can be created from serialized data
+    without unserializing their secondary objects.
+
+    A lazy object keeps the serialized data it was created from, until all
+    of its attributes are unserialized.  Simple values and handle lists are
+    set when it is created, and the attributes listed in _LAZY_ATTRIBUTES
+    are unserialized on first access.
+    """
+
+    # Attribute name -> (index in serialized data, unserialize function).
+    # The function is called with the object and the serialized value, and
+    # must set the attribute.
+    _LAZY_ATTRIBUTES = {}
+
+    @classmethod
+    def create_lazy(cls, data):
+        """
+        Create an object from serialized data, deferring the unserialization
+        of its secondary objects until they are accessed.
+
+        :param data: tuple created by the serialize method
+        :type data: tuple
+        :returns: Returns the new object, or None if there is no data.
+        """
+        if data:
+            obj = cls.__new__(cls)
+            obj._lazy_data = data
+            obj._unserialize_eager(data)
+            return obj
+
+    def _unserialize_eager(self, data):
+        """
+        Set the attributes that are not unserialized on demand.
+        """
+        raise NotImplementedError
+
+    def _unserialize_lazy(self):
+        """
+        Unserialize all of the attributes not yet accessed.
+        """
+        for name in self._LAZY_ATTRIBUTES:
+            getattr(self, name)
+        self.__dict__.pop("_lazy_data", None)
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails, which for a lazy object
+        # includes attributes that have not yet been unserialized.
+        data = self.__dict__.get("_lazy_data")
+        if data is None or name not in self._LAZY_ATTRIBUTES:
+            raise AttributeError(
+                "'%s' object has no attribute '%s'" % (self.__class__.__name__, name)
+            )
+        index, unserialize = self._LAZY_ATTRIBUTES[name]
+        unserialize(self, data[index])
+        if all(attr in self.__dict__ for attr in self._LAZY_ATTRIBUTES):
+            # Nothing is left to unserialize.
+            del self.__dict__["_lazy_data"]
+        return self.__dict__[name]
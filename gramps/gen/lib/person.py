@@ -39,6 +39,7 @@ from .addressbase import AddressBase
 from .ldsordbase import LdsOrdBase
 from .urlbase import UrlBase
 from .tagbase import TagBase
+from .lazybase import LazyBase
 from .name import Name
 from .eventref import EventRef
 from .personref import PersonRef
@@ -64,6 +65,7 @@ class Person(
     AddressBase,
     UrlBase,
     LdsOrdBase,
+    LazyBase,
     PrimaryObject,
 ):
     """
@@ -88,6 +90,36 @@ class Person(
     MALE = 1
     FEMALE = 0
 
+    _LAZY_ATTRIBUTES = {
+        "primary_name": (
+            3,
+            lambda self, data: setattr(self, "primary_name", Name().unserialize(data)),
+        ),
+        "alternate_names": (
+            4,
+            lambda self, data: setattr(
+                self, "alternate_names", [Name().unserialize(name) for name in data]
+            ),
+        ),
+        "event_ref_list": (
+            7,
+            lambda self, data: setattr(
+                self, "event_ref_list", [EventRef().unserialize(er) for er in data]
+            ),
+        ),
+        "media_list": (10, MediaBase.unserialize),
+        "address_list": (11, AddressBase.unserialize),
+        "attribute_list": (12, AttributeBase.unserialize),
+        "urls": (13, UrlBase.unserialize),
+        "lds_ord_list": (14, LdsOrdBase.unserialize),
+        "person_ref_list": (
+            20,
+            lambda self, data: setattr(
+                self, "person_ref_list", [PersonRef().unserialize(pr) for pr in data]
+            ),
+        ),
+    }
+
     def __init__(self, data=None):
         """
         Create a new Person instance.
@@ -320,6 +352,24 @@ class Person(
         TagBase.unserialize(self, tag_list)
         return self
 
+    def _unserialize_eager(self, data):
+        """
+        Set the attributes of a lazy Person that are not unserialized on
+        demand.
+        """
+        self.handle = data[0]
+        self.gramps_id = data[1]
+        self.__gender = data[2]
+        self.death_ref_index = data[5]
+        self.birth_ref_index = data[6]
+        self.family_list = data[8]
+        self.parent_family_list = data[9]
+        self.change = data[17]
+        self.private = data[19]
+        CitationBase.unserialize(self, data[15])
+        NoteBase.unserialize(self, data[16])
+        TagBase.unserialize(self, data[18])
+
     def _has_handle_reference(self, classname, handle):
         """
         Return True if the object has reference to a given handle of given
@@ -40,6 +40,7 @@ from .notebase import NoteBase
 from .mediabase import MediaBase
 from .urlbase import UrlBase
 from .tagbase import TagBase
+from .lazybase import LazyBase
 from .location import Location
 from ..const import GRAMPS_LOCALE as glocale
 
@@ -51,13 +52,46 @@ _ = glocale.translation.gettext
 # Place class
 #
 # -------------------------------------------------------------------------
-class Place(CitationBase, NoteBase, MediaBase, UrlBase, PrimaryObject):
+class Place(CitationBase, NoteBase, MediaBase, UrlBase, LazyBase, PrimaryObject):
     """
     Contains information related to a place, including multiple address
     information (since place names can change with time), longitude, latitude,
     a collection of images and URLs, a note and a source.
     """
 
+    _LAZY_ATTRIBUTES = {
+        "placeref_list": (
+            5,
+            lambda self, data: setattr(
+                self, "placeref_list", [PlaceRef().unserialize(pr) for pr in data]
+            ),
+        ),
+        "name": (
+            6,
+            lambda self, data: setattr(self, "name", PlaceName().unserialize(data)),
+        ),
+        "alt_names": (
+            7,
+            lambda self, data: setattr(
+                self, "alt_names", [PlaceName().unserialize(an) for an in data]
+            ),
+        ),
+        "place_type": (
+            8,
+            lambda self, data: setattr(
+                self, "place_type", PlaceType().unserialize(data)
+            ),
+        ),
+        "alt_loc": (
+            10,
+            lambda self, data: setattr(
+                self, "alt_loc", [Location().unserialize(al) for al in data]
+            ),
+        ),
+        "urls": (11, UrlBase.unserialize),
+        "media_list": (12, MediaBase.unserialize),
+    }
+
     def __init__(self, source=None):
         """
         Create a new Place object, copying from the source if present.
@@ -242,6 +276,23 @@ class Place(CitationBase, NoteBase, MediaBase, UrlBase, PrimaryObject):
         TagBase.unserialize(self, tag_list)
         return self
 
+    def _unserialize_eager(self, data):
+        """
+        Set the attributes of a lazy Place that are not unserialized on
+        demand.
+        """
+        self.handle = data[0]
+        self.gramps_id = data[1]
+        self.title = data[2]
+        self.long = data[3]
+        self.lat = data[4]
+        self.code = data[9]
+        self.change = data[15]
+        self.private = data[17]
+        CitationBase.unserialize(self, data[13])
+        NoteBase.unserialize(self, data[14])
+        TagBase.unserialize(self, data[16])
+
     def get_text_data_list(self):
         """
         Return the list of all textual attributes of the object.
@@ -35,6 +35,7 @@ import json
 #
 # ------------------------------------------------------------------------
 import gramps.gen.lib as lib
+from gramps.gen.lib.lazybase import LazyBase
 
 
 def __default(obj):
@@ -44,6 +45,8 @@ def __default(obj):
     if isinstance(obj, lib.Date):
         if obj.is_empty() and not obj.text:
             return None
+    if isinstance(obj, LazyBase):
+        obj._unserialize_lazy()
     for key, value in obj.__dict__.items():
         if not key.startswith("_"):
             obj_dict[key] = value
@@ -0,0 +1,99 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+""" Unittest for lazy primary objects """
+
+import os
+import json
+import unittest
+
+from .. import Person, Family, Event, Place, EventRef, EventType
+from ..serialize import to_json
+from ...db.utils import import_as_dict
+from ...const import DATA_DIR
+from ...user import User
+
+TEST_DIR = os.path.abspath(os.path.join(DATA_DIR, "tests"))
+EXAMPLE = os.path.join(TEST_DIR, "example.gramps")
+
+
+class LazyTest(unittest.TestCase):
+    def test_on_demand(self):
+        person = Person()
+        person.set_handle("H0001")
+        person.add_event_ref(EventRef())
+        lazy = Person.create_lazy(person.serialize())
+        self.assertNotIn("event_ref_list", lazy.__dict__)
+        self.assertEqual(lazy.get_handle(), "H0001")
+        self.assertEqual(len(lazy.get_event_ref_list()), 1)
+        self.assertIn("event_ref_list", lazy.__dict__)
+
+    def test_release_data(self):
+        lazy = Person.create_lazy(Person().serialize())
+        lazy.get_event_ref_list()
+        self.assertIn("_lazy_data", lazy.__dict__)
+        lazy.serialize()
+        self.assertNotIn("_lazy_data", lazy.__dict__)
+        lazy = Event.create_lazy(Event().serialize())
+        for name in Event._LAZY_ATTRIBUTES:
+            getattr(lazy, name)
+        self.assertNotIn("_lazy_data", lazy.__dict__)
+
+    def test_private_attribute(self):
+        event = Event()
+        event.set_type(EventType.BIRTH)
+        lazy = Event.create_lazy(event.serialize())
+        self.assertEqual(lazy.get_type(), EventType.BIRTH)
+
+    def test_assign_before_access(self):
+        lazy = Family.create_lazy(Family().serialize())
+        lazy.set_child_ref_list([])
+        self.assertEqual(lazy.serialize(), Family().serialize())
+
+    def test_missing_attribute(self):
+        lazy = Place.create_lazy(Place().serialize())
+        self.assertRaises(AttributeError, getattr, lazy, "no_such_attribute")
+
+    def test_no_data(self):
+        self.assertIsNone(Person.create_lazy(None))
+
+
+class DatabaseCheck(unittest.TestCase):
+    maxDiff = None
+
+    @classmethod
+    def setUpClass(cls):
+        cls.db = import_as_dict(EXAMPLE, User())
+
+    def test_example(self):
+        for obj_class in (Person, Family, Event, Place):
+            name = obj_class.__name__
+            for handle in self.db.method("get_%s_handles", name)():
+                data = self.db.method("get_raw_%s_data", name)(handle)
+                obj = obj_class.create(data)
+                self.assertEqual(obj_class.create_lazy(data).serialize(), data)
+                self.assertEqual(
+                    json.loads(to_json(obj_class.create_lazy(data))),
+                    json.loads(to_json(obj)),
+                )
+
+
+if __name__ == "__main__":
+    unittest.main()
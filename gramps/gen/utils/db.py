@@ -464,28 +464,18 @@ def for_each_ancestor(db, start, func, data):
     Exit and return 1, as soon as func returns true.
     Return 0 otherwise.
     """
-    todo = start
     done_ids = set()
-    while len(todo):
-        person_handle = todo.pop()
-        # Don't process the same handle twice.  This can happen
-        # if there is a cycle in the database, or if the
-        # initial list contains X and some of X's ancestors.
-        if person_handle in done_ids:
-            continue
-        if func(data, person_handle):
-            return 1
-        person = db.get_person_from_handle(person_handle)
-        for family_handle in person.get_parent_family_handle_list():
-            family = db.get_family_from_handle(family_handle)
-            if family:
-                father_handle = family.get_father_handle()
-                if father_handle:
-                    todo.append(father_handle)
-                mother_handle = family.get_mother_handle()
-                if mother_handle:
-                    todo.append(mother_handle)
-        done_ids.add(person_handle)
+    for start_handle in start:
+        ancestors = db.get_ancestor_handles(start_handle)
+        for person_handle in [start_handle] + sorted(ancestors, key=ancestors.get):
+            # Don't process the same handle twice.  This can happen
+            # if there is a cycle in the database, or if the
+            # initial list contains X and some of X's ancestors.
+            if person_handle in done_ids:
+                continue
+            if func(data, person_handle):
+                return 1
+            done_ids.add(person_handle)
     return 0
 
 
@@ -143,7 +143,7 @@ class DbLoader(CLIDbLoader):
             return ""
         return self.import_info.info_text()
 
-    def read_file(self, filename, username=None, password=None):
+    def read_file(self, filename, username=None, password=None, in_memory=False):
         """
         This method takes care of changing database, and loading the data.
         In 3.0 we only allow reading of real databases of filetype
@@ -156,6 +156,9 @@ class DbLoader(CLIDbLoader):
 
         On success, return with the disabled signals. The post-load routine
         should enable signals, as well as finish up with other UI goodies.
+
+        If in_memory is True, a read-only copy of the database in memory is
+        loaded.
         """
 
         if os.path.exists(filename):
@@ -202,6 +205,7 @@ class DbLoader(CLIDbLoader):
                         force_schema_upgrade,
                         username=username,
                         password=password,
+                        in_memory=in_memory,
                     )
                     if self.dbstate.is_open():
                         self.dbstate.db.close(
@@ -557,8 +561,8 @@ class GrampsImportFileDialog(ManagedWindow):
         self.uistate.progress.show()
         self.uistate.pulse_progressbar(0)
 
-    def _pulse_progress(self, value):
-        self.uistate.pulse_progressbar(value)
+    def _pulse_progress(self, value, text=None):
+        self.uistate.pulse_progressbar(value, text)
 
     def _end_progress(self):
         self.uistate.set_busy_cursor(False)
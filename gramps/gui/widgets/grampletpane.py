@@ -690,7 +690,10 @@ class GuiGramplet:
                     if event.button == 1:  # left mouse
                         if event.type == Gdk.EventType.DOUBLE_BUTTON_PRESS:
                             run_quick_report_by_name(
-                                self.dbstate, self.uistate, "samesurnames", handle
+                                self.dbstate,
+                                self.uistate,
+                                "samesurnames_misc",
+                                handle,
                             )
                     return True
                 elif link_type == "Given":
@@ -28,6 +28,10 @@ import os
 import time
 import pickle
 import logging
+import multiprocessing
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 
 # ------------------------------------------------------------------------
 #
@@ -39,6 +43,7 @@ from gramps.gen.db.dbconst import (
     DBBACKEND,
     KEY_TO_NAME_MAP,
     KEY_TO_CLASS_MAP,
+    CLASS_TO_KEY_MAP,
     TXNADD,
     TXNUPD,
     TXNDEL,
@@ -54,7 +59,9 @@ from gramps.gen.db.dbconst import (
     REPOSITORY_KEY,
     REFERENCE_KEY,
 )
+from gramps.gen.db.codec import encode, decode
 from gramps.gen.db.generic import DbGeneric
+from gramps.gen.db.vitals import VITALS, PersonVitals, make_person_vitals
 from gramps.gen.updatecallback import UpdateCallback
 from gramps.gen.lib import (
     Tag,
@@ -69,17 +76,198 @@ from gramps.gen.lib import (
     Note,
 )
 from gramps.gen.lib.genderstats import GenderStats
+from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 
+_ = glocale.translation.gettext
+
 LOG = logging.getLogger(".dbapi")
 _LOG = logging.getLogger(DBLOGNAME)
 
+# Maximum number of parameters bound in a single "IN (...)" clause
+MAX_SQL_PARAMS = 500
+
+PRIMARY_CLASSES = {
+    PERSON_KEY: Person,
+    FAMILY_KEY: Family,
+    EVENT_KEY: Event,
+    PLACE_KEY: Place,
+    REPOSITORY_KEY: Repository,
+    SOURCE_KEY: Source,
+    CITATION_KEY: Citation,
+    MEDIA_KEY: Media,
+    NOTE_KEY: Note,
+    TAG_KEY: Tag,
+}
+
+# Indexes of the reference table, as (name, table and columns)
+REFERENCE_INDEXES = (
+    ("reference_ref_handle", "reference(ref_handle)"),
+    ("reference_obj_handle", "reference(obj_handle)"),
+    ("reference_ref_class", "reference(ref_handle, obj_class, obj_handle)"),
+)
+
+# Text columns stored with their sort keys, as {table: ((column, key), ...)}
+SORT_KEY_COLUMNS = {
+    "person": (("surname", "surname_key"), ("given_name", "given_name_key")),
+    "place": (("title", "title_key"),),
+    "source": (("title", "title_key"),),
+}
+
+# Indexes of the secondary columns and tables, as (name, table and columns)
+SECONDARY_INDEXES = (
+    ("person_gramps_id", "person(gramps_id)"),
+    ("person_surname", "person(surname)"),
+    ("person_given_name", "person(given_name)"),
+    ("person_surname_key", "person(surname_key)"),
+    ("source_title", "source(title)"),
+    ("source_title_key", "source(title_key)"),
+    ("source_gramps_id", "source(gramps_id)"),
+    ("citation_page", "citation(page)"),
+    ("citation_gramps_id", "citation(gramps_id)"),
+    ("media_desc", "media(desc)"),
+    ("media_gramps_id", "media(gramps_id)"),
+    ("place_title", "place(title)"),
+    ("place_title_key", "place(title_key)"),
+    ("place_enclosed_by", "place(enclosed_by)"),
+    ("place_gramps_id", "place(gramps_id)"),
+    ("tag_name", "tag(name)"),
+    ("family_gramps_id", "family(gramps_id)"),
+    ("family_father_handle", "family(father_handle)"),
+    ("family_mother_handle", "family(mother_handle)"),
+    ("event_gramps_id", "event(gramps_id)"),
+    ("repository_gramps_id", "repository(gramps_id)"),
+    ("note_gramps_id", "note(gramps_id)"),
+    ("person_change", "person(change)"),
+    ("family_change", "family(change)"),
+    ("event_change", "event(change)"),
+    ("place_change", "place(change)"),
+    ("repository_change", "repository(change)"),
+    ("source_change", "source(change)"),
+    ("citation_change", "citation(change)"),
+    ("media_change", "media(change)"),
+    ("note_change", "note(change)"),
+    ("tag_change", "tag(change)"),
+    ("family_link_parent", "family_link(parent, child)"),
+    ("family_link_child", "family_link(child, parent)"),
+    ("family_link_family", "family_link(family)"),
+) + tuple(
+    ("person_vitals_%s" % vital, "person_vitals(%s_sortval)" % vital)
+    for vital in VITALS
+)
+
+
+def chunks(seq, size):
+    """
+    Split an iterable into lists of at most size items.
+    """
+    iterator = iter(seq)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+class BulkWriter:
+    """
+    Rows collected by :meth:`DBAPI.commit_many` for one chunk of objects.
+    """
+
+    def __init__(self):
+        self.old_data = {}  # (obj_key, handle) -> serialized data
+        self.existing = defaultdict(set)  # obj_key -> handles in the table
+        self.old_refs = defaultdict(set)  # handle -> {(ref_class, ref_handle)}
+        self.fields = {}  # obj_key -> list of column names
+        self.rows = defaultdict(dict)  # obj_key -> {handle: row}
+        self.references = {}  # handle -> (obj_class, {(ref_class, ref_handle)})
+        self.family_links = {}  # family handle -> list of family_link rows
+        self.text_data = {}  # handle -> text_data row
+        self.people = {}  # handle -> Person, for the person_vitals table
+        self.events = set()  # event handles, for the person_vitals table
+        self.changes = []  # changelog rows
+
+
+class RebuildChunk:
+    """
+    Rows derived from one chunk of the objects of a primary table, by
+    :meth:`DBAPI.reindex_reference_map` and :meth:`DBAPI.rebuild_secondary`.
+    """
+
+    def __init__(self, obj_key):
+        self.table = KEY_TO_NAME_MAP[obj_key]
+        self.references = []  # reference rows
+        self.fields = []  # names of the secondary columns
+        self.secondary = []  # secondary column values, then the handle
+        self.family_links = []  # family_link rows
+        self.text_data = []  # text_data rows
+        self.people = []  # serialized people, for the person_vitals table
+
+
+def get_rebuild_rows(obj_key, rows, references, secondary, text_index):
+    """
+    Decode a chunk of (handle, blob_data) rows of a primary table, and
+    return the :class:`RebuildChunk` of rows derived from them.
+
+    This runs in the worker processes of a rebuild, so it only uses its
+    arguments and the static methods of :class:`DBAPI`.
+    """
+    chunk = RebuildChunk(obj_key)
+    obj_class = PRIMARY_CLASSES[obj_key]
+    class_name = obj_class.__name__
+    for handle, blob in rows:
+        data = decode(blob)
+        obj = obj_class.create(data)
+        if references:
+            chunk.references.extend(
+                [handle, class_name, ref_handle, ref_class_name]
+                for ref_class_name, ref_handle in set(
+                    obj.get_referenced_handles_recursively()
+                )
+            )
+        if secondary:
+            chunk.fields, values = DBAPI._get_secondary_values(obj)
+            chunk.secondary.append(values + [handle])
+            if obj_key == FAMILY_KEY:
+                chunk.family_links.extend(DBAPI._get_family_links(obj))
+            elif obj_key == PERSON_KEY:
+                chunk.people.append(data)
+            if text_index:
+                chunk.text_data.append(DBAPI._get_text_data(obj))
+    return chunk
+
+
+def convert_rows(obj_key, rows, conversions):
+    """
+    Convert the serialized objects in a chunk of (handle, blob_data) rows of
+    a primary table for a schema upgrade, and return the [blob_data, handle]
+    rows of the objects that changed.
+
+    :param conversions: for each table key, a function that takes the
+        serialized data of an object and returns its new data, or None if it
+        is unchanged
+    :type conversions: dict
+    """
+    convert = conversions[obj_key]
+    changed = []
+    for handle, blob in rows:
+        data = convert(decode(blob))
+        if data is not None:
+            changed.append([encode(data), handle])
+    return changed
+
 
 class DBAPI(DbGeneric):
     """
     Database backends class for DB-API 2.0 databases
     """
 
+    def __init__(self, directory=None):
+        self._bulk = None
+        self._text_index = None
+        self._surname_counts = None
+        self._sort_key_collation = None
+        super().__init__(directory)
+
     def _initialize(self, directory, username, password):
         raise NotImplementedError
 
@@ -105,6 +293,8 @@ class DBAPI(DbGeneric):
             "handle VARCHAR(50) PRIMARY KEY NOT NULL, "
             "given_name TEXT, "
             "surname TEXT, "
+            "given_name_key TEXT, "
+            "surname_key TEXT, "
             "blob_data BLOB"
             ")"
         )
@@ -119,6 +309,7 @@ class DBAPI(DbGeneric):
             "CREATE TABLE source "
             "("
             "handle VARCHAR(50) PRIMARY KEY NOT NULL, "
+            "title_key TEXT, "
             "blob_data BLOB"
             ")"
         )
@@ -148,6 +339,7 @@ class DBAPI(DbGeneric):
             "("
             "handle VARCHAR(50) PRIMARY KEY NOT NULL, "
             "enclosed_by VARCHAR(50), "
+            "title_key TEXT, "
             "blob_data BLOB"
             ")"
         )
@@ -205,39 +397,155 @@ class DBAPI(DbGeneric):
             "unknown INTEGER"
             ")"
         )
-
-        self._create_secondary_columns()
-
-        ## Indices:
-        self.dbapi.execute("CREATE INDEX person_gramps_id " "ON person(gramps_id)")
-        self.dbapi.execute("CREATE INDEX person_surname " "ON person(surname)")
-        self.dbapi.execute("CREATE INDEX person_given_name " "ON person(given_name)")
-        self.dbapi.execute("CREATE INDEX source_title " "ON source(title)")
-        self.dbapi.execute("CREATE INDEX source_gramps_id " "ON source(gramps_id)")
-        self.dbapi.execute("CREATE INDEX citation_page " "ON citation(page)")
-        self.dbapi.execute("CREATE INDEX citation_gramps_id " "ON citation(gramps_id)")
-        self.dbapi.execute("CREATE INDEX media_desc " "ON media(desc)")
-        self.dbapi.execute("CREATE INDEX media_gramps_id " "ON media(gramps_id)")
-        self.dbapi.execute("CREATE INDEX place_title " "ON place(title)")
-        self.dbapi.execute("CREATE INDEX place_enclosed_by " "ON place(enclosed_by)")
-        self.dbapi.execute("CREATE INDEX place_gramps_id " "ON place(gramps_id)")
-        self.dbapi.execute("CREATE INDEX tag_name " "ON tag(name)")
         self.dbapi.execute(
-            "CREATE INDEX reference_ref_handle " "ON reference(ref_handle)"
+            "CREATE TABLE family_link "
+            "("
+            "parent VARCHAR(50), "
+            "child VARCHAR(50), "
+            "family VARCHAR(50), "
+            "rel_type INTEGER, "
+            "main_family INTEGER"
+            ")"
         )
-        self.dbapi.execute("CREATE INDEX family_gramps_id " "ON family(gramps_id)")
-        self.dbapi.execute("CREATE INDEX event_gramps_id " "ON event(gramps_id)")
         self.dbapi.execute(
-            "CREATE INDEX repository_gramps_id " "ON repository(gramps_id)"
+            "CREATE TABLE person_vitals "
+            "("
+            "handle VARCHAR(50) PRIMARY KEY NOT NULL, "
+            "gender INTEGER, "
+            "birth_handle VARCHAR(50), "
+            "birth_sortval INTEGER, "
+            "birth_start INTEGER, "
+            "birth_stop INTEGER, "
+            "birth_place VARCHAR(50), "
+            "birth_fallback INTEGER, "
+            "death_handle VARCHAR(50), "
+            "death_sortval INTEGER, "
+            "death_start INTEGER, "
+            "death_stop INTEGER, "
+            "death_place VARCHAR(50), "
+            "death_fallback INTEGER, "
+            "baptism_sortval INTEGER, "
+            "burial_sortval INTEGER, "
+            "event_count INTEGER"
+            ")"
         )
-        self.dbapi.execute("CREATE INDEX note_gramps_id " "ON note(gramps_id)")
+
         self.dbapi.execute(
-            "CREATE INDEX reference_obj_handle " "ON reference(obj_handle)"
+            "CREATE TABLE changelog "
+            "("
+            "obj_class TEXT, "
+            "handle VARCHAR(50), "
+            "op INTEGER, "
+            "time INTEGER"
+            ")"
         )
 
+        self._create_secondary_columns()
+
+        ## Indices:
+        self._create_indexes(SECONDARY_INDEXES)
+        self._create_indexes(REFERENCE_INDEXES)
+        self.dbapi.execute("CREATE INDEX changelog_time ON changelog(time)")
+
+        self._create_text_index()
+        self._create_object_counts()
+        self._create_surname_counts()
+
         self.dbapi.commit()
 
+    def _create_indexes(self, indexes):
+        """
+        Create the indexes that do not exist yet.  Does not commit.
+
+        :param indexes: (name, table and columns) of each index
+        :type indexes: tuple
+        """
+        for name, columns in indexes:
+            self.dbapi.execute("CREATE INDEX IF NOT EXISTS %s ON %s" % (name, columns))
+
+    def _drop_indexes(self, indexes):
+        """
+        Drop the indexes that exist.  Does not commit.
+
+        :param indexes: (name, table and columns) of each index
+        :type indexes: tuple
+        """
+        for name, _columns in indexes:
+            self.dbapi.execute("DROP INDEX IF EXISTS %s" % name)
+
+    def _create_text_index(self):
+        """
+        Create the text_data table, and a full-text index on it, if the
+        database supports one.  Does not commit.
+
+        The default implementation creates nothing, so :meth:`search_text`
+        returns None.
+        """
+
+    def _create_object_counts(self):
+        """
+        Create the object_count table, which holds the number of objects of
+        each primary class, and keep it up to date, if the database can do
+        so as part of each write.  Does not commit.
+
+        The default implementation creates nothing, so :meth:`read_summary`
+        returns None.
+        """
+
+    def _create_surname_counts(self):
+        """
+        Create the surname_count table, which holds the number of people
+        with each surname, and keep it up to date, if the database can do
+        so as part of each write.  Does not commit.
+
+        The default implementation creates nothing, so the surnames are
+        counted from the person table when they are asked for.
+        """
+
+    def _has_surname_counts(self):
+        """
+        Return True if the database has a surname_count table.
+        """
+        if self._surname_counts is None:
+            self._surname_counts = self.dbapi.table_exists("surname_count")
+        return self._surname_counts
+
+    def _get_surname_counts(self):
+        """
+        Return the table, or the query, to select the surnames and the
+        number of people with each one from.
+        """
+        if self._has_surname_counts():
+            return "surname_count"
+        return (
+            "(SELECT surname, COUNT(*) AS n FROM person "
+            "WHERE surname IS NOT NULL GROUP BY surname)"
+        )
+
+    def _executemany(self, sql, rows):
+        """
+        Execute an SQL statement for each row of arguments, with the
+        executemany method of the connection if it has one.
+        """
+        executemany = getattr(self.dbapi, "executemany", None)
+        if executemany is None:
+            for row in rows:
+                self.dbapi.execute(sql, row)
+        else:
+            executemany(sql, rows)
+
+    def _has_text_index(self):
+        """
+        Return True if the database has a full-text index to keep up to date.
+        """
+        if self._text_index is None:
+            self._text_index = self.dbapi.table_exists("text_index")
+        return self._text_index
+
     def _close(self):
+        self._text_index = None
+        self._surname_counts = None
+        self._sort_key_collation = None
         self.dbapi.close()
 
     def _txn_begin(self):
@@ -265,6 +573,7 @@ class DBAPI(DbGeneric):
         """
         if self.transaction == None:
             self.dbapi.rollback()
+            self.clear_cache()
 
     def _collation(self, locale):
         """
@@ -276,6 +585,43 @@ class DBAPI(DbGeneric):
             return locale.get_collation()
         return collation
 
+    def _has_sort_keys(self, locale):
+        """
+        Return True if the sort key columns hold the sort keys of the
+        collation of the locale, so that they can be sorted on instead of
+        the text columns.
+        """
+        return self._sort_key_collation == locale.get_collation()
+
+    def _check_sort_keys(self):
+        """
+        Rebuild the sort key columns if they were made for another collation
+        than the one of the current locale.
+        """
+        self._sort_key_collation = self._get_metadata("sort_key_collation", None)
+        collation = glocale.get_collation()
+        if self.readonly or self._sort_key_collation == collation:
+            return
+        LOG.debug("Rebuilding the sort keys for %s", collation)
+        self._txn_begin()
+        for table, columns in SORT_KEY_COLUMNS.items():
+            self.dbapi.execute(
+                "SELECT handle, %s FROM %s"
+                % (", ".join(column for column, key in columns), table)
+            )
+            rows = [
+                [glocale.sort_key(value or "") for value in row[1:]] + [row[0]]
+                for row in self.dbapi.fetchall()
+            ]
+            self._executemany(
+                "UPDATE %s SET %s WHERE handle = ?"
+                % (table, ", ".join("%s = ?" % key for column, key in columns)),
+                rows,
+            )
+        self._put_metadata("sort_key_collation", collation)
+        self._txn_commit()
+        self._sort_key_collation = collation
+
     def transaction_begin(self, transaction):
         """
         Transactions are handled automatically by the db layer.
@@ -305,27 +651,9 @@ class DBAPI(DbGeneric):
             txn.get_description(),
         )
 
-        action = {TXNADD: "-add", TXNUPD: "-update", TXNDEL: "-delete", None: "-delete"}
         self.dbapi.commit()
         if not txn.batch:
-            # Now, emit signals:
-            # do deletes and adds first
-            for trans_type in [TXNDEL, TXNADD, TXNUPD]:
-                for obj_type in range(11):
-                    if obj_type != REFERENCE_KEY and (obj_type, trans_type) in txn:
-                        if trans_type == TXNDEL:
-                            handles = [
-                                handle for (handle, data) in txn[(obj_type, trans_type)]
-                            ]
-                        else:
-                            handles = [
-                                handle
-                                for (handle, data) in txn[(obj_type, trans_type)]
-                                if (handle, None) not in txn[(obj_type, TXNDEL)]
-                            ]
-                        if handles:
-                            signal = KEY_TO_NAME_MAP[obj_type] + action[trans_type]
-                            self.emit(signal, (handles,))
+            self._emit_changes(txn.changes)
         self.transaction = None
         msg = txn.get_description()
         self.undodb.commit(txn, msg)
@@ -338,6 +666,7 @@ class DBAPI(DbGeneric):
         Executed after a batch operation abort.
         """
         self.dbapi.rollback()
+        self.clear_cache()
         self.transaction = None
         txn.clear()
         txn.first = None
@@ -369,6 +698,13 @@ class DBAPI(DbGeneric):
         value: item, will be serialized here
         """
         self._txn_begin()
+        self._put_metadata(key, value)
+        self._txn_commit()
+
+    def _put_metadata(self, key, value):
+        """
+        Store an item of metadata.  Does not commit.
+        """
         self.dbapi.execute("SELECT 1 FROM metadata WHERE setting = ?", [key])
         row = self.dbapi.fetchone()
         if row:
@@ -381,7 +717,6 @@ class DBAPI(DbGeneric):
                 "INSERT INTO metadata (setting, value) VALUES (?, ?)",
                 [key, pickle.dumps(value)],
             )
-        self._txn_commit()
 
     def get_name_group_keys(self):
         """
@@ -415,15 +750,16 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
-                "SELECT handle FROM person "
-                "ORDER BY surname "
-                'COLLATE "%s"' % self._collation(locale)
+            if self._has_sort_keys(locale):
+                order = "surname_key"
+            else:
+                order = 'surname COLLATE "%s"' % self._collation(locale)
+            handles = self._select_handles(
+                "SELECT handle FROM person ORDER BY " + order
             )
         else:
-            self.dbapi.execute("SELECT handle FROM person")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(PERSON_KEY)
+        return list(handles)
 
     def get_family_handles(self, sort_handles=False, locale=glocale):
         """
@@ -436,6 +772,11 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
+            if self._has_sort_keys(locale):
+                surname, given_name, collate = "surname_key", "given_name_key", ""
+            else:
+                surname, given_name = "surname", "given_name"
+                collate = 'COLLATE "%s"' % self._collation(locale)
             sql = (
                 "SELECT family.handle "
                 + "FROM family "
@@ -444,29 +785,26 @@ class DBAPI(DbGeneric):
                 + "LEFT JOIN person AS mother "
                 + "ON family.mother_handle = mother.handle "
                 + "ORDER BY (CASE WHEN father.handle IS NULL "
-                + "THEN mother.surname "
-                + "ELSE father.surname "
+                + "THEN mother.%s " % surname
+                + "ELSE father.%s " % surname
                 + "END), "
                 + "(CASE WHEN family.handle IS NULL "
-                + "THEN mother.given_name "
-                + "ELSE father.given_name "
+                + "THEN mother.%s " % given_name
+                + "ELSE father.%s " % given_name
                 + "END) "
-                + 'COLLATE "%s"' % self._collation(locale)
+                + collate
             )
-            self.dbapi.execute(sql)
+            handles = self._select_handles(sql)
         else:
-            self.dbapi.execute("SELECT handle FROM family")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(FAMILY_KEY)
+        return list(handles)
 
     def get_event_handles(self):
         """
         Return a list of database handles, one handle for each Event in the
         database.
         """
-        self.dbapi.execute("SELECT handle FROM event")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        return list(self._iter_handles(EVENT_KEY))
 
     def get_citation_handles(self, sort_handles=False, locale=glocale):
         """
@@ -479,15 +817,14 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._select_handles(
                 "SELECT handle FROM citation "
                 "ORDER BY page "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM citation")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(CITATION_KEY)
+        return list(handles)
 
     def get_source_handles(self, sort_handles=False, locale=glocale):
         """
@@ -500,15 +837,16 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
-                "SELECT handle FROM source "
-                "ORDER BY title "
-                'COLLATE "%s"' % self._collation(locale)
+            if self._has_sort_keys(locale):
+                order = "title_key"
+            else:
+                order = 'title COLLATE "%s"' % self._collation(locale)
+            handles = self._select_handles(
+                "SELECT handle FROM source ORDER BY " + order
             )
         else:
-            self.dbapi.execute("SELECT handle from source")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(SOURCE_KEY)
+        return list(handles)
 
     def get_place_handles(self, sort_handles=False, locale=glocale):
         """
@@ -521,24 +859,21 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
-                "SELECT handle FROM place "
-                "ORDER BY title "
-                'COLLATE "%s"' % self._collation(locale)
-            )
+            if self._has_sort_keys(locale):
+                order = "title_key"
+            else:
+                order = 'title COLLATE "%s"' % self._collation(locale)
+            handles = self._select_handles("SELECT handle FROM place ORDER BY " + order)
         else:
-            self.dbapi.execute("SELECT handle FROM place")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(PLACE_KEY)
+        return list(handles)
 
     def get_repository_handles(self):
         """
         Return a list of database handles, one handle for each Repository in
         the database.
         """
-        self.dbapi.execute("SELECT handle FROM repository")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        return list(self._iter_handles(REPOSITORY_KEY))
 
     def get_media_handles(self, sort_handles=False, locale=glocale):
         """
@@ -551,24 +886,21 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._select_handles(
                 "SELECT handle FROM media "
                 "ORDER BY desc "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM media")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(MEDIA_KEY)
+        return list(handles)
 
     def get_note_handles(self):
         """
         Return a list of database handles, one handle for each Note in the
         database.
         """
-        self.dbapi.execute("SELECT handle FROM note")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+        return list(self._iter_handles(NOTE_KEY))
 
     def get_tag_handles(self, sort_handles=False, locale=glocale):
         """
@@ -581,15 +913,14 @@ class DBAPI(DbGeneric):
         :type locale: A GrampsLocale object.
         """
         if sort_handles:
-            self.dbapi.execute(
+            handles = self._select_handles(
                 "SELECT handle FROM tag "
                 "ORDER BY name "
                 'COLLATE "%s"' % self._collation(locale)
             )
         else:
-            self.dbapi.execute("SELECT handle FROM tag")
-        rows = self.dbapi.fetchall()
-        return [row[0] for row in rows]
+            handles = self._iter_handles(TAG_KEY)
+        return list(handles)
 
     def get_tag_from_name(self, name):
         """
@@ -600,7 +931,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute("SELECT blob_data FROM tag WHERE name = ?", [name])
         row = self.dbapi.fetchone()
         if row:
-            return Tag.create(pickle.loads(row[0]))
+            return Tag.create(decode(row[0]))
         return None
 
     def _get_number_of(self, obj_key):
@@ -646,29 +977,201 @@ class DBAPI(DbGeneric):
         Commit the specified object to the database, storing the changes as
         part of the transaction.
         """
-        old_data = None
         obj.change = int(change_time or time.time())
         table = KEY_TO_NAME_MAP[obj_key]
+        data = obj.serialize()
+        blob = encode(data)
 
-        if self._has_handle(obj_key, obj.handle):
-            old_data = self._get_raw_data(obj_key, obj.handle)
-            # update the object:
-            sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql, [pickle.dumps(obj.serialize()), obj.handle])
+        if self._bulk is not None:
+            old_data = self._bulk_commit(obj, obj_key, data, blob, trans)
+            self._cache_update(obj_key, obj.handle, blob)
         else:
-            # Insert the object:
-            sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql, [obj.handle, pickle.dumps(obj.serialize())])
-        self._update_secondary_values(obj)
-        self._update_backlinks(obj, trans)
+            old_data = self._get_raw_data(obj_key, obj.handle)
+            if old_data:
+                # update the object:
+                sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
+                self.dbapi.execute(sql, [blob, obj.handle])
+            else:
+                # Insert the object:
+                sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
+                self.dbapi.execute(sql, [obj.handle, blob])
+            # The person_vitals rows are worked out from the cached events.
+            self._cache_update(obj_key, obj.handle, blob)
+            self._update_secondary_values(obj)
+            self._update_backlinks(obj, trans)
+            if obj_key == EVENT_KEY:
+                self._update_event_vitals([obj.handle])
+            self._log_change(
+                obj_key, obj.handle, TXNUPD if old_data else TXNADD, obj.change
+            )
+        self._update_gramps_id(obj_key, old_data, data)
         if not trans.batch:
             if old_data:
-                trans.add(obj_key, TXNUPD, obj.handle, old_data, obj.serialize())
+                trans.add(obj_key, TXNUPD, obj.handle, old_data, data)
             else:
-                trans.add(obj_key, TXNADD, obj.handle, None, obj.serialize())
+                trans.add(obj_key, TXNADD, obj.handle, None, data)
 
         return old_data
 
+    def commit_many(self, objs, trans, change_time=None):
+        """
+        Commit a sequence of primary objects to the database, storing the
+        changes as part of the transaction.
+
+        The objects are processed in chunks of "database.bulk-chunk-size".
+        For each chunk the existing data is read with one query per table,
+        and the objects, their secondary columns and their references are
+        written with executemany.  The objects are taken from the sequence
+        one chunk at a time, so it may be a generator that reads from the
+        database.
+        """
+        chunk_size = max(1, config.get("database.bulk-chunk-size"))
+        for chunk in chunks(objs, chunk_size):
+            self._bulk = BulkWriter()
+            try:
+                self._bulk_prefetch(chunk, trans)
+                super().commit_many(chunk, trans, change_time)
+                self._bulk_flush()
+            finally:
+                self._bulk = None
+
+    def _bulk_prefetch(self, objs, trans):
+        """
+        Read the current data, and references if they are needed for undo,
+        of a chunk of objects about to be committed.
+        """
+        handles = defaultdict(list)
+        for obj in objs:
+            handles[CLASS_TO_KEY_MAP[obj.__class__.__name__]].append(obj.handle)
+        for obj_key, key_handles in handles.items():
+            for handle, blob in self._get_raw_blobs(obj_key, key_handles):
+                self._bulk.old_data[(obj_key, handle)] = decode(blob)
+                self._bulk.existing[obj_key].add(handle)
+        if not trans.batch:
+            all_handles = [obj.handle for obj in objs]
+            for chunk in chunks(all_handles, MAX_SQL_PARAMS):
+                self.dbapi.execute(
+                    "SELECT obj_handle, ref_class, ref_handle FROM reference "
+                    "WHERE obj_handle IN (%s)" % ", ".join("?" * len(chunk)),
+                    chunk,
+                )
+                for obj_handle, ref_class, ref_handle in self.dbapi.fetchall():
+                    self._bulk.old_refs[obj_handle].add((ref_class, ref_handle))
+
+    def _bulk_commit(self, obj, obj_key, data, blob, trans):
+        """
+        Queue an object for the next bulk write, and return its old data.
+        """
+        bulk = self._bulk
+        old_data = bulk.old_data.get((obj_key, obj.handle))
+        bulk.old_data[(obj_key, obj.handle)] = data
+
+        fields, values = self._get_secondary_values(obj)
+        bulk.fields[obj_key] = fields
+        bulk.rows[obj_key][obj.handle] = [obj.handle, blob] + values
+
+        current_references = set(obj.get_referenced_handles_recursively())
+        if not trans.batch:
+            self._add_reference_changes(
+                obj, bulk.old_refs[obj.handle], current_references, trans
+            )
+        bulk.old_refs[obj.handle] = current_references
+        bulk.references[obj.handle] = (obj.__class__.__name__, current_references)
+        if obj_key == FAMILY_KEY:
+            bulk.family_links[obj.handle] = self._get_family_links(obj)
+        if self._has_text_index():
+            bulk.text_data[obj.handle] = self._get_text_data(obj)
+        if obj_key == PERSON_KEY:
+            bulk.people[obj.handle] = obj
+        elif obj_key == EVENT_KEY:
+            bulk.events.add(obj.handle)
+        bulk.changes.append(
+            [
+                obj.__class__.__name__,
+                obj.handle,
+                TXNUPD if old_data else TXNADD,
+                obj.change,
+            ]
+        )
+        return old_data
+
+    def _bulk_flush(self):
+        """
+        Write the queued objects, secondary columns and references.
+        """
+        for obj_key, rows in self._bulk.rows.items():
+            self._write_rows(
+                KEY_TO_NAME_MAP[obj_key],
+                ["handle", "blob_data"] + self._bulk.fields[obj_key],
+                list(rows.values()),
+                self._bulk.existing[obj_key],
+            )
+
+        references = self._bulk.references
+        self._executemany(
+            "DELETE FROM reference WHERE obj_handle = ?",
+            [[handle] for handle in references],
+        )
+        self._executemany(
+            "INSERT INTO reference "
+            "(obj_handle, obj_class, ref_handle, ref_class) "
+            "VALUES (?, ?, ?, ?)",
+            [
+                [handle, obj_class, ref_handle, ref_class_name]
+                for handle, (obj_class, refs) in references.items()
+                for ref_class_name, ref_handle in refs
+            ],
+        )
+
+        family_links = self._bulk.family_links
+        if family_links:
+            self._executemany(
+                "DELETE FROM family_link WHERE family = ?",
+                [[handle] for handle in family_links],
+            )
+            self._insert_family_links(
+                [row for rows in family_links.values() for row in rows]
+            )
+        self._set_main_families(self._bulk.people.values())
+
+        text_data = self._bulk.text_data
+        if text_data:
+            self._executemany(
+                "DELETE FROM text_data WHERE handle = ? AND obj_class = ?",
+                [row[1::-1] for row in text_data.values()],
+            )
+            self._executemany(
+                "INSERT INTO text_data (obj_class, handle, text) VALUES (?, ?, ?)",
+                list(text_data.values()),
+            )
+
+        self._executemany(
+            "INSERT INTO changelog (obj_class, handle, op, time) VALUES (?, ?, ?, ?)",
+            self._bulk.changes,
+        )
+
+        # The events are now written, so the vitals can be worked out.
+        people = self._bulk.people
+        self._update_person_vitals(people.values())
+        self._update_event_vitals(self._bulk.events, exclude=people)
+
+    def _write_rows(self, table, fields, rows, existing):
+        """
+        Write rows to a primary table.  The first field is the handle, the
+        rows whose handle is in existing update the table, and the others
+        are inserted.
+        """
+        self._executemany(
+            "UPDATE %s SET %s WHERE handle = ?"
+            % (table, ", ".join("%s = ?" % field for field in fields[1:])),
+            [row[1:] + row[:1] for row in rows if row[0] in existing],
+        )
+        self._executemany(
+            "INSERT INTO %s (%s) VALUES (%s)"
+            % (table, ", ".join(fields), ", ".join("?" * len(fields))),
+            [row for row in rows if row[0] not in existing],
+        )
+
     def _commit_raw(self, data, obj_key):
         """
         Commit a serialized primary object to the database, storing the
@@ -676,19 +1179,22 @@ class DBAPI(DbGeneric):
         """
         table = KEY_TO_NAME_MAP[obj_key]
         handle = data[0]
+        blob = encode(data)
 
         if self._has_handle(obj_key, handle):
             # update the object:
             sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-            self.dbapi.execute(sql, [pickle.dumps(data), handle])
+            self.dbapi.execute(sql, [blob, handle])
         else:
             # Insert the object:
             sql = ("INSERT INTO %s (handle, blob_data) VALUES (?, ?)") % table
-            self.dbapi.execute(sql, [handle, pickle.dumps(data)])
+            self.dbapi.execute(sql, [handle, blob])
+        self._cache_update(obj_key, handle, blob)
 
         return
 
     def _update_backlinks(self, obj, transaction):
+        current_references = set(obj.get_referenced_handles_recursively())
         if not transaction.batch:
             # Find existing references
             sql = (
@@ -696,68 +1202,54 @@ class DBAPI(DbGeneric):
             )
             self.dbapi.execute(sql, [obj.handle])
             existing_references = set(self.dbapi.fetchall())
-
-            # Once we have the list of rows that already have a reference
-            # we need to compare it with the list of objects that are
-            # still references from the primary object.
-            current_references = set(obj.get_referenced_handles_recursively())
-            no_longer_required_references = existing_references.difference(
-                current_references
+            self._add_reference_changes(
+                obj, existing_references, current_references, transaction
             )
-            new_references = current_references.difference(existing_references)
 
-            # Delete the existing references
-            self.dbapi.execute(
-                "DELETE FROM reference WHERE obj_handle = ?", [obj.handle]
-            )
+        # Delete the existing references
+        self.dbapi.execute("DELETE FROM reference WHERE obj_handle = ?", [obj.handle])
+
+        # Now, add the current ones
+        self._executemany(
+            "INSERT INTO reference "
+            + "(obj_handle, obj_class, ref_handle, ref_class)"
+            + "VALUES(?, ?, ?, ?)",
+            [
+                [obj.handle, obj.__class__.__name__, ref_handle, ref_class_name]
+                for ref_class_name, ref_handle in current_references
+            ],
+        )
 
-            # Now, add the current ones
-            for ref_class_name, ref_handle in current_references:
-                sql = (
-                    "INSERT INTO reference "
-                    + "(obj_handle, obj_class, ref_handle, ref_class)"
-                    + "VALUES(?, ?, ?, ?)"
-                )
-                self.dbapi.execute(
-                    sql,
-                    [obj.handle, obj.__class__.__name__, ref_handle, ref_class_name],
-                )
+    def _add_reference_changes(
+        self, obj, existing_references, current_references, transaction
+    ):
+        """
+        Add the references that an object gained or lost to the transaction.
+        """
+        # Once we have the list of rows that already have a reference
+        # we need to compare it with the list of objects that are
+        # still references from the primary object.
+        no_longer_required_references = existing_references.difference(
+            current_references
+        )
+        new_references = current_references.difference(existing_references)
 
-            # Add new references to the transaction
-            for ref_class_name, ref_handle in new_references:
-                key = (obj.handle, ref_handle)
-                data = (obj.handle, obj.__class__.__name__, ref_handle, ref_class_name)
-                transaction.add(REFERENCE_KEY, TXNADD, key, None, data)
-
-            # Add old references to the transaction
-            for ref_class_name, ref_handle in no_longer_required_references:
-                key = (obj.handle, ref_handle)
-                old_data = (
-                    obj.handle,
-                    obj.__class__.__name__,
-                    ref_handle,
-                    ref_class_name,
-                )
-                transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
-        else:  # batch mode
-            current_references = set(obj.get_referenced_handles_recursively())
+        # Add new references to the transaction
+        for ref_class_name, ref_handle in new_references:
+            key = (obj.handle, ref_handle)
+            data = (obj.handle, obj.__class__.__name__, ref_handle, ref_class_name)
+            transaction.add(REFERENCE_KEY, TXNADD, key, None, data)
 
-            # Delete the existing references
-            self.dbapi.execute(
-                "DELETE FROM reference WHERE obj_handle = ?", [obj.handle]
+        # Add old references to the transaction
+        for ref_class_name, ref_handle in no_longer_required_references:
+            key = (obj.handle, ref_handle)
+            old_data = (
+                obj.handle,
+                obj.__class__.__name__,
+                ref_handle,
+                ref_class_name,
             )
-
-            # Now, add the current ones
-            for ref_class_name, ref_handle in current_references:
-                sql = (
-                    "INSERT INTO reference "
-                    + "(obj_handle, obj_class, ref_handle, ref_class)"
-                    + "VALUES(?, ?, ?, ?)"
-                )
-                self.dbapi.execute(
-                    sql,
-                    [obj.handle, obj.__class__.__name__, ref_handle, ref_class_name],
-                )
+            transaction.add(REFERENCE_KEY, TXNDEL, key, old_data, None)
 
     def _do_remove(self, handle, transaction, obj_key):
         if self.readonly or not handle:
@@ -769,6 +1261,10 @@ class DBAPI(DbGeneric):
             table = KEY_TO_NAME_MAP[obj_key]
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
+            self._cache_update(obj_key, handle)
+            self._update_gramps_id(obj_key, data, None)
+            self._remove_secondary_rows(obj_key, handle)
+            self._log_change(obj_key, handle, TXNDEL)
             if not transaction.batch:
                 transaction.add(obj_key, TXNDEL, handle, data, None)
 
@@ -808,14 +1304,69 @@ class DBAPI(DbGeneric):
 
             result_list = list(find_backlink_handles(handle))
         """
+        condition, class_args = self._get_class_condition(include_classes)
         self.dbapi.execute(
-            "SELECT obj_class, obj_handle " "FROM reference " "WHERE ref_handle = ?",
-            [handle],
+            "SELECT obj_class, obj_handle FROM reference WHERE ref_handle = ?"
+            + condition,
+            [handle] + class_args,
         )
         rows = self.dbapi.fetchall()
         for row in rows:
-            if (include_classes is None) or (row[0] in include_classes):
-                yield (row[0], row[1])
+            yield (row[0], row[1])
+
+    def count_backlinks(self, handle, include_classes=None):
+        """
+        Return the number of objects that hold a reference to the object
+        handle.
+
+        :param handle: handle of the object to search for.
+        :type handle: database handle
+        :param include_classes: list of class names to include in the count.
+            Default: None means include all classes.
+        :type include_classes: list of class names
+        """
+        condition, class_args = self._get_class_condition(include_classes)
+        self.dbapi.execute(
+            "SELECT COUNT(*) FROM reference WHERE ref_handle = ?" + condition,
+            [handle] + class_args,
+        )
+        return self.dbapi.fetchone()[0]
+
+    def count_backlinks_many(self, handles, include_classes=None):
+        """
+        Return a dictionary mapping each of the object handles to the number
+        of objects that hold a reference to it.
+
+        :param handles: handles of the objects to search for.
+        :type handles: list of database handles
+        :param include_classes: list of class names to include in the counts.
+            Default: None means include all classes.
+        :type include_classes: list of class names
+        """
+        counts = dict.fromkeys(handles, 0)
+        condition, class_args = self._get_class_condition(include_classes)
+        size = max(MAX_SQL_PARAMS - len(class_args), 1)
+        for chunk in chunks(counts, size):
+            sql = (
+                "SELECT ref_handle, COUNT(*) FROM reference "
+                "WHERE ref_handle IN (%s)%s "
+                "GROUP BY ref_handle" % (", ".join(["?"] * len(chunk)), condition)
+            )
+            self.dbapi.execute(sql, chunk + class_args)
+            for row in self.dbapi.fetchall():
+                counts[row[0]] = row[1]
+        return counts
+
+    def _get_class_condition(self, include_classes):
+        """
+        Return the SQL condition, and its arguments, that restricts reference
+        rows to those held by objects of the given classes.
+        """
+        if include_classes is None:
+            return "", []
+        include_classes = list(include_classes)
+        condition = " AND obj_class IN (%s)" % ", ".join(["?"] * len(include_classes))
+        return condition, include_classes
 
     def find_initial_person(self):
         """
@@ -838,11 +1389,46 @@ class DBAPI(DbGeneric):
         """
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT handle FROM %s" % table
-        self.dbapi.execute(sql)
-        rows = self.dbapi.fetchall()
-        for row in rows:
+        return self._select_handles(sql)
+
+    def _select_handles(self, sql, *args):
+        """
+        Return an iterator over the handles selected by a query, fetching
+        them in batches with a dedicated cursor.
+        """
+        for row in self._select_rows(sql, *args):
             yield row[0]
 
+    def _select_rows(self, sql, *args):
+        """
+        Return an iterator over the rows selected by a query, fetching them
+        in batches with a dedicated cursor.
+        """
+        with self.dbapi.cursor() as cursor:
+            cursor.execute(sql, *args)
+            rows = cursor.fetchmany()
+            while rows:
+                yield from rows
+                rows = cursor.fetchmany()
+
+    def _get_handles_page(self, obj_key, after, limit):
+        """
+        Return the first limit handles of a table, in handle order, that
+        sort after the given handle.  Uses the primary key index.
+        """
+        table = KEY_TO_NAME_MAP[obj_key]
+        if after is None:
+            sql = "SELECT handle FROM %s ORDER BY handle LIMIT ?" % table
+            self.dbapi.execute(sql, [limit])
+        else:
+            sql = (
+                "SELECT handle FROM %s WHERE handle > ? "
+                "ORDER BY handle LIMIT ?" % table
+            )
+            self.dbapi.execute(sql, [after, limit])
+        rows = self.dbapi.fetchall()
+        return [row[0] for row in rows]
+
     def _iter_raw_data(self, obj_key):
         """
         Return an iterator over raw data in the database.
@@ -854,7 +1440,7 @@ class DBAPI(DbGeneric):
             rows = cursor.fetchmany()
             while rows:
                 for row in rows:
-                    yield (row[0], pickle.loads(row[1]))
+                    yield (row[0], decode(row[1]))
                 rows = cursor.fetchmany()
 
     def _iter_raw_place_tree_data(self):
@@ -869,115 +1455,276 @@ class DBAPI(DbGeneric):
             rows = self.dbapi.fetchall()
             for row in rows:
                 to_do.append(row[0])
-                yield (row[0], pickle.loads(row[1]))
+                yield (row[0], decode(row[1]))
+
+    def _iter_raw_blob_pages(self, obj_key, size, after=""):
+        """
+        Return an iterator over the (handle, blob_data) rows of a primary
+        table in handle order, starting after the given handle, as lists of
+        at most size rows.  Each list is read with its own query, so the
+        table may be written in between.
+        """
+        table = KEY_TO_NAME_MAP[obj_key]
+        sql = (
+            "SELECT handle, blob_data FROM %s WHERE handle > ? "
+            "ORDER BY handle LIMIT ?" % table
+        )
+        while True:
+            self.dbapi.execute(sql, [after, size])
+            rows = self.dbapi.fetchall()
+            if not rows:
+                break
+            yield rows
+            after = rows[-1][0]
+
+    def _warm_cache(self):
+        """
+        Fill the object cache with the objects it can hold, in handle order.
+        """
+        for obj_key, cache in self._cache.items():
+            if cache.count > 1:
+                pages = self._iter_raw_blob_pages(obj_key, cache.count)
+                for handle, blob in next(pages, []):
+                    cache[handle] = blob
+
+    def _iter_page_results(self, obj_keys, func, args, after=None):
+        """
+        Return an iterator over the pages of rows of primary tables, as
+        (obj_key, handle of the last row, func(obj_key, rows, *args)).
+
+        The pages hold "database.bulk-chunk-size" rows, in handle order.  If
+        there is more than one page, func is run by a pool of
+        "database.rebuild-processes" worker processes, or one for each CPU
+        if that is 0, so it must be picklable.  The progress and the
+        throughput are reported through the callback set up with
+        :class:`~.UpdateCallback`.
+
+        :param obj_keys: keys of the tables, in the order to read them
+        :type obj_keys: list
+        :param after: (obj_key, handle) of the last row already done, to
+            resume from, or None to start at the beginning
+        :type after: tuple
+        """
+        obj_keys = list(obj_keys)
+        if after:
+            obj_keys = obj_keys[obj_keys.index(after[0]) :]
+        size = max(1, config.get("database.bulk-chunk-size"))
+        total = sum(self._get_number_of(obj_key) for obj_key in obj_keys)
+        self.set_total(total)
+
+        processes = config.get("database.rebuild-processes") or os.cpu_count() or 1
+        executor = None
+        if processes > 1 and total > size:
+            try:
+                executor = ProcessPoolExecutor(
+                    processes, mp_context=multiprocessing.get_context("spawn")
+                )
+            except OSError as err:
+                LOG.warning("Running without worker processes: %s", err)
+
+        count = 0
+        start = time.perf_counter()
+        try:
+            for obj_key in obj_keys:
+                LOG.info("Processing %s rows", KEY_TO_NAME_MAP[obj_key])
+                first = after[1] if after and after[0] == obj_key else ""
+                for rows, result in self._iter_mapped_pages(
+                    self._iter_raw_blob_pages(obj_key, size, first),
+                    executor,
+                    2 * processes,
+                    func,
+                    obj_key,
+                    args,
+                ):
+                    yield obj_key, rows[-1][0], result
+                    count += len(rows)
+                    rate = count / max(time.perf_counter() - start, 1e-6)
+                    self.set_text(_("%d objects per second") % rate)
+                    self.update(count)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        LOG.info(
+            "Processed %d rows in %.1f seconds", count, time.perf_counter() - start
+        )
+
+    def _iter_mapped_pages(self, pages, executor, window, func, obj_key, args):
+        """
+        Return an iterator over (rows, func(obj_key, rows, *args)) for each
+        page of rows, in order.  With an executor, at most window pages are
+        read ahead of the one returned.
+        """
+        if executor is None:
+            for rows in pages:
+                yield rows, func(obj_key, rows, *args)
+            return
+        pending = deque()
+        for rows in pages:
+            pending.append((rows, executor.submit(func, obj_key, rows, *args)))
+            if len(pending) > window:
+                rows, future = pending.popleft()
+                yield rows, future.result()
+        while pending:
+            rows, future = pending.popleft()
+            yield rows, future.result()
 
     def reindex_reference_map(self, callback):
         """
         Reindex all primary records in the database.
+
+        The reference table is loaded in bulk, with its indexes dropped
+        until it is complete.
         """
-        self._txn_begin()
-        self.dbapi.execute("DELETE FROM reference")
-        total = 0
-        for tbl in (
-            "people",
-            "families",
-            "events",
-            "places",
-            "sources",
-            "citations",
-            "media",
-            "repositories",
-            "notes",
-            "tags",
-        ):
-            total += self.method("get_number_of_%s", tbl)()
         UpdateCallback.__init__(self, callback)
-        self.set_total(total)
-        primary_table = (
-            (self.get_person_cursor, Person),
-            (self.get_family_cursor, Family),
-            (self.get_event_cursor, Event),
-            (self.get_place_cursor, Place),
-            (self.get_source_cursor, Source),
-            (self.get_citation_cursor, Citation),
-            (self.get_media_cursor, Media),
-            (self.get_repository_cursor, Repository),
-            (self.get_note_cursor, Note),
-            (self.get_tag_cursor, Tag),
-        )
-        # Now we use the functions and classes defined above
-        # to loop through each of the primary object tables.
-        for cursor_func, class_func in primary_table:
-            logging.info("Rebuilding %s reference map", class_func.__name__)
-            with cursor_func() as cursor:
-                for found_handle, val in cursor:
-                    obj = class_func.create(val)
-                    references = set(obj.get_referenced_handles_recursively())
-                    # handle addition of new references
-                    for ref_class_name, ref_handle in references:
-                        self.dbapi.execute(
-                            "INSERT INTO reference "
-                            "(obj_handle, obj_class, ref_handle, ref_class) "
-                            "VALUES (?, ?, ?, ?)",
-                            [
-                                obj.handle,
-                                obj.__class__.__name__,
-                                ref_handle,
-                                ref_class_name,
-                            ],
-                        )
-                    self.update()
-        self._txn_commit()
+        self._rebuild(references=True)
 
     def rebuild_secondary(self, callback=None):
         """
         Rebuild secondary indices
+
+        The secondary columns and tables are loaded in bulk, with their
+        indexes dropped until they are complete.
         """
         if self.readonly:
             return
 
-        total = 0
-        for tbl in (
-            "people",
-            "families",
-            "events",
-            "places",
-            "sources",
-            "citations",
-            "media",
-            "repositories",
-            "notes",
-            "tags",
-        ):
-            total += self.method("get_number_of_%s", tbl)()
         UpdateCallback.__init__(self, callback)
-        self.set_total(total)
+        self._rebuild(secondary=True)
+
+        # Next, rebuild stats:
+        gstats = self.get_gender_stats()
+        self.genderStats = GenderStats(gstats)
+
+    def _rebuild_indexes(self, callback=None):
+        """
+        Rebuild the secondary columns and tables and the reference map
+        after an upgrade, decoding each object once.
+
+        Each chunk of objects is committed with its position in the
+        "rebuild" metadata, so that an interrupted rebuild resumes from
+        there when the database is next loaded.
+        """
+        UpdateCallback.__init__(self, callback)
+        self._rebuild(references=True, secondary=True, marker="rebuild")
+        gstats = self.get_gender_stats()
+        self.genderStats = GenderStats(gstats)
+
+    def _rebuild(self, references=False, secondary=False, marker=None):
+        """
+        Rebuild the reference table, or the secondary columns and tables,
+        or both, from the primary tables.
+
+        :param marker: metadata key under which to save the position after
+            each chunk, which is committed on its own; the rebuild resumes
+            from a position saved there
+        :type marker: str
+        """
+        after = self._get_metadata(marker, None) if marker else None
+        indexes = ()
+        if references:
+            indexes += REFERENCE_INDEXES
+        if secondary:
+            indexes += SECONDARY_INDEXES
+        text_index = secondary and self._has_text_index()
 
-        # First, expand blob to individual fields:
         self._txn_begin()
-        for obj_type in (
-            "Person",
-            "Family",
-            "Event",
-            "Place",
-            "Repository",
-            "Source",
-            "Citation",
-            "Media",
-            "Note",
-            "Tag",
+        self._drop_indexes(indexes)
+        if not after:
+            if references:
+                self.dbapi.execute("DELETE FROM reference")
+            if secondary:
+                self.dbapi.execute("DELETE FROM family_link")
+                self.dbapi.execute("DELETE FROM person_vitals")
+                if text_index:
+                    self.dbapi.execute("DELETE FROM text_data")
+
+        for obj_key, handle, chunk in self._iter_page_results(
+            PRIMARY_CLASSES,
+            get_rebuild_rows,
+            (references, secondary, text_index),
+            after,
         ):
-            for handle in self.method("get_%s_handles", obj_type)():
-                obj = self.method("get_%s_from_handle", obj_type)(handle)
-                self._update_secondary_values(obj)
-                self.update()
+            self._write_rebuild_rows(chunk)
+            if marker:
+                self._put_metadata(marker, (obj_key, handle))
+                self._txn_commit()
+                self._txn_begin()
+
+        self._create_indexes(indexes)
+        if marker:
+            self._put_metadata(marker, None)
         self._txn_commit()
 
-        # Next, rebuild stats:
-        gstats = self.get_gender_stats()
-        self.genderStats = GenderStats(gstats)
+    def _write_rebuild_rows(self, chunk):
+        """
+        Write the rows of a :class:`RebuildChunk`.  Does not commit.
+        """
+        if chunk.references:
+            self._executemany(
+                "INSERT INTO reference "
+                "(obj_handle, obj_class, ref_handle, ref_class) "
+                "VALUES (?, ?, ?, ?)",
+                chunk.references,
+            )
+        if chunk.fields:
+            self._executemany(
+                "UPDATE %s SET %s WHERE handle = ?"
+                % (chunk.table, ", ".join("%s = ?" % field for field in chunk.fields)),
+                chunk.secondary,
+            )
+        if chunk.family_links:
+            self._insert_family_links(chunk.family_links)
+        if chunk.text_data:
+            self._executemany(
+                "INSERT INTO text_data (obj_class, handle, text) VALUES (?, ?, ?)",
+                chunk.text_data,
+            )
+        if chunk.people:
+            self._insert_person_vitals([Person.create(data) for data in chunk.people])
+
+    def _upgrade_tables(self, version, conversions):
+        """
+        Convert the serialized objects of primary tables for an upgrade to a
+        schema version, and set the schema version.
+
+        The rows are read a chunk at a time, converted by
+        :func:`convert_rows`, and each chunk is committed with its position
+        in the "upgrade" metadata, so that an interrupted upgrade resumes
+        from there.
+
+        :param version: the schema version
+        :type version: int
+        :param conversions: for each table key, in the order to convert the
+            tables, a picklable function that takes the serialized data of
+            an object and returns its new data, or None if it is unchanged
+        :type conversions: dict
+        """
+        after = self._get_metadata("upgrade", None)
+        if after and after[0] == version:
+            after = after[1:]
+        else:
+            after = None
+
+        self._txn_begin()
+        for obj_key, handle, changed in self._iter_page_results(
+            conversions, convert_rows, (conversions,), after
+        ):
+            self._executemany(
+                "UPDATE %s SET blob_data = ? WHERE handle = ?"
+                % KEY_TO_NAME_MAP[obj_key],
+                changed,
+            )
+            self._put_metadata("upgrade", (version, obj_key, handle))
+            self._txn_commit()
+            self._txn_begin()
+        self._put_metadata("upgrade", None)
+        self._put_metadata("version", version)
+        self._txn_commit()
+        self.clear_cache()
 
     def _has_handle(self, obj_key, handle):
+        if self._use_cache() and handle in self._cache[obj_key]:
+            return True
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT 1 FROM %s WHERE handle = ?" % table
         self.dbapi.execute(sql, [handle])
@@ -996,13 +1743,28 @@ class DBAPI(DbGeneric):
         rows = self.dbapi.fetchall()
         return [row[0] for row in rows]
 
-    def _get_raw_data(self, obj_key, handle):
+    def _get_raw_blob(self, obj_key, handle):
         table = KEY_TO_NAME_MAP[obj_key]
         sql = "SELECT blob_data FROM %s WHERE handle = ?" % table
         self.dbapi.execute(sql, [handle])
         row = self.dbapi.fetchone()
         if row:
-            return pickle.loads(row[0])
+            return row[0]
+
+    def _get_raw_blobs(self, obj_key, handles):
+        """
+        Return an iterator over (handle, encoded data) for the given handles
+        that exist in the database, using chunked "IN" queries.
+        """
+        table = KEY_TO_NAME_MAP[obj_key]
+        for chunk in chunks(handles, MAX_SQL_PARAMS):
+            sql = "SELECT handle, blob_data FROM %s WHERE handle IN (%s)" % (
+                table,
+                ", ".join("?" * len(chunk)),
+            )
+            self.dbapi.execute(sql, chunk)
+            for row in self.dbapi.fetchall():
+                yield (row[0], row[1])
 
     def _get_raw_from_id_data(self, obj_key, gramps_id):
         table = KEY_TO_NAME_MAP[obj_key]
@@ -1010,7 +1772,7 @@ class DBAPI(DbGeneric):
         self.dbapi.execute(sql, [gramps_id])
         row = self.dbapi.fetchone()
         if row:
-            return pickle.loads(row[0])
+            return decode(row[0])
 
     def get_gender_stats(self):
         """
@@ -1062,25 +1824,70 @@ class DBAPI(DbGeneric):
         if data is None:
             sql = "DELETE FROM %s WHERE handle = ?" % table
             self.dbapi.execute(sql, [handle])
+            self._cache_update(obj_key, handle)
+            self._remove_secondary_rows(obj_key, handle)
+            self._log_change(obj_key, handle, TXNDEL)
         else:
+            blob = encode(data)
             if self._has_handle(obj_key, handle):
                 sql = "UPDATE %s SET blob_data = ? WHERE handle = ?" % table
-                self.dbapi.execute(sql, [pickle.dumps(data), handle])
+                self.dbapi.execute(sql, [blob, handle])
+                self._log_change(obj_key, handle, TXNUPD)
             else:
                 sql = "INSERT INTO %s (handle, blob_data) VALUES (?, ?)" % table
-                self.dbapi.execute(sql, [handle, pickle.dumps(data)])
+                self.dbapi.execute(sql, [handle, blob])
+                self._log_change(obj_key, handle, TXNADD)
+            self._cache_update(obj_key, handle, blob)
             obj = self._get_table_func(cls)["class_func"].create(data)
             self._update_secondary_values(obj)
+            if obj_key == EVENT_KEY:
+                self._update_event_vitals([handle])
 
     def get_surname_list(self):
         """
-        Return the list of locale-sorted surnames contained in the database.
+        Return the list of sorted surnames contained in the database.
+        """
+        return list(self.iter_surnames())
+
+    @property
+    def surname_list(self):
+        """
+        The sorted list of surnames, read from the database when used.
+        """
+        return self.get_surname_list()
+
+    def iter_surnames(self, prefix=""):
+        """
+        Return an iterator over the sorted surnames contained in the
+        database that start with the prefix.
+        """
+        sql = "SELECT surname FROM %s" % self._get_surname_counts()
+        args = []
+        if prefix:
+            # The surnames that start with the prefix sort from it up to
+            # the prefix with its last character incremented.
+            sql += " WHERE surname >= ? AND surname < ?"
+            args = [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+        return self._select_handles(sql + " ORDER BY surname", args)
+
+    def surname_frequency(self):
+        """
+        Return a dictionary of the surnames contained in the database, and
+        the number of people with each one.
+        """
+        return dict(
+            self._select_rows("SELECT surname, n FROM %s" % self._get_surname_counts())
+        )
+
+    def add_to_surname_list(self, person, batch_transaction):
+        """
+        The surnames are read from the database, there is no list to keep.
+        """
+
+    def remove_from_surname_list(self, person):
+        """
+        The surnames are read from the database, there is no list to keep.
         """
-        self.dbapi.execute("SELECT DISTINCT surname " "FROM person " "ORDER BY surname")
-        surname_list = []
-        for row in self.dbapi.fetchall():
-            surname_list.append(row[0])
-        return surname_list
 
     def _sql_type(self, schema_type, max_length):
         """
@@ -1125,40 +1932,413 @@ class DBAPI(DbGeneric):
                         % (table_name, field, sql_type)
                     )
 
-    def _update_secondary_values(self, obj):
+    @classmethod
+    def _get_secondary_values(cls, obj):
         """
-        Given a primary object update its secondary field values
-        in the database.
-        Does not commit.
+        Given a primary object return the names of its secondary columns,
+        other than the handle, and the values to store in them.
         """
         table = obj.__class__.__name__
-        fields = [field[0] for field in obj.get_secondary_fields()]
-        sets = []
-        values = []
-        for field in fields:
-            sets.append("%s = ?" % field)
-            values.append(getattr(obj, field))
+        fields = [
+            field[0] for field in obj.get_secondary_fields() if field[0] != "handle"
+        ]
+        values = [getattr(obj, field) for field in fields]
 
         # Derived fields
         if table == "Person":
-            given_name, surname = self._get_person_data(obj)
-            sets.append("given_name = ?")
-            values.append(given_name)
-            sets.append("surname = ?")
-            values.append(surname)
+            given_name, surname = cls._get_person_data(obj)
+            fields += ["given_name", "surname", "given_name_key", "surname_key"]
+            values += [
+                given_name,
+                surname,
+                glocale.sort_key(given_name),
+                glocale.sort_key(surname),
+            ]
         if table == "Place":
-            handle = self._get_place_data(obj)
-            sets.append("enclosed_by = ?")
-            values.append(handle)
+            fields += ["enclosed_by", "title_key"]
+            values += [cls._get_place_data(obj), glocale.sort_key(obj.title)]
+        if table == "Source":
+            fields.append("title_key")
+            values.append(glocale.sort_key(obj.title))
+
+        return fields, cls._sql_cast_list(values)
 
+    def _update_secondary_values(self, obj):
+        """
+        Given a primary object update its secondary field values
+        in the database.
+        Does not commit.
+        """
+        fields, values = self._get_secondary_values(obj)
         if len(values) > 0:
-            table_name = table.lower()
+            table_name = obj.__class__.__name__.lower()
+            sets = ", ".join("%s = ?" % field for field in fields)
+            self.dbapi.execute(
+                "UPDATE %s SET %s where handle = ?" % (table_name, sets),
+                values + [obj.handle],
+            )
+        if isinstance(obj, Family):
+            self._remove_family_links(obj.handle)
+            self._insert_family_links(self._get_family_links(obj))
+        if isinstance(obj, Person):
+            self._set_main_families([obj])
+            self._update_person_vitals([obj])
+        if self._has_text_index():
+            row = self._get_text_data(obj)
+            self.dbapi.execute(
+                "DELETE FROM text_data WHERE handle = ? AND obj_class = ?",
+                row[1::-1],
+            )
+            self.dbapi.execute(
+                "INSERT INTO text_data (obj_class, handle, text) VALUES (?, ?, ?)",
+                row,
+            )
+
+    def _remove_secondary_rows(self, obj_key, handle):
+        """
+        Remove the rows of the secondary tables that were derived from a
+        primary object.  Does not commit.
+        """
+        if obj_key == FAMILY_KEY:
+            self._remove_family_links(handle)
+        elif obj_key == PERSON_KEY:
+            self.dbapi.execute("DELETE FROM person_vitals WHERE handle = ?", [handle])
+        elif obj_key == EVENT_KEY:
+            self._update_event_vitals([handle])
+        if self._has_text_index():
             self.dbapi.execute(
-                "UPDATE %s SET %s where handle = ?" % (table_name, ", ".join(sets)),
-                self._sql_cast_list(values) + [obj.handle],
+                "DELETE FROM text_data WHERE handle = ? AND obj_class = ?",
+                [handle, KEY_TO_CLASS_MAP[obj_key]],
             )
 
-    def _sql_cast_list(self, values):
+    def _insert_person_vitals(self, people):
+        """
+        Insert the person_vitals rows of the people, reading their events in
+        one batch.  Does not commit.
+        """
+        handles = list(
+            {
+                event_ref.ref
+                for person in people
+                for event_ref in person.get_event_ref_list()
+            }
+        )
+        events = {
+            handle: Event.create(data)
+            for handle, data in zip(
+                handles, self.get_raw_event_data_from_handles(handles)
+            )
+            if data is not None
+        }
+        self._executemany(
+            "INSERT INTO person_vitals (%s) VALUES (%s)"
+            % (
+                ", ".join(PersonVitals._fields),
+                ", ".join("?" * len(PersonVitals._fields)),
+            ),
+            [
+                self._sql_cast_list(make_person_vitals(person, events.get))
+                for person in people
+            ],
+        )
+
+    def _update_person_vitals(self, people):
+        """
+        Update the person_vitals rows of the people.  Does not commit.
+        """
+        people = list(people)
+        self._executemany(
+            "DELETE FROM person_vitals WHERE handle = ?",
+            [[person.handle] for person in people],
+        )
+        self._insert_person_vitals(people)
+
+    def _update_event_vitals(self, event_handles, exclude=()):
+        """
+        Update the person_vitals rows of the people who refer to any of the
+        events, other than the excluded ones.  Does not commit.
+        """
+        person_handles = set()
+        for chunk in chunks(event_handles, MAX_SQL_PARAMS):
+            self.dbapi.execute(
+                "SELECT obj_handle FROM reference "
+                "WHERE obj_class = 'Person' AND ref_handle IN (%s)"
+                % ", ".join("?" * len(chunk)),
+                chunk,
+            )
+            person_handles.update(row[0] for row in self.dbapi.fetchall())
+        handles = list(person_handles.difference(exclude))
+        self._update_person_vitals(
+            Person.create(data)
+            for data in self.get_raw_person_data_from_handles(handles)
+            if data is not None
+        )
+
+    def get_person_vitals(self, handle):
+        """
+        Return the :class:`~.vitals.PersonVitals` of a person, or None if
+        there is no such person.
+        """
+        self.dbapi.execute(
+            "SELECT %s FROM person_vitals WHERE handle = ?"
+            % ", ".join(PersonVitals._fields),
+            [handle],
+        )
+        row = self.dbapi.fetchone()
+        if row is None:
+            return None
+        vitals = PersonVitals(*row)
+        return vitals._replace(
+            birth_fallback=bool(vitals.birth_fallback),
+            death_fallback=bool(vitals.death_fallback),
+        )
+
+    def find_handles_where(self, obj_class, condition, args):
+        """
+        Return the handles of the objects of a class that satisfy an SQL
+        condition on the secondary columns of their table.
+
+        See :meth:`~.DbReadBase.find_handles_where` for the details.
+        """
+        sql = "SELECT handle FROM %s WHERE %s" % (obj_class.lower(), condition)
+        return list(self._select_handles(sql, args))
+
+    def find_person_handles_by_date(self, vital, start=None, stop=None):
+        """
+        Return the handles of the people whose vital event has a date with a
+        sort value between start and stop, inclusive.
+
+        :param vital: one of "birth", "death", "baptism" or "burial"
+        :type vital: str
+        :param start: lowest sort value, or None for no limit
+        :type start: int
+        :param stop: highest sort value, or None for no limit
+        :type stop: int
+        :returns: list of person handles
+        :rtype: list
+        """
+        if vital not in VITALS:
+            raise ValueError("unknown vital event: %s" % vital)
+        sql = "SELECT handle FROM person_vitals WHERE %s_sortval IS NOT NULL" % vital
+        args = []
+        if start is not None:
+            sql += " AND %s_sortval >= ?" % vital
+            args.append(start)
+        if stop is not None:
+            sql += " AND %s_sortval <= ?" % vital
+            args.append(stop)
+        return list(self._select_handles(sql, args))
+
+    def _log_change(self, obj_key, handle, op, change_time=None):
+        """
+        Append a row to the changelog table.  Does not commit.
+
+        :param op: TXNADD, TXNUPD or TXNDEL
+        :type op: int
+        :param change_time: time of the change, or None for now
+        :type change_time: int
+        """
+        self.dbapi.execute(
+            "INSERT INTO changelog (obj_class, handle, op, time) VALUES (?, ?, ?, ?)",
+            [
+                KEY_TO_CLASS_MAP[obj_key],
+                handle,
+                op,
+                int(time.time() if change_time is None else change_time),
+            ],
+        )
+
+    def _prune_changelog(self):
+        """
+        Remove the changes older than the newest "database.changelog-size"
+        rows of the changelog table, or none if that is 0.  The changes made
+        in the same second as the oldest row kept are kept too, so that
+        :meth:`iter_changed_since` never returns part of a second.
+        """
+        size = config.get("database.changelog-size")
+        if size <= 0:
+            return
+        self.dbapi.execute(
+            "SELECT time FROM changelog ORDER BY time DESC LIMIT 1 OFFSET ?",
+            [size - 1],
+        )
+        row = self.dbapi.fetchone()
+        if row is None:
+            return
+        self._txn_begin()
+        self.dbapi.execute("DELETE FROM changelog WHERE time < ?", [row[0]])
+        self._txn_commit()
+
+    def iter_changed_since(self, timestamp, classes=None):
+        """
+        Return an iterator over the changes made to primary objects at or
+        after a time, in time order.
+
+        See :meth:`~.DbReadBase.iter_changed_since` for the details.
+        """
+        condition, args = self._get_class_condition(classes)
+        return self._select_rows(
+            "SELECT obj_class, handle, op, time FROM changelog "
+            "WHERE time >= ?%s ORDER BY time" % condition,
+            [int(timestamp)] + args,
+        )
+
+    @staticmethod
+    def _get_text_data(obj):
+        """
+        Return the text_data row of a primary object.  The text holds the
+        strings that :meth:`~.BaseObject.matches_string` searches, one on
+        each line.
+        """
+        items = []
+        todo = [obj]
+        while todo:
+            item = todo.pop()
+            items.extend(str(text) for text in item.get_text_data_list() if text)
+            todo.extend(item.get_text_data_child_list())
+        return [obj.__class__.__name__, obj.handle, "\n".join(items)]
+
+    @staticmethod
+    def _get_family_links(family):
+        """
+        Return the family_link rows of a family: one for each pair of parent
+        and child, with the relationship of the child to that parent.
+        """
+        rows = []
+        for child_ref in family.get_child_ref_list():
+            for parent, rel_type in (
+                (family.get_father_handle(), child_ref.get_father_relation()),
+                (family.get_mother_handle(), child_ref.get_mother_relation()),
+            ):
+                if parent:
+                    rows.append([parent, child_ref.ref, family.handle, int(rel_type)])
+        return rows
+
+    def _insert_family_links(self, rows):
+        """
+        Insert family_link rows, marking those of the main parent family of
+        the child.  Does not commit.
+        """
+        children = list({row[1] for row in rows})
+        main_families = {}
+        for child, data in zip(
+            children, self.get_raw_person_data_from_handles(children)
+        ):
+            # The main parent family is the first of the parent_family_list.
+            if data and data[9]:
+                main_families[child] = data[9][0]
+        self._executemany(
+            "INSERT INTO family_link (parent, child, family, rel_type, main_family) "
+            "VALUES (?, ?, ?, ?, ?)",
+            [row + [int(main_families.get(row[1]) == row[2])] for row in rows],
+        )
+
+    def _set_main_families(self, people):
+        """
+        Mark the family_link rows of the main parent family of each of the
+        people.  Does not commit.
+        """
+        self._executemany(
+            "UPDATE family_link "
+            "SET main_family = CASE WHEN family = ? THEN 1 ELSE 0 END "
+            "WHERE child = ?",
+            [
+                [person.get_main_parents_family_handle(), person.handle]
+                for person in people
+            ],
+        )
+
+    def _remove_family_links(self, handle):
+        """
+        Remove the family_link rows of a family.
+        """
+        self.dbapi.execute("DELETE FROM family_link WHERE family = ?", [handle])
+
+    def get_families_of_parent(self, handle):
+        """
+        Return the handles of the families in which a person is the father
+        or the mother.
+
+        :param handle: handle of the person
+        :type handle: str
+        :returns: list of family handles
+        :rtype: list
+        """
+        # A union of two lookups, so that each uses the index of its column.
+        self.dbapi.execute(
+            "SELECT handle FROM family WHERE father_handle = ? "
+            "UNION SELECT handle FROM family WHERE mother_handle = ?",
+            [handle, handle],
+        )
+        return [row[0] for row in self.dbapi.fetchall()]
+
+    def get_ancestor_handles(self, handle, max_gen=None, main_family=False):
+        """
+        Return a dictionary mapping the handle of each ancestor of a person
+        to the generation it is first found in: 1 for the parents, 2 for the
+        grandparents and so on.
+
+        :param handle: handle of the person
+        :type handle: str
+        :param max_gen: number of generations to search, or None for all
+        :type max_gen: int
+        :param main_family: if True, follow only the main parent family of
+            each person
+        :type main_family: bool
+        :returns: dictionary of handle -> generation
+        :rtype: dict
+        """
+        return self._get_family_link_generations(
+            handle,
+            max_gen,
+            "child",
+            "parent",
+            "AND family_link.main_family = 1 " if main_family else "",
+        )
+
+    def get_descendant_handles(self, handle, max_gen=None):
+        """
+        Return a dictionary mapping the handle of each descendant of a person
+        to the generation it is first found in: 1 for the children, 2 for
+        the grandchildren and so on.
+
+        :param handle: handle of the person
+        :type handle: str
+        :param max_gen: number of generations to search, or None for all
+        :type max_gen: int
+        :returns: dictionary of handle -> generation
+        :rtype: dict
+        """
+        return self._get_family_link_generations(handle, max_gen, "parent", "child")
+
+    def _get_family_link_generations(
+        self, handle, max_gen, from_column, to_column, condition=""
+    ):
+        """
+        Follow the family_link table from a person, and return the lowest
+        generation of each person reached.
+        """
+        if max_gen is None:
+            # No line can be longer than the number of people, even if the
+            # tree has a loop.
+            max_gen = self.get_number_of_people()
+        self.dbapi.execute(
+            "WITH RECURSIVE generation (handle, number) AS ("
+            "SELECT ?, 0 "
+            "UNION "
+            "SELECT family_link.%s, generation.number + 1 "
+            "FROM family_link JOIN generation "
+            "ON family_link.%s = generation.handle %s"
+            "WHERE generation.number < ?"
+            ") "
+            "SELECT handle, MIN(number) FROM generation "
+            "WHERE number > 0 GROUP BY handle" % (to_column, from_column, condition),
+            [handle, max_gen],
+        )
+        return dict(self.dbapi.fetchall())
+
+    @staticmethod
+    def _sql_cast_list(values):
         """
         Given a list of field names and values, return the values
         in the appropriate type.
@@ -31,7 +31,12 @@ Backend for SQLite database.
 import sqlite3
 import os
 import re
+import time
+import pickle
 import logging
+import threading
+import weakref
+from pathlib import Path
 
 # -------------------------------------------------------------------------
 #
@@ -39,13 +44,22 @@ import logging
 #
 # -------------------------------------------------------------------------
 from gramps.plugins.db.dbapi.dbapi import DBAPI
-from gramps.gen.db.dbconst import ARRAYSIZE
+from gramps.gen.db.dbconst import (
+    ARRAYSIZE,
+    DBMODE_R,
+    KEY_TO_CLASS_MAP,
+    KEY_TO_NAME_MAP,
+)
+from gramps.gen.config import config
 from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.gettext
 
 sqlite3.paramstyle = "qmark"
 
+# Number of pages copied by each step of a snapshot.
+SNAPSHOT_PAGES = 1024
+
 
 # -------------------------------------------------------------------------
 #
@@ -53,18 +67,66 @@ sqlite3.paramstyle = "qmark"
 #
 # -------------------------------------------------------------------------
 class SQLite(DBAPI):
+    def __init__(self, directory=None):
+        # The connection of an in-memory snapshot, until it is loaded.
+        self._snapshot = None
+        super().__init__(directory)
+
     def get_summary(self):
         """
         Return a dictionary of information about this database backend.
         """
         summary = super().get_summary()
-        summary.update(
-            {
-                _("Database version"): sqlite3.sqlite_version,
-                _("Database module version"): sqlite3.version,
-                _("Database module location"): sqlite3.__file__,
-            }
-        )
+        self.dbapi.execute("SELECT MAX(time) FROM changelog")
+        summary.update(_get_backend_summary(self.dbapi.fetchone()[0]))
+        if self._directory and self._directory != ":memory:":
+            path = os.path.join(self._directory, "sqlite.db")
+            summary[_("Database size")] = os.path.getsize(path)
+        return summary
+
+    def read_summary(self, directory):
+        """
+        Return the summary of the database in a family tree directory from
+        its object counts, read on a connection of its own.
+
+        See :meth:`~.DbReadBase.read_summary` for the details.
+        """
+        path = os.path.join(directory, "sqlite.db")
+        if not os.path.isfile(path):
+            return None
+        uri = Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+        try:
+            connection = sqlite3.connect(uri, uri=True)
+            try:
+                counts = dict(
+                    connection.execute("SELECT obj_class, count FROM object_count")
+                )
+                version = connection.execute(
+                    "SELECT value FROM metadata WHERE setting = 'version'"
+                ).fetchone()[0]
+                last_change = connection.execute(
+                    "SELECT MAX(time) FROM changelog"
+                ).fetchone()[0]
+            finally:
+                connection.close()
+        except sqlite3.Error:
+            # The database is older than the object counts.
+            return None
+        summary = {
+            _("Number of people"): counts["Person"],
+            _("Number of families"): counts["Family"],
+            _("Number of sources"): counts["Source"],
+            _("Number of citations"): counts["Citation"],
+            _("Number of events"): counts["Event"],
+            _("Number of media"): counts["Media"],
+            _("Number of places"): counts["Place"],
+            _("Number of repositories"): counts["Repository"],
+            _("Number of notes"): counts["Note"],
+            _("Number of tags"): counts["Tag"],
+            _("Schema version"): str(pickle.loads(version)),
+            _("Database size"): os.path.getsize(path),
+        }
+        summary.update(_get_backend_summary(last_change))
         return summary
 
     def _initialize(self, directory, username, password):
@@ -72,7 +134,297 @@ class SQLite(DBAPI):
             path_to_db = ":memory:"
         else:
             path_to_db = os.path.join(directory, "sqlite.db")
-        self.dbapi = Connection(path_to_db)
+        if self._snapshot is not None:
+            self.dbapi = self._snapshot
+            self._snapshot = None
+        else:
+            self.dbapi = Connection(path_to_db)
+
+    def _check_journal_mode(self):
+        """
+        Switch the database to WAL mode, or back to the rollback journal, as
+        set by the "database.wal-mode" preference.
+
+        WAL mode is only switched off if it was switched on here, as
+        recorded in the "wal-mode" metadata, so a journal mode set with
+        other tools is kept.
+        """
+        directory = self.get_save_path()
+        if directory == ":memory:":
+            return
+        self.dbapi.execute("PRAGMA journal_mode")
+        wal_mode = self.dbapi.fetchone()[0] == "wal"
+        if not self.readonly:
+            if config.get("database.wal-mode") and not wal_mode:
+                self.dbapi.execute("PRAGMA journal_mode = WAL")
+                self._set_metadata("wal-mode", True)
+                wal_mode = True
+            elif (
+                not config.get("database.wal-mode")
+                and wal_mode
+                and self._get_metadata("wal-mode", False)
+            ):
+                self.dbapi.execute("PRAGMA journal_mode = DELETE")
+                self._set_metadata("wal-mode", False)
+                wal_mode = False
+        if wal_mode:
+            # In WAL mode, threads other than the one that opened the
+            # database read from their own connections.
+            self.dbapi.enable_readers(os.path.join(directory, "sqlite.db"))
+
+    def snapshot(self, target=":memory:", callback=None):
+        """
+        Copy the committed state of the database, while it is open, to the
+        family tree directory target, or to memory, with the SQLite online
+        backup API.
+
+        See :meth:`~.DbReadBase.snapshot` for the details.
+        """
+        if target == ":memory:":
+            path_to_db = ":memory:"
+        else:
+            path_to_db = os.path.join(target, "sqlite.db")
+            if os.path.exists(path_to_db):
+                raise FileExistsError(path_to_db)
+
+        def progress(status, remaining, total):
+            if total:
+                callback(int(100 * (total - remaining) / total))
+
+        connection = Connection(path_to_db)
+        try:
+            self.dbapi.backup(
+                connection,
+                pages=SNAPSHOT_PAGES,
+                progress=progress if callback else None,
+            )
+        finally:
+            if target != ":memory:":
+                connection.close()
+        if target != ":memory:":
+            return None
+
+        database = SQLite()
+        database._snapshot = connection
+        database.load(":memory:", mode=DBMODE_R)
+        return database
+
+    def _copy_to_memory(self):
+        """
+        Copy the database to memory with the SQLite online backup API, and
+        close the database file.
+        """
+        connection = Connection(":memory:")
+        self.dbapi.backup(connection)
+        self.dbapi.close()
+        self.dbapi = connection
+
+    def _create_object_counts(self):
+        """
+        Create the object_count table, counting the objects already in the
+        database, and triggers on the primary tables that keep it up to
+        date.
+        """
+        self.dbapi.execute(
+            "CREATE TABLE object_count "
+            "("
+            "obj_class TEXT PRIMARY KEY NOT NULL, "
+            "count INTEGER"
+            ")"
+        )
+        for obj_key, table in KEY_TO_NAME_MAP.items():
+            obj_class = KEY_TO_CLASS_MAP[obj_key]
+            self.dbapi.execute(
+                "INSERT INTO object_count (obj_class, count) "
+                "SELECT ?, COUNT(*) FROM %s" % table,
+                [obj_class],
+            )
+            for event, step in (("insert", "+"), ("delete", "-")):
+                self.dbapi.execute(
+                    "CREATE TRIGGER %s_count_%s AFTER %s ON %s BEGIN "
+                    "UPDATE object_count SET count = count %s 1 "
+                    "WHERE obj_class = '%s'; "
+                    "END" % (table, event, event.upper(), table, step, obj_class)
+                )
+
+    def _create_surname_counts(self):
+        """
+        Create the surname_count table, counting the surnames of the people
+        already in the database, and triggers on the person table that keep
+        it up to date.
+        """
+        self.dbapi.execute(
+            "CREATE TABLE surname_count "
+            "("
+            "surname TEXT PRIMARY KEY NOT NULL, "
+            "n INTEGER"
+            ")"
+        )
+        self.dbapi.execute(
+            "INSERT INTO surname_count (surname, n) "
+            "SELECT surname, COUNT(*) FROM person "
+            "WHERE surname IS NOT NULL GROUP BY surname"
+        )
+        count_new = (
+            "INSERT INTO surname_count (surname, n) "
+            "SELECT NEW.surname, 1 WHERE NEW.surname IS NOT NULL "
+            "ON CONFLICT (surname) DO UPDATE SET n = n + 1; "
+        )
+        uncount_old = (
+            "UPDATE surname_count SET n = n - 1 WHERE surname = OLD.surname; "
+            "DELETE FROM surname_count WHERE surname = OLD.surname AND n = 0; "
+        )
+        self.dbapi.execute(
+            "CREATE TRIGGER person_surname_insert AFTER INSERT ON person "
+            "BEGIN " + count_new + "END"
+        )
+        self.dbapi.execute(
+            "CREATE TRIGGER person_surname_update AFTER UPDATE OF surname "
+            "ON person WHEN OLD.surname IS NOT NEW.surname "
+            "BEGIN " + uncount_old + count_new + "END"
+        )
+        self.dbapi.execute(
+            "CREATE TRIGGER person_surname_delete AFTER DELETE ON person "
+            "BEGIN " + uncount_old + "END"
+        )
+        self._surname_counts = True
+
+    def _write_rows(self, table, fields, rows, existing):
+        """
+        Write rows to a primary table, with one UPSERT for new and existing
+        rows.
+        """
+        self.dbapi.executemany(
+            "INSERT INTO %s (%s) VALUES (%s) "
+            "ON CONFLICT (handle) DO UPDATE SET %s"
+            % (
+                table,
+                ", ".join(fields),
+                ", ".join("?" * len(fields)),
+                ", ".join("%s = excluded.%s" % (field, field) for field in fields[1:]),
+            ),
+            rows,
+        )
+
+    def _use_cache(self):
+        """
+        Only the thread that writes to the database uses the object cache,
+        other threads read committed data from their own connection.
+        """
+        return self.dbapi.in_writer_thread()
+
+    def _create_text_index(self):
+        """
+        Create the text_data table, and an FTS5 index on it with the trigram
+        tokenizer, which matches any substring of three or more characters.
+
+        Nothing is created if SQLite was built without them.
+        """
+        try:
+            self.dbapi.execute(
+                "CREATE VIRTUAL TABLE text_index USING fts5"
+                "("
+                "text, "
+                "content='text_data', "
+                "content_rowid='id', "
+                "tokenize='trigram'"
+                ")"
+            )
+        except sqlite3.OperationalError:
+            return
+        self.dbapi.execute(
+            "CREATE TABLE text_data "
+            "("
+            "id INTEGER PRIMARY KEY, "
+            "obj_class TEXT, "
+            "handle VARCHAR(50), "
+            "text TEXT"
+            ")"
+        )
+        self.dbapi.execute("CREATE INDEX text_data_handle " "ON text_data(handle)")
+        # Keep the index in step with the content table.
+        self.dbapi.execute(
+            "CREATE TRIGGER text_data_insert AFTER INSERT ON text_data BEGIN "
+            "INSERT INTO text_index(rowid, text) VALUES (new.id, new.text); "
+            "END"
+        )
+        self.dbapi.execute(
+            "CREATE TRIGGER text_data_delete AFTER DELETE ON text_data BEGIN "
+            "INSERT INTO text_index(text_index, rowid, text) "
+            "VALUES ('delete', old.id, old.text); "
+            "END"
+        )
+
+    def search_text(self, query, classes=None, regex=False, case_sensitive=False):
+        """
+        Return the (class name, handle) of each object whose text matches a
+        substring, ignoring case unless case_sensitive is True, or a regular
+        expression.
+
+        See :meth:`~.DbReadBase.search_text` for the details.
+        """
+        if not query or not self._has_text_index():
+            return None
+        conditions = []
+        args = []
+        if regex:
+            if re.search(r"\\[AZ]", query):
+                # Anchored to the start or end of the whole text rather than
+                # of each line.
+                return None
+            try:
+                re.compile(query)
+            except re.error:
+                return None
+            conditions.append("text REGEXP ?")
+            args.append(query if case_sensitive else "(?i)" + query)
+        elif len(query) >= 3:
+            conditions.append(
+                "id IN (SELECT rowid FROM text_index WHERE text_index MATCH ?)"
+            )
+            args.append('"%s"' % query.replace('"', '""'))
+            if case_sensitive:
+                conditions.append("instr(text, ?) > 0")
+                args.append(query)
+        if classes:
+            conditions.append("obj_class IN (%s)" % ", ".join("?" * len(classes)))
+            args.extend(classes)
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        if regex or len(query) >= 3:
+            sql = "SELECT obj_class, handle FROM text_data" + where
+            return [tuple(row) for row in self._select_rows(sql, args)]
+
+        # Too short for the trigram index, but searching the text is still
+        # much faster than decoding the objects.
+        sql = "SELECT obj_class, handle, text FROM text_data" + where
+        rows = self._select_rows(sql, args)
+        if case_sensitive:
+            return [
+                (obj_class, handle) for obj_class, handle, text in rows if query in text
+            ]
+        query = query.upper()
+        return [
+            (obj_class, handle)
+            for obj_class, handle, text in rows
+            if query in text.upper()
+        ]
+
+
+def _get_backend_summary(last_change):
+    """
+    Return the summary items of the backend, and of the time of the last
+    change to the database.
+    """
+    if last_change is None:
+        last = _("Never")
+    else:
+        last = time.strftime("%x %X", time.localtime(last_change))
+    return {
+        _("Last changed"): last,
+        _("Database version"): sqlite3.sqlite_version,
+        _("Database module version"): sqlite3.version,
+        _("Database module location"): sqlite3.__file__,
+    }
 
 
 # -------------------------------------------------------------------------
@@ -101,12 +453,53 @@ class Connection:
         """
         self.log = logging.getLogger(".sqlite")
         self.__connection = sqlite3.connect(*args, **kwargs)
+        # Close the connection when this object is garbage collected, such
+        # as the reader of a thread that has ended.
+        self.__finalizer = weakref.finalize(self, self.__connection.close)
         self.__cursor = self.__connection.cursor()
         self.__connection.create_function("regexp", 2, regexp)
         self.__collations = []
+        self.__locales = []
         self.__tmap = str.maketrans("-.@=;", "_____")
+        self.__thread = threading.get_ident()
+        self.__reader_uri = None
+        self.__readers = None
+        self.__reader_set = weakref.WeakSet()
         self.check_collation(glocale)
 
+    def enable_readers(self, path):
+        """
+        Execute statements from threads other than the one that created the
+        connection on a read-only connection, one per thread.
+
+        This is intended for databases in WAL mode, where readers do not
+        block the writer.
+
+        :param path: path of the database file.
+        :type path: str
+        """
+        self.__reader_uri = Path(os.path.abspath(path)).as_uri() + "?mode=ro"
+        self.__readers = threading.local()
+
+    def __get_reader(self):
+        """
+        Return the read-only connection of the current thread, or None if
+        statements should be executed on this connection.
+        """
+        if self.__readers is None or threading.get_ident() == self.__thread:
+            return None
+        reader = getattr(self.__readers, "connection", None)
+        if reader is None:
+            self.log.debug("opening reader for thread %s", threading.get_ident())
+            reader = Connection(self.__reader_uri, uri=True, check_same_thread=False)
+            for locale in self.__locales:
+                reader.check_collation(locale)
+            # The reader is only held by the thread, and is closed when it
+            # ends.
+            self.__readers.connection = reader
+            self.__reader_set.add(reader)
+        return reader
+
     def check_collation(self, locale):
         """
         Checks that a collation exists and if not creates it.
@@ -121,6 +514,9 @@ class Connection:
         if collation not in self.__collations:
             self.__connection.create_collation(collation, locale.strcoll)
             self.__collations.append(collation)
+            self.__locales.append(locale)
+            for reader in list(self.__reader_set):
+                reader.check_collation(locale)
         return collation
 
     def execute(self, *args, **kwargs):
@@ -132,14 +528,35 @@ class Connection:
         :param kwargs: arguments to be passed to the sqlite3 execute statement
         :type kwargs: list
         """
+        reader = self.__get_reader()
+        if reader is not None:
+            reader.execute(*args, **kwargs)
+            return
         self.log.debug(args)
         self.__cursor.execute(*args, **kwargs)
 
+    def executemany(self, *args, **kwargs):
+        """
+        Executes an SQL statement against all parameter sequences.
+
+        :param args: arguments to be passed to the sqlite3 executemany
+                     statement
+        :type args: list
+        :param kwargs: arguments to be passed to the sqlite3 executemany
+                       statement
+        :type kwargs: list
+        """
+        self.log.debug(args[0])
+        self.__cursor.executemany(*args, **kwargs)
+
     def fetchone(self):
         """
         Fetches the next row of a query result set, returning a single sequence,
         or None when no more data is available.
         """
+        reader = self.__get_reader()
+        if reader is not None:
+            return reader.fetchone()
         return self.__cursor.fetchone()
 
     def fetchall(self):
@@ -147,6 +564,9 @@ class Connection:
         Fetches the next set of rows of a query result, returning a list. An
         empty list is returned when no more rows are available.
         """
+        reader = self.__get_reader()
+        if reader is not None:
+            return reader.fetchall()
         return self.__cursor.fetchall()
 
     def begin(self):
@@ -171,6 +591,26 @@ class Connection:
         self.log.debug("ROLLBACK;")
         self.__connection.rollback()
 
+    def backup(self, target, pages=-1, progress=None):
+        """
+        Copy the database to another connection, while it is open.
+
+        :param target: connection to copy the database to.
+        :type target: Connection
+        :param pages: number of pages to copy at a time, or all of them if
+                      it is zero or negative.
+        :type pages: int
+        :param progress: function called after each step with the status,
+                         and the number of pages remaining and in total.
+        :type progress: callable
+        """
+        reader = self.__get_reader()
+        if reader is not None:
+            reader.backup(target, pages, progress)
+            return
+        self.log.debug("backup")
+        self.__connection.backup(target.__connection, pages=pages, progress=progress)
+
     def table_exists(self, table):
         """
         Test whether the specified SQL database table exists.
@@ -192,14 +632,27 @@ class Connection:
         Close the current database.
         """
         self.log.debug("closing database...")
-        self.__connection.close()
+        for reader in list(self.__reader_set):
+            reader.close()
+        self.__reader_set.clear()
+        self.__finalizer()
 
     def cursor(self):
         """
         Return a new cursor.
         """
+        reader = self.__get_reader()
+        if reader is not None:
+            return reader.cursor()
         return Cursor(self.__connection)
 
+    def in_writer_thread(self):
+        """
+        Return True if statements from the current thread are executed on
+        this connection rather than on a read-only connection.
+        """
+        return self.__readers is None or threading.get_ident() == self.__thread
+
 
 # -------------------------------------------------------------------------
 #
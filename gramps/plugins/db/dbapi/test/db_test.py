@@ -23,15 +23,36 @@
 # Standard python modules
 #
 # -------------------------------------------------------------------------
+import gc
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
 import unittest
+from unittest import mock
 
 # -------------------------------------------------------------------------
 #
 # Gramps modules
 #
 # -------------------------------------------------------------------------
-from gramps.gen.db import DbTxn
+from gramps.gen.config import config
+from gramps.gen.const import GRAMPS_LOCALE as glocale
+from gramps.gen.db import DbReadBase, DbTxn
+from gramps.gen.db.dbconst import (
+    KEY_TO_NAME_MAP,
+    PERSON_KEY,
+    FAMILY_KEY,
+    TXNADD,
+    TXNUPD,
+    TXNDEL,
+)
 from gramps.gen.db.utils import make_database
+from gramps.gen.errors import HandleError
+from gramps.gen.updatecallback import UpdateCallback
+from gramps.gen.utils.db import for_each_ancestor
+from gramps.plugins.db.dbapi.dbapi import DBAPI
 from gramps.gen.lib import (
     Person,
     Family,
@@ -45,9 +66,61 @@ from gramps.gen.lib import (
     Tag,
     Researcher,
     Surname,
+    ChildRef,
+    Date,
+    EventRef,
+    EventType,
 )
 
 
+# -------------------------------------------------------------------------
+#
+# DbTestCase class
+#
+# -------------------------------------------------------------------------
+class DbTestCase(unittest.TestCase):
+    """
+    Base class for tests with a new database for each test.
+
+    The database is loaded in memory, or in a temporary directory if on_disk
+    is set. The config settings are changed before the database is loaded,
+    and restored after the test.
+    """
+
+    on_disk = False
+    settings = {}
+
+    def setUp(self):
+        for key, value in self.settings.items():
+            self.set_config(key, value)
+        self.dirname = self.make_dirname() if self.on_disk else None
+        self.db = self.open_database(self.dirname)
+        self.addCleanup(lambda: self.db.close())
+
+    def make_dirname(self):
+        """
+        Return a temporary directory, that is removed after the test.
+        """
+        dirname = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, dirname)
+        return dirname
+
+    def open_database(self, dirname=None, **kwargs):
+        """
+        Return a SQLite database loaded from dirname, or in memory.
+        """
+        db = make_database("sqlite")
+        db.load(dirname or ":memory:", **kwargs)
+        return db
+
+    def set_config(self, key, value):
+        """
+        Change a config setting until the end of the test.
+        """
+        self.addCleanup(config.set, key, config.get(key))
+        config.set(key, value)
+
+
 # -------------------------------------------------------------------------
 #
 # DbRandomTest class
@@ -654,6 +727,45 @@ class DbRandomTest(unittest.TestCase):
     def test_iter_tag_handles(self):
         self.__iter_handles_test("Tag", self.db.iter_tag_handles)
 
+    def test_iter_all_person_handles(self):
+        self.assertEqual(
+            sorted(self.db.iter_person_handles()), sorted(self.handles["Person"])
+        )
+
+    ################################################################
+    #
+    # Test get_*_from_handles and get_*_handles_page methods
+    #
+    ################################################################
+
+    def test_get_people_from_handles(self):
+        handles = list(reversed(self.handles["Person"]))
+        people = self.db.get_people_from_handles(handles)
+        self.assertEqual([person.handle for person in people], handles)
+
+    def test_get_people_from_handles_cached(self):
+        handles = self.handles["Person"]
+        self.db.clear_cache()
+        self.db.get_person_from_handle(handles[2])
+        people = self.db.get_people_from_handles(handles)
+        self.assertEqual([person.handle for person in people], handles)
+
+    def test_get_people_from_handles_missing(self):
+        with self.assertRaises(HandleError):
+            self.db.get_people_from_handles(self.handles["Person"] + ["missing"])
+
+    def test_get_raw_person_data_from_handles(self):
+        handle = self.handles["Person"][0]
+        data = self.db.get_raw_person_data_from_handles([handle, "missing"])
+        self.assertEqual(data[0][0], handle)
+        self.assertIsNone(data[1])
+
+    def test_get_person_handles_page(self):
+        handles = sorted(self.handles["Person"])
+        self.assertEqual(self.db.get_person_handles_page(limit=2), handles[:2])
+        self.assertEqual(self.db.get_person_handles_page(handles[1], 2), handles[2:4])
+        self.assertEqual(self.db.get_person_handles_page(handles[-1], 2), [])
+
     ################################################################
     #
     # Test iter_* methods
@@ -729,6 +841,132 @@ class DbRandomTest(unittest.TestCase):
         self.assertEqual(self.db.get_total(), total)
 
 
+# -------------------------------------------------------------------------
+#
+# DbCacheTest class
+#
+# -------------------------------------------------------------------------
+class DbCacheTest(DbTestCase):
+    """
+    Tests for the object cache.
+    """
+
+    def setUp(self):
+        super().setUp()
+        self.person = Person()
+        self.person.set_gramps_id("C0001")
+        self.person.primary_name.first_name = "Before"
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(self.person, trans)
+
+    def __get_first_name(self):
+        person = self.db.get_person_from_handle(self.person.handle)
+        return person.primary_name.first_name
+
+    def __change_first_name(self, first_name):
+        self.person.primary_name.first_name = first_name
+        with DbTxn("Edit person", self.db) as trans:
+            self.db.commit_person(self.person, trans)
+
+    def test_statistics(self):
+        self.db.clear_cache()
+        hits, misses, entries = self.db.get_cache_statistics()["person"]
+        self.__get_first_name()
+        self.__get_first_name()
+        self.assertEqual(
+            self.db.get_cache_statistics()["person"], (hits + 1, misses + 1, 1)
+        )
+
+    def test_hit(self):
+        self.__get_first_name()
+        with mock.patch.object(self.db, "_get_raw_blob") as get_raw_blob:
+            self.assertEqual(self.__get_first_name(), "Before")
+        get_raw_blob.assert_not_called()
+
+    def test_copy(self):
+        person = self.db.get_person_from_handle(self.person.handle)
+        person.add_family_handle("F0001")
+        person = self.db.get_person_from_handle(self.person.handle)
+        self.assertEqual(person.get_family_handle_list(), [])
+
+    def test_commit(self):
+        self.assertEqual(self.__get_first_name(), "Before")
+        self.__change_first_name("After")
+        self.assertEqual(self.__get_first_name(), "After")
+
+    def test_undo_redo(self):
+        self.assertEqual(self.__get_first_name(), "Before")
+        self.__change_first_name("After")
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.__get_first_name(), "Before")
+        self.assertTrue(self.db.redo())
+        self.assertEqual(self.__get_first_name(), "After")
+
+    def test_remove(self):
+        self.assertEqual(self.__get_first_name(), "Before")
+        with DbTxn("Remove person", self.db) as trans:
+            self.db.remove_person(self.person.handle, trans)
+        self.assertFalse(self.db.has_person_handle(self.person.handle))
+
+    def test_abort(self):
+        self.assertEqual(self.__get_first_name(), "Before")
+        try:
+            with DbTxn("Edit person", self.db) as trans:
+                self.person.primary_name.first_name = "Aborted"
+                self.db.commit_person(self.person, trans)
+                raise RuntimeError
+        except RuntimeError:
+            pass
+        self.assertEqual(self.__get_first_name(), "Before")
+
+
+# -------------------------------------------------------------------------
+#
+# DbBacklinkTest class
+#
+# -------------------------------------------------------------------------
+class DbBacklinkTest(DbTestCase):
+    """
+    Tests for backlink queries.
+    """
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add objects", self.db) as trans:
+            self.note = Note("linked")
+            self.db.add_note(self.note, trans)
+            self.unused = Note("unused")
+            self.db.add_note(self.unused, trans)
+            for num in range(3):
+                person = Person()
+                person.add_note(self.note.handle)
+                self.db.add_person(person, trans)
+            event = Event()
+            event.add_note(self.note.handle)
+            self.db.add_event(event, trans)
+
+    def test_include_classes(self):
+        backlinks = list(self.db.find_backlink_handles(self.note.handle, ["Event"]))
+        self.assertEqual(len(backlinks), 1)
+        self.assertEqual(backlinks[0][0], "Event")
+
+    def test_count(self):
+        self.assertEqual(self.db.count_backlinks(self.note.handle), 4)
+        self.assertEqual(self.db.count_backlinks(self.note.handle, ["Person"]), 3)
+        self.assertEqual(self.db.count_backlinks(self.unused.handle), 0)
+
+    def test_count_many(self):
+        handles = [self.note.handle, self.unused.handle]
+        self.assertEqual(
+            self.db.count_backlinks_many(handles),
+            {self.note.handle: 4, self.unused.handle: 0},
+        )
+        self.assertEqual(
+            self.db.count_backlinks_many(handles, ["Event"]),
+            {self.note.handle: 1, self.unused.handle: 0},
+        )
+
+
 # -------------------------------------------------------------------------
 #
 # DbEmptyTest class
@@ -827,6 +1065,138 @@ class DbEmptyTest(unittest.TestCase):
         self.assertEqual(self.db.get_total(), 0)
 
 
+# -------------------------------------------------------------------------
+#
+# DbMetadataTest class
+#
+# -------------------------------------------------------------------------
+class DbMetadataTest(DbTestCase):
+    """
+    Tests for reading the metadata when it is first used.
+    """
+
+    on_disk = True
+
+    def __reload(self):
+        self.db.close()
+        self.db = self.open_database(self.dirname)
+
+    def test_lazy(self):
+        self.assertNotIn("event_names", vars(self.db))
+        self.assertNotIn("bookmarks", vars(self.db))
+        self.assertEqual(self.db.get_event_types(), [])
+        self.assertIn("event_names", vars(self.db))
+
+    def test_changed(self):
+        with DbTxn("Add event", self.db) as trans:
+            event = Event()
+            event.set_type((EventType.CUSTOM, "Graduation party"))
+            self.db.add_event(event, trans)
+            self.db.add_person(Person(), trans)
+        self.db.get_bookmarks().append(event.handle)
+        self.__reload()
+        self.assertEqual(self.db.get_event_types(), ["Graduation party"])
+        self.assertEqual(self.db.get_bookmarks().get(), [event.handle])
+        self.assertEqual(self.db.pmap_index, 1)
+        self.assertEqual(self.db.find_next_event_gramps_id(), "E0001")
+
+    def test_unchanged(self):
+        self.db.get_event_types()
+        self.db.get_note_bookmarks()
+        self.__reload()
+        written = []
+        set_metadata = self.db._set_metadata
+
+        def record_metadata(key, value):
+            written.append(key)
+            set_metadata(key, value)
+
+        self.db._set_metadata = record_metadata
+        self.db.get_event_types()
+        self.db.get_note_bookmarks().append("handle")
+        self.db.close()
+        self.assertIn("note_bookmarks", written)
+        self.assertNotIn("event_names", written)
+        self.assertNotIn("bookmarks", written)
+        self.db.load(self.dirname)
+        self.assertEqual(self.db.get_note_bookmarks().get(), ["handle"])
+
+    def test_id_allocators(self):
+        with DbTxn("Add people", self.db) as trans:
+            for gramps_id in ("I0000", "I0001", "I0003"):
+                person = Person()
+                person.set_gramps_id(gramps_id)
+                self.db.add_person(person, trans)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+        self.__reload()
+        self.assertEqual(
+            self.db._get_metadata("id_allocators"), {PERSON_KEY: ("I%04d", 3)}
+        )
+        self.assertEqual(self.db._id_allocators[PERSON_KEY].numbers, {3})
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+
+    ################################################################
+    #
+    # Test read_summary method
+    #
+    ################################################################
+
+    def __read_summary(self):
+        return make_database("sqlite").read_summary(self.dirname)
+
+    def test_summary_counts(self):
+        with DbTxn("Add people", self.db) as trans:
+            people = [Person() for _ in range(3)]
+            for person in people:
+                self.db.add_person(person, trans)
+            self.db.add_family(Family(), trans)
+        with DbTxn("Remove person", self.db) as trans:
+            self.db.remove_person(people[0].handle, trans)
+        summary = self.__read_summary()
+        self.assertEqual(summary["Number of people"], 2)
+        self.assertEqual(summary["Number of families"], 1)
+        self.assertEqual(summary["Number of events"], 0)
+        self.db.undo()
+        self.assertEqual(self.__read_summary()["Number of people"], 3)
+
+    def test_summary_bulk(self):
+        people = []
+        for index in range(5):
+            person = Person()
+            person.set_handle("bulk%d" % index)
+            people.append(person)
+        for dummy in range(2):
+            with DbTxn("Commit people", self.db) as trans:
+                self.db.commit_many(people, trans)
+        self.assertEqual(self.__read_summary()["Number of people"], 5)
+
+    def test_summary(self):
+        summary = self.__read_summary()
+        self.assertEqual(summary["Schema version"], str(self.db.VERSION[0]))
+        self.assertEqual(summary["Last changed"], "Never")
+        self.assertEqual(
+            set(summary) - {"Database size"},
+            set(self.db.get_summary()) - {"Database size"},
+        )
+
+    def test_summary_no_counts(self):
+        self.db.dbapi.execute("DROP TABLE object_count")
+        self.db.dbapi.commit()
+        self.assertIsNone(self.__read_summary())
+
+    def test_summary_count_existing(self):
+        # Upgraded databases start with the objects they hold.
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(Person(), trans)
+        for table in KEY_TO_NAME_MAP.values():
+            for event in ("insert", "delete"):
+                self.db.dbapi.execute("DROP TRIGGER %s_count_%s" % (table, event))
+        self.db.dbapi.execute("DROP TABLE object_count")
+        self.db._create_object_counts()
+        self.db.dbapi.commit()
+        self.assertEqual(self.__read_summary()["Number of people"], 1)
+
+
 # -------------------------------------------------------------------------
 #
 # DbPersonTest class
@@ -883,6 +1253,74 @@ class DbPersonTest(unittest.TestCase):
         for surname in surname_list:
             self.assertIn(surname, self.all_surnames)
 
+    def test_iter_surnames(self):
+        self.assertEqual(
+            list(self.db.iter_surnames()),
+            ["Allen", "Baker", "Clark", "Davis", "Evans"],
+        )
+        self.assertEqual(list(self.db.iter_surnames("Ba")), ["Baker"])
+        self.assertEqual(list(self.db.iter_surnames("Bb")), [])
+
+    def test_surname_frequency(self):
+        self.assertEqual(
+            self.db.surname_frequency(),
+            {"Allen": 2, "Baker": 2, "Clark": 2, "Davis": 2, "Evans": 2},
+        )
+
+    def test_surname_changes(self):
+        person = next(
+            person
+            for person in self.db.iter_people()
+            if person.primary_name.get_surname() == "Evans"
+        )
+        person.primary_name.get_primary_surname().set_surname("Allen")
+        with DbTxn("Change surname", self.db) as trans:
+            self.db.commit_person(person, trans)
+        frequency = self.db.surname_frequency()
+        self.assertEqual(frequency["Allen"], 3)
+        self.assertEqual(frequency["Evans"], 1)
+        with DbTxn("Remove person", self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.assertEqual(self.db.surname_frequency()["Allen"], 2)
+        self.db.undo()
+        self.db.undo()
+        frequency = self.db.surname_frequency()
+        self.assertEqual(frequency["Allen"], 2)
+        self.assertEqual(frequency["Evans"], 2)
+
+    def test_surname_list_attribute(self):
+        person = Person()
+        surname = Surname()
+        surname.surname = "Frost"
+        person.primary_name.set_surname_list([surname])
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+        self.assertEqual(self.db.surname_list, self.db.get_surname_list())
+        self.assertIn("Frost", self.db.surname_list)
+        with DbTxn("Remove person", self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.assertNotIn("Frost", self.db.surname_list)
+
+    def test_surname_bulk(self):
+        people = list(self.db.iter_people())
+        for person in people:
+            person.primary_name.get_primary_surname().set_surname("Frost")
+        with DbTxn("Change surnames", self.db) as trans:
+            self.db.commit_many(people, trans)
+        self.assertEqual(self.db.surname_frequency(), {"Frost": 10})
+        self.assertEqual(self.db.get_surname_list(), ["Frost"])
+
+    def test_surname_fallback(self):
+        # Read-only databases of an older version have no surname counts.
+        self.db.dbapi.execute("ALTER TABLE surname_count RENAME TO old_count")
+        self.db._surname_counts = None
+        try:
+            self.assertEqual(self.db.surname_frequency()["Davis"], 2)
+            self.assertEqual(list(self.db.iter_surnames("C")), ["Clark"])
+        finally:
+            self.db.dbapi.execute("ALTER TABLE old_count RENAME TO surname_count")
+            self.db._surname_counts = None
+
     ################################################################
     #
     # Test gender stats
@@ -899,5 +1337,911 @@ class DbPersonTest(unittest.TestCase):
         self.assertEqual(saved["Mary"], (1, 3, 1))
 
 
+# -------------------------------------------------------------------------
+#
+# DbSortKeyTest class
+#
+# -------------------------------------------------------------------------
+class DbSortKeyTest(DbTestCase):
+    """
+    Tests for the sort key columns.
+    """
+
+    on_disk = True
+    SURNAMES = ["Zimmer", "apple", "Bär", "Baker", "Ödegaard", "Olsen", ""]
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add people", self.db) as trans:
+            for surname in self.SURNAMES:
+                person = Person()
+                person.primary_name.add_surname(Surname())
+                person.primary_name.get_primary_surname().set_surname(surname)
+                self.db.add_person(person, trans)
+                source = Source()
+                source.set_title(surname)
+                self.db.add_source(source, trans)
+
+    def __surnames(self):
+        return [
+            self.db.get_person_from_handle(handle).primary_name.get_surname()
+            for handle in self.db.get_person_handles(sort_handles=True)
+        ]
+
+    def test_sorted(self):
+        expected = sorted(self.SURNAMES, key=glocale.sort_key)
+        self.assertEqual(self.__surnames(), expected)
+        self.assertEqual(
+            [
+                self.db.get_source_from_handle(handle).get_title()
+                for handle in self.db.get_source_handles(sort_handles=True)
+            ],
+            expected,
+        )
+        # Without the keys, the text is sorted with the collation.
+        self.db._sort_key_collation = None
+        self.assertEqual(self.__surnames(), expected)
+
+    def test_index_scan(self):
+        self.db.dbapi.execute(
+            "EXPLAIN QUERY PLAN SELECT handle FROM person ORDER BY surname_key"
+        )
+        plan = " ".join(str(row[-1]) for row in self.db.dbapi.fetchall())
+        self.assertIn("person_surname_key", plan)
+        self.assertNotIn("TEMP B-TREE", plan)
+
+    def test_locale_change(self):
+        self.db._txn_begin()
+        self.db.dbapi.execute("UPDATE person SET surname_key = NULL")
+        self.db._put_metadata("sort_key_collation", "xx")
+        self.db._txn_commit()
+        self.db.close()
+        self.db.load(self.dirname)
+        self.assertEqual(
+            self.db._get_metadata("sort_key_collation"), glocale.get_collation()
+        )
+        self.assertEqual(self.__surnames(), sorted(self.SURNAMES, key=glocale.sort_key))
+        self.db.dbapi.execute("SELECT COUNT(*) FROM person WHERE surname_key IS NULL")
+        self.assertEqual(self.db.dbapi.fetchone()[0], 0)
+
+
+# -------------------------------------------------------------------------
+#
+# DbVitalsTest class
+#
+# -------------------------------------------------------------------------
+class DbVitalsTest(DbTestCase):
+    """
+    Tests for the person_vitals table.
+    """
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add person", self.db) as trans:
+            self.birth = self.__add_event(EventType.BIRTH, 1820, trans)
+            self.burial = self.__add_event(EventType.BURIAL, 1880, trans)
+            self.person = Person()
+            birth_ref = EventRef()
+            birth_ref.ref = self.birth.handle
+            self.person.set_birth_ref(birth_ref)
+            burial_ref = EventRef()
+            burial_ref.ref = self.burial.handle
+            self.person.add_event_ref(burial_ref)
+            self.db.add_person(self.person, trans)
+
+    def __add_event(self, event_type, year, trans):
+        event = Event()
+        event.set_type(event_type)
+        event.set_date_object(Date(year, 5, 1))
+        self.db.add_event(event, trans)
+        return event
+
+    def __born(self, start, stop):
+        return self.db.find_person_handles_by_date(
+            "birth", Date(start, 1, 1).sortval, Date(stop, 12, 31).sortval
+        )
+
+    def test_vitals(self):
+        vitals = self.db.get_person_vitals(self.person.handle)
+        self.assertEqual(vitals.birth_handle, self.birth.handle)
+        self.assertEqual(vitals.birth_sortval, self.birth.get_date_object().sortval)
+        self.assertFalse(vitals.birth_fallback)
+        self.assertEqual(vitals.death_handle, self.burial.handle)
+        self.assertTrue(vitals.death_fallback)
+        self.assertEqual(vitals.burial_sortval, self.burial.get_date_object().sortval)
+        self.assertIsNone(vitals.baptism_sortval)
+        self.assertEqual(vitals.event_count, 2)
+        self.assertEqual(
+            DbReadBase.get_person_vitals(self.db, self.person.handle), vitals
+        )
+
+    def test_date_range(self):
+        self.assertEqual(self.__born(1800, 1850), [self.person.handle])
+        self.assertEqual(self.__born(1850, 1900), [])
+        self.assertEqual(
+            DbReadBase.find_person_handles_by_date(
+                self.db, "burial", Date(1850, 1, 1).sortval
+            ),
+            [self.person.handle],
+        )
+
+    def test_event_changes(self):
+        with DbTxn("Edit birth", self.db) as trans:
+            self.birth.set_date_object(Date(1860, 5, 1))
+            self.db.commit_event(self.birth, trans)
+        self.assertEqual(self.__born(1800, 1850), [])
+        self.assertEqual(self.__born(1850, 1900), [self.person.handle])
+        with DbTxn("Remove burial", self.db) as trans:
+            self.db.remove_event(self.burial.handle, trans)
+        self.assertIsNone(self.db.get_person_vitals(self.person.handle).death_handle)
+        self.db.undo()
+        vitals = self.db.get_person_vitals(self.person.handle)
+        self.assertEqual(vitals.death_handle, self.burial.handle)
+
+    def test_shared_event(self):
+        handles = [self.person.handle]
+        with DbTxn("Add people", self.db) as trans:
+            for dummy in range(3):
+                person = Person()
+                birth_ref = EventRef()
+                birth_ref.ref = self.birth.handle
+                person.set_birth_ref(birth_ref)
+                self.db.add_person(person, trans)
+                handles.append(person.handle)
+        # The people are read in one batch, not one at a time.
+        with mock.patch.object(
+            self.db, "get_person_from_handle", side_effect=AssertionError
+        ):
+            with DbTxn("Edit birth", self.db) as trans:
+                self.birth.set_date_object(Date(1860, 5, 1))
+                self.db.commit_event(self.birth, trans)
+        self.assertEqual(sorted(self.__born(1850, 1900)), sorted(handles))
+
+
+# -------------------------------------------------------------------------
+#
+# DbFamilyLinkTest class
+#
+# -------------------------------------------------------------------------
+class DbFamilyLinkTest(DbTestCase):
+    """
+    Tests for the family_link table and the ancestor and descendant queries.
+    """
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add people", self.db) as trans:
+            self.grandfather = self.__add_person(trans)
+            self.father = self.__add_person(trans)
+            self.mother = self.__add_person(trans)
+            self.child = self.__add_person(trans)
+            self.family1 = self.__add_family(self.grandfather, None, self.father, trans)
+            self.family2 = self.__add_family(
+                self.father, self.mother, self.child, trans
+            )
+
+    def __add_person(self, trans):
+        person = Person()
+        self.db.add_person(person, trans)
+        return person
+
+    def __add_family(self, father, mother, child, trans):
+        family = Family()
+        self.db.add_family(family, trans)
+        for parent in (father, mother):
+            if parent:
+                parent.add_family_handle(family.handle)
+                self.db.commit_person(parent, trans)
+        family.set_father_handle(father.handle)
+        if mother:
+            family.set_mother_handle(mother.handle)
+        child_ref = ChildRef()
+        child_ref.ref = child.handle
+        family.add_child_ref(child_ref)
+        child.add_parent_family_handle(family.handle)
+        self.db.commit_person(child, trans)
+        self.db.commit_family(family, trans)
+        return family
+
+    def test_ancestors(self):
+        expected = {
+            self.father.handle: 1,
+            self.mother.handle: 1,
+            self.grandfather.handle: 2,
+        }
+        self.assertEqual(self.db.get_ancestor_handles(self.child.handle), expected)
+        self.assertEqual(
+            DbReadBase.get_ancestor_handles(self.db, self.child.handle), expected
+        )
+        self.assertEqual(
+            set(self.db.get_ancestor_handles(self.child.handle, 1)),
+            {self.father.handle, self.mother.handle},
+        )
+
+    def test_main_family(self):
+        with DbTxn("Add step family", self.db) as trans:
+            stepfather = self.__add_person(trans)
+            family3 = self.__add_family(stepfather, None, self.child, trans)
+        main = {
+            self.father.handle: 1,
+            self.mother.handle: 1,
+            self.grandfather.handle: 2,
+        }
+        self.assertEqual(
+            self.db.get_ancestor_handles(self.child.handle, main_family=True), main
+        )
+        self.assertEqual(
+            DbReadBase.get_ancestor_handles(
+                self.db, self.child.handle, main_family=True
+            ),
+            main,
+        )
+        self.assertIn(
+            stepfather.handle, self.db.get_ancestor_handles(self.child.handle)
+        )
+
+        self.child.set_main_parent_family_handle(family3.handle)
+        with DbTxn("Change main family", self.db) as trans:
+            self.db.commit_person(self.child, trans)
+        main = {stepfather.handle: 1}
+        self.assertEqual(
+            self.db.get_ancestor_handles(self.child.handle, main_family=True), main
+        )
+        self.db.rebuild_secondary()
+        self.assertEqual(
+            self.db.get_ancestor_handles(self.child.handle, main_family=True), main
+        )
+
+    def test_for_each_ancestor(self):
+        found = []
+        self.assertEqual(
+            for_each_ancestor(
+                self.db,
+                [self.child.handle],
+                lambda data, handle: found.append(handle),
+                None,
+            ),
+            0,
+        )
+        self.assertEqual(found[0], self.child.handle)
+        self.assertEqual(found[-1], self.grandfather.handle)
+        self.assertEqual(len(found), 4)
+        self.assertEqual(
+            for_each_ancestor(
+                self.db,
+                [self.child.handle],
+                lambda data, handle: handle == data,
+                self.grandfather.handle,
+            ),
+            1,
+        )
+
+    def test_descendants(self):
+        expected = {self.father.handle: 1, self.child.handle: 2}
+        self.assertEqual(
+            self.db.get_descendant_handles(self.grandfather.handle), expected
+        )
+        self.assertEqual(
+            DbReadBase.get_descendant_handles(self.db, self.grandfather.handle),
+            expected,
+        )
+        self.assertEqual(self.db.get_descendant_handles(self.child.handle), {})
+
+    def test_families_of_parent(self):
+        self.assertEqual(
+            self.db.get_families_of_parent(self.grandfather.handle),
+            [self.family1.handle],
+        )
+        self.assertEqual(
+            self.db.get_families_of_parent(self.father.handle),
+            [self.family2.handle],
+        )
+        self.assertEqual(
+            self.db.get_families_of_parent(self.mother.handle),
+            [self.family2.handle],
+        )
+        self.assertEqual(
+            DbReadBase.get_families_of_parent(self.db, self.mother.handle),
+            [self.family2.handle],
+        )
+        self.assertEqual(self.db.get_families_of_parent(self.child.handle), [])
+
+        # Both lookups use an index, and the family table is not scanned.
+        with mock.patch.object(
+            self.db.dbapi, "execute", wraps=self.db.dbapi.execute
+        ) as execute:
+            self.db.get_families_of_parent(self.mother.handle)
+        sql, args = execute.call_args[0]
+        self.db.dbapi.execute("EXPLAIN QUERY PLAN " + sql, args)
+        plan = " ".join(str(row[-1]) for row in self.db.dbapi.fetchall())
+        self.assertIn("family_father_handle", plan)
+        self.assertIn("family_mother_handle", plan)
+        self.assertNotIn("SCAN family", plan)
+
+    def test_remove_undo(self):
+        with DbTxn("Remove family", self.db) as trans:
+            self.db.remove_family(self.family1.handle, trans)
+        self.assertEqual(self.db.get_descendant_handles(self.grandfather.handle), {})
+        self.db.undo()
+        self.assertEqual(
+            self.db.get_descendant_handles(self.grandfather.handle),
+            {self.father.handle: 1, self.child.handle: 2},
+        )
+
+
+# -------------------------------------------------------------------------
+#
+# DbTextIndexTest class
+#
+# -------------------------------------------------------------------------
+class DbTextIndexTest(DbTestCase):
+    """
+    Tests for the full-text index.
+    """
+
+    def setUp(self):
+        super().setUp()
+        if not self.db._has_text_index():
+            self.skipTest("SQLite has no FTS5 trigram tokenizer")
+        with DbTxn("Add objects", self.db) as trans:
+            self.note = Note("The quick brown fox")
+            self.db.add_note(self.note, trans)
+            self.person = Person()
+            self.person.primary_name.set_first_name("Anna")
+            self.db.add_person(self.person, trans)
+            self.event = Event()
+            self.event.set_description("Baptism of anna")
+            self.db.add_event(self.event, trans)
+
+    def __search(self, *args, **kwargs):
+        return sorted(self.db.search_text(*args, **kwargs))
+
+    def test_substring(self):
+        self.assertEqual(self.__search("BROWN"), [("Note", self.note.handle)])
+        self.assertEqual(
+            self.__search("anna"),
+            sorted([("Person", self.person.handle), ("Event", self.event.handle)]),
+        )
+        self.assertEqual(
+            self.__search("anna", ["Event"]), [("Event", self.event.handle)]
+        )
+        self.assertEqual(self.__search("fo"), [("Note", self.note.handle)])
+
+    def test_case_sensitive(self):
+        self.assertEqual(
+            self.__search("Anna", case_sensitive=True),
+            [("Person", self.person.handle)],
+        )
+        self.assertEqual(self.__search("Anna", ["Event"], case_sensitive=True), [])
+
+    def test_regex(self):
+        self.assertEqual(
+            self.__search("^the .* fox$", regex=True), [("Note", self.note.handle)]
+        )
+        self.assertEqual(self.__search("^the", regex=True, case_sensitive=True), [])
+        self.assertIsNone(self.db.search_text("(", regex=True))
+
+    def test_update_remove(self):
+        with DbTxn("Edit note", self.db) as trans:
+            self.note.set("A lazy dog")
+            self.db.commit_note(self.note, trans)
+        self.assertEqual(self.__search("brown"), [])
+        self.assertEqual(self.__search("lazy"), [("Note", self.note.handle)])
+        with DbTxn("Remove note", self.db) as trans:
+            self.db.remove_note(self.note.handle, trans)
+        self.assertEqual(self.__search("lazy"), [])
+        self.db.undo()
+        self.assertEqual(self.__search("lazy"), [("Note", self.note.handle)])
+
+
+# -------------------------------------------------------------------------
+#
+# DbCommitTest class
+#
+# -------------------------------------------------------------------------
+class DbCommitTest(DbTestCase):
+    """
+    Tests for adding and committing objects.
+    """
+
+    ################################################################
+    #
+    # Test commit_many method
+    #
+    ################################################################
+
+    def __make_people(self, count):
+        with DbTxn("Add note", self.db) as trans:
+            note = Note("bulk")
+            self.db.add_note(note, trans)
+        people = []
+        for index in range(count):
+            person = Person()
+            person.set_handle("bulk%04d" % index)
+            person.set_gramps_id("B%04d" % index)
+            person.primary_name.first_name = "Name%d" % index
+            person.add_note(note.handle)
+            people.append(person)
+        return people, note
+
+    def __check_people(self, people, note):
+        self.assertEqual(self.db.get_number_of_people(), len(people))
+        for person in people:
+            saved = self.db.get_person_from_handle(person.handle)
+            self.assertEqual(saved.serialize(), person.serialize())
+            self.assertEqual(
+                self.db.get_person_from_gramps_id(person.gramps_id).handle,
+                person.handle,
+            )
+        backlinks = list(self.db.find_backlink_handles(note.handle))
+        self.assertEqual(len(backlinks), len(people))
+
+    def test_commit_many_batch(self):
+        people, note = self.__make_people(25)
+        with DbTxn("Bulk add", self.db, batch=True) as trans:
+            self.db.commit_many(people, trans)
+        self.__check_people(people, note)
+
+    def test_commit_many_update(self):
+        people, note = self.__make_people(25)
+        with DbTxn("Bulk add", self.db, batch=True) as trans:
+            self.db.commit_many(people, trans)
+        for person in people:
+            person.set_note_list([])
+            person.primary_name.first_name = "Changed"
+        with DbTxn("Bulk update", self.db, batch=True) as trans:
+            self.db.commit_many(people, trans)
+        for person in people:
+            saved = self.db.get_person_from_handle(person.handle)
+            self.assertEqual(saved.primary_name.first_name, "Changed")
+        self.assertEqual(list(self.db.find_backlink_handles(note.handle)), [])
+
+    def test_commit_many_portable(self):
+        # Backends without executemany and UPSERT.
+        people, note = self.__make_people(25)
+        write_rows = DBAPI._write_rows.__get__(self.db)
+        with mock.patch.object(self.db.dbapi, "executemany", None):
+            with mock.patch.object(self.db, "_write_rows", write_rows):
+                with DbTxn("Bulk add", self.db, batch=True) as trans:
+                    self.db.commit_many(people[:10], trans)
+                with DbTxn("Bulk add", self.db, batch=True) as trans:
+                    self.db.commit_many(people, trans)
+        self.__check_people(people, note)
+
+    def test_commit_many_undo(self):
+        people, note = self.__make_people(25)
+        with DbTxn("Bulk add", self.db) as trans:
+            self.db.commit_many(people, trans)
+        self.__check_people(people, note)
+        self.assertTrue(self.db.undo())
+        self.assertEqual(self.db.get_number_of_people(), 0)
+        self.assertEqual(list(self.db.find_backlink_handles(note.handle)), [])
+        self.assertTrue(self.db.redo())
+        self.__check_people(people, note)
+
+    ################################################################
+    #
+    # Test find_next_*_gramps_id methods
+    #
+    ################################################################
+
+    def __add_person(self, gramps_id):
+        person = Person()
+        person.set_gramps_id(gramps_id)
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+        return person
+
+    def test_gramps_id_skip_used(self):
+        for gramps_id in ("I0000", "I0001", "I0003"):
+            self.__add_person(gramps_id)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0004")
+
+    def test_gramps_id_commit_after_scan(self):
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0000")
+        self.__add_person("I0001")
+        person = self.__add_person("I0002")
+        with DbTxn("Remove person", self.db) as trans:
+            self.db.remove_person(person.handle, trans)
+        self.assertEqual(self.db.find_next_person_gramps_id(), "I0002")
+
+    def test_gramps_id_prefix_change(self):
+        self.__add_person("X0")
+        self.db.set_person_id_prefix("X%d")
+        self.assertEqual(self.db.find_next_person_gramps_id(), "X1")
+
+    ################################################################
+    #
+    # Test signals
+    #
+    ################################################################
+
+    def __record_signals(self):
+        signals = []
+        for signal in ("person-add", "person-update", "person-delete"):
+            self.db.connect(
+                signal,
+                lambda handles, signal=signal: signals.append((signal, handles)),
+            )
+        return signals
+
+    def test_signal_net_changes(self):
+        signals = self.__record_signals()
+        person = Person()
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+            self.db.commit_person(person, trans)
+            self.db.commit_person(person, trans)
+        self.assertEqual(
+            signals,
+            [("person-add", [person.handle]), ("person-update", [person.handle])],
+        )
+
+    def test_signal_coalesce(self):
+        signals = self.__record_signals()
+        people = [Person() for num in range(3)]
+        with self.db.coalesce_signals():
+            for person in people:
+                with DbTxn("Add person", self.db) as trans:
+                    self.db.add_person(person, trans)
+            with DbTxn("Remove person", self.db) as trans:
+                self.db.remove_person(people[0].handle, trans)
+            self.assertEqual(signals, [])
+        self.assertEqual(
+            signals,
+            [("person-add", [people[1].handle, people[2].handle])],
+        )
+
+
+# -------------------------------------------------------------------------
+#
+# DbUndoTest class
+#
+# -------------------------------------------------------------------------
+class DbUndoTest(DbTestCase):
+    """
+    Tests for undo records moved out of memory.
+    """
+
+    settings = {"database.undo-window": 4}
+
+    def test_undo_redo(self):
+        person = Person()
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+        for num in range(10):
+            person.primary_name.first_name = "Name%d" % num
+            with DbTxn("Edit person", self.db) as trans:
+                self.db.commit_person(person, trans)
+        self.assertEqual(dict(trans), {})
+        self.assertLessEqual(len(self.db.undodb.window), 4)
+        for num in range(9, 0, -1):
+            self.assertTrue(self.db.undo())
+            person = self.db.get_person_from_handle(person.handle)
+            self.assertEqual(person.primary_name.first_name, "Name%d" % (num - 1))
+        for num in range(1, 10):
+            self.assertTrue(self.db.redo())
+            person = self.db.get_person_from_handle(person.handle)
+            self.assertEqual(person.primary_name.first_name, "Name%d" % num)
+
+
+# -------------------------------------------------------------------------
+#
+# DbChangelogTest class
+#
+# -------------------------------------------------------------------------
+class DbChangelogTest(DbTestCase):
+    """
+    Tests for the changelog table.
+    """
+
+    on_disk = True
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add person and note", self.db) as trans:
+            self.person = Person()
+            self.db.add_person(self.person, trans)
+            self.note = Note()
+            self.db.add_note(self.note, trans)
+
+    def __changes(self, timestamp=0, classes=None):
+        return [change[:3] for change in self.db.iter_changed_since(timestamp, classes)]
+
+    def test_changes(self):
+        with DbTxn("Edit person", self.db) as trans:
+            self.db.commit_person(self.person, trans)
+        with DbTxn("Remove note", self.db) as trans:
+            self.db.remove_note(self.note.handle, trans)
+        self.assertEqual(
+            self.__changes(classes=["Person"]),
+            [
+                ("Person", self.person.handle, TXNADD),
+                ("Person", self.person.handle, TXNUPD),
+            ],
+        )
+        self.assertEqual(
+            self.__changes(classes=["Note"]),
+            [("Note", self.note.handle, TXNADD), ("Note", self.note.handle, TXNDEL)],
+        )
+        self.db.undo()
+        self.assertEqual(
+            self.__changes(classes=["Note"])[-1], ("Note", self.note.handle, TXNADD)
+        )
+
+    def test_since(self):
+        with DbTxn("Edit person", self.db) as trans:
+            self.db.commit_person(self.person, trans, change_time=2**40)
+        self.assertEqual(
+            self.__changes(2**40), [("Person", self.person.handle, TXNUPD)]
+        )
+        self.assertEqual(
+            list(DbReadBase.iter_changed_since(self.db, 2**40)),
+            [("Person", self.person.handle, TXNUPD, 2**40)],
+        )
+
+    def test_prune(self):
+        for change_time in (2**40, 2**40, 2**40 + 1):
+            with DbTxn("Edit person", self.db) as trans:
+                self.db.commit_person(self.person, trans, change_time=change_time)
+        for size, times in ((2, [2**40, 2**40, 2**40 + 1]), (1, [2**40 + 1])):
+            self.set_config("database.changelog-size", size)
+            self.db.close()
+            self.db = self.open_database(self.dirname)
+            self.assertEqual(
+                [change[3] for change in self.db.iter_changed_since(0)], times
+            )
+
+    def test_bulk(self):
+        people = []
+        for index in range(3):
+            person = Person()
+            person.set_handle("bulk%04d" % index)
+            people.append(person)
+        with DbTxn("Add people", self.db) as trans:
+            self.db.commit_many(people, trans)
+        self.assertEqual(
+            self.__changes(classes=["Person"])[1:],
+            [("Person", person.handle, TXNADD) for person in people],
+        )
+
+
+# -------------------------------------------------------------------------
+#
+# DbRebuildTest class
+#
+# -------------------------------------------------------------------------
+class DbRebuildTest(DbTestCase):
+    """
+    Tests for rebuilding the secondary and reference tables in bulk.
+    """
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add family", self.db) as trans:
+            note = Note()
+            note.set("Born in the old mill")
+            self.db.add_note(note, trans)
+            birth = Event()
+            birth.set_type(EventType.BIRTH)
+            birth.set_date_object(Date(1820, 5, 1))
+            birth.add_note(note.handle)
+            self.db.add_event(birth, trans)
+            family = Family()
+            self.db.add_family(family, trans)
+            for index in range(5):
+                person = Person()
+                surname = Surname()
+                surname.set_surname("Miller")
+                person.primary_name.add_surname(surname)
+                person.primary_name.set_first_name("Child %d" % index)
+                event_ref = EventRef()
+                event_ref.ref = birth.handle
+                person.set_birth_ref(event_ref)
+                person.add_event_ref(event_ref)
+                self.db.add_person(person, trans)
+                if index == 0:
+                    family.set_father_handle(person.handle)
+                else:
+                    child_ref = ChildRef()
+                    child_ref.ref = person.handle
+                    family.add_child_ref(child_ref)
+            self.db.commit_family(family, trans)
+
+    def __get_rows(self):
+        rows = {}
+        for table, columns in (
+            ("reference", "*"),
+            ("person", "*"),
+            ("family_link", "*"),
+            ("person_vitals", "*"),
+            ("text_data", "obj_class, handle, text"),
+        ):
+            if table == "text_data" and not self.db._has_text_index():
+                continue
+            self.db.dbapi.execute("SELECT %s FROM %s" % (columns, table))
+            rows[table] = sorted(
+                self.db.dbapi.fetchall(), key=lambda row: [str(v) for v in row]
+            )
+        self.db.dbapi.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        rows["indexes"] = sorted(row[0] for row in self.db.dbapi.fetchall())
+        return rows
+
+    def __rebuild(self):
+        expected = self.__get_rows()
+        values = []
+        self.db.rebuild_secondary(lambda value, text=None: values.append(text))
+        self.db.reindex_reference_map(None)
+        self.assertEqual(self.__get_rows(), expected)
+        self.assertTrue(values)
+        self.assertTrue(all(text for text in values))
+
+    def test_rebuild(self):
+        self.__rebuild()
+
+    def test_rebuild_in_processes(self):
+        self.set_config("database.bulk-chunk-size", 2)
+        self.set_config("database.rebuild-processes", 2)
+        self.__rebuild()
+
+    def test_resume_rebuild(self):
+        expected = self.__get_rows()
+        # Only the people and the family were rebuilt before the interruption.
+        (family_handle,) = self.db.get_family_handles()
+        self.db._set_metadata("rebuild", (FAMILY_KEY, family_handle))
+        tables = ["reference"]
+        if self.db._has_text_index():
+            tables.append("text_data")
+        for table in tables:
+            self.db.dbapi.execute(
+                "DELETE FROM %s WHERE obj_class NOT IN ('Person', 'Family')" % table
+            )
+        self.db.dbapi.commit()
+        self.db._rebuild_indexes()
+        self.assertEqual(self.__get_rows(), expected)
+        self.assertIsNone(self.db._get_metadata("rebuild", None))
+
+    def test_resume_upgrade(self):
+        handles = sorted(self.db.get_person_handles())
+        UpdateCallback.__init__(self.db, None)
+        self.db._set_metadata("upgrade", (99, PERSON_KEY, handles[1]))
+        self.db._upgrade_tables(99, {PERSON_KEY: upgrade_person})
+        self.assertIsNone(self.db._get_metadata("upgrade", None))
+        self.assertEqual(self.db.get_schema_version(), 99)
+        for index, handle in enumerate(handles):
+            gramps_id = self.db.get_person_from_handle(handle).gramps_id
+            self.assertEqual(gramps_id.startswith("X"), index > 1)
+
+
+def upgrade_person(person):
+    """
+    Conversion for the upgrade test, that marks the Gramps ID of a person.
+    """
+    person = list(person)
+    person[1] = "X" + person[1]
+    return person
+
+
+# -------------------------------------------------------------------------
+#
+# DbCopyTest class
+#
+# -------------------------------------------------------------------------
+class DbCopyTest(DbTestCase):
+    """
+    Tests for snapshots of an open database, and copies loaded in memory.
+    """
+
+    on_disk = True
+
+    def setUp(self):
+        super().setUp()
+        with DbTxn("Add people", self.db) as trans:
+            for _ in range(10):
+                self.db.add_person(Person(), trans)
+
+    def test_snapshot_in_memory(self):
+        progress = []
+        snapshot = self.db.snapshot(callback=progress.append)
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(Person(), trans)
+        self.assertTrue(snapshot.readonly)
+        self.assertEqual(snapshot.get_number_of_people(), 10)
+        self.assertEqual(progress[-1], 100)
+        snapshot.close()
+
+    def test_snapshot_to_directory(self):
+        dirname = self.make_dirname()
+        self.assertIsNone(self.db.snapshot(dirname))
+        copy = self.open_database(dirname)
+        self.assertEqual(copy.get_number_of_people(), 10)
+        copy.close()
+        self.assertRaises(FileExistsError, self.db.snapshot, dirname)
+
+    def test_load_in_memory(self):
+        self.db.close()
+        self.db = self.open_database(self.dirname, in_memory=True)
+        self.assertTrue(self.db.readonly)
+        self.assertFalse(os.path.exists(os.path.join(self.dirname, "lock")))
+        self.assertEqual(self.db.get_number_of_people(), 10)
+        self.assertEqual(len(self.db._cache[PERSON_KEY].data), 10)
+        # Changes to the database are not seen in the copy.
+        db = self.open_database(self.dirname)
+        with DbTxn("Add person", db) as trans:
+            db.add_person(Person(), trans)
+        db.close()
+        self.assertEqual(self.db.get_number_of_people(), 10)
+
+
+# -------------------------------------------------------------------------
+#
+# DbReaderTest class
+#
+# -------------------------------------------------------------------------
+class DbReaderTest(DbTestCase):
+    """
+    Tests for reading from other threads in WAL mode.
+    """
+
+    on_disk = True
+    settings = {"database.wal-mode": True}
+
+    def __read_in_thread(self, func, *args):
+        result = []
+        thread = threading.Thread(target=lambda: result.append(func(*args)))
+        thread.start()
+        thread.join()
+        return result[0]
+
+    def test_read(self):
+        person = Person()
+        person.primary_name.first_name = "Reader"
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+        saved = self.__read_in_thread(self.db.get_person_from_handle, person.handle)
+        self.assertEqual(saved.primary_name.first_name, "Reader")
+        self.assertEqual(
+            self.__read_in_thread(self.db.get_number_of_people),
+            self.db.get_number_of_people(),
+        )
+        handles = self.__read_in_thread(
+            lambda: [handle for handle, data in self.db.get_person_cursor()]
+        )
+        self.assertIn(person.handle, handles)
+
+    def test_uncommitted(self):
+        person = Person()
+        with DbTxn("Add person", self.db) as trans:
+            self.db.add_person(person, trans)
+            self.assertTrue(self.db.has_person_handle(person.handle))
+            self.assertFalse(
+                self.__read_in_thread(self.db.has_person_handle, person.handle)
+            )
+        self.assertTrue(self.__read_in_thread(self.db.has_person_handle, person.handle))
+
+    def test_thread_end(self):
+        self.__read_in_thread(self.db.get_number_of_people)
+        gc.collect()
+        self.assertEqual(len(self.db.dbapi._Connection__reader_set), 0)
+
+    def __journal_mode(self, dirname, wal_mode):
+        self.set_config("database.wal-mode", wal_mode)
+        db = self.open_database(dirname)
+        db.dbapi.execute("PRAGMA journal_mode")
+        journal_mode = db.dbapi.fetchone()[0]
+        db.close()
+        return journal_mode
+
+    def test_journal_mode(self):
+        dirname = self.make_dirname()
+        self.assertEqual(self.__journal_mode(dirname, True), "wal")
+        self.assertEqual(self.__journal_mode(dirname, False), "delete")
+        connection = sqlite3.connect(os.path.join(dirname, "sqlite.db"))
+        connection.execute("PRAGMA journal_mode = WAL")
+        connection.close()
+        self.assertEqual(self.__journal_mode(dirname, False), "wal")
+
+
 if __name__ == "__main__":
     unittest.main()
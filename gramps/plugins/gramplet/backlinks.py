@@ -110,9 +110,7 @@ class Backlinks(Gramplet):
         """
         if not active_handle:
             return False
-        for handle in self.dbstate.db.find_backlink_handles(active_handle):
-            return True
-        return False
+        return self.dbstate.db.count_backlinks(active_handle) > 0
 
     def cb_double_click(self, treeview):
         """
@@ -34,14 +34,6 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.sgettext
 
-# ------------------------------------------------------------------------
-#
-# Constants
-#
-# ------------------------------------------------------------------------
-
-_YIELD_INTERVAL = 350
-
 
 # ------------------------------------------------------------------------
 #
@@ -94,46 +86,9 @@ class SurnameCloudGramplet(Gramplet):
 
     def main(self):
         self.set_text(_("Processing...") + "\n")
-        yield True
-        surnames = defaultdict(int)
-        representative_handle = {}
-
-        cnt = 0
-        namelist = []
-        for person in self.dbstate.db.iter_people():
-            allnames = [person.get_primary_name()] + person.get_alternate_names()
-            allnames = set([name.get_group_name().strip() for name in allnames])
-            for surname in allnames:
-                surnames[surname] += 1
-                representative_handle[surname] = person.handle
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-            # Count unique surnames
-            for name in [person.get_primary_name()] + person.get_alternate_names():
-                if (
-                    not name.get_surname().strip() in namelist
-                    and not name.get_surname().strip() == ""
-                ):
-                    namelist.append(name.get_surname().strip())
-
-        total_people = cnt
-        surname_sort = []
-        total = cnt = 0
-        for surname in surnames:
-            surname_sort.append((surnames[surname], surname))
-            total += surnames[surname]
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        surname_sort.sort(reverse=True)
-        cloud_names = []
-        cloud_values = []
-        for count, surname in surname_sort:
-            cloud_names.append((count, surname))
-            cloud_values.append(count)
-
+        surnames = self.dbstate.db.surname_frequency()
+        total_people = self.dbstate.db.get_number_of_people()
+        cloud_names = [(count, surname) for surname, count in surnames.items()]
         cloud_names.sort(key=lambda k: k[1])
         line = 0
         ### All done!
@@ -170,18 +125,22 @@ class SurnameCloudGramplet(Gramplet):
                 else:
                     text = surname
                 size = make_tag_size(count, counts, mins=mins, maxs=maxs)
-                self.link(
-                    text,
-                    "Surname",
-                    representative_handle[surname],
-                    size,
-                    "%s, %d%% (%d)"
-                    % (text, int((float(count) / total_people) * 100), count),
-                )
+                if surname:
+                    self.link(
+                        text,
+                        "Surname",
+                        surname,
+                        size,
+                        "%s, %d%% (%d)"
+                        % (text, int((float(count) / total_people) * 100), count),
+                    )
+                else:
+                    self.append_text(text)
                 self.append_text(" ")
                 showing += 1
         self.append_text(
-            ("\n\n" + _("Total unique surnames") + ": %d\n") % len(namelist)
+            ("\n\n" + _("Total unique surnames") + ": %d\n")
+            % len([surname for surname in surnames if surname.strip()])
         )
         self.append_text((_("Total surnames showing") + ": %d\n") % showing)
         self.append_text((_("Total people") + ": %d") % total_people, "begin")
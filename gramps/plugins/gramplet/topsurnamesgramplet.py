@@ -16,13 +16,6 @@
 # along with this program; if not, write to the Free Software
 # Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
 
-# ------------------------------------------------------------------------
-#
-# Python modules
-#
-# ------------------------------------------------------------------------
-from collections import defaultdict
-
 # ------------------------------------------------------------------------
 #
 # Gramps modules
@@ -34,13 +27,6 @@ from gramps.gen.const import GRAMPS_LOCALE as glocale
 
 _ = glocale.translation.sgettext
 
-# ------------------------------------------------------------------------
-#
-# Constants
-#
-# ------------------------------------------------------------------------
-_YIELD_INTERVAL = 350
-
 
 # ------------------------------------------------------------------------
 #
@@ -70,47 +56,23 @@ class TopSurnamesGramplet(Gramplet):
 
     def main(self):
         self.set_text(_("Processing...") + "\n")
-        surnames = defaultdict(int)
-        representative_handle = {}
-
-        cnt = 0
-        for person in self.dbstate.db.iter_people():
-            allnames = [person.get_primary_name()] + person.get_alternate_names()
-            allnames = set([name.get_group_name().strip() for name in allnames])
-            for surname in allnames:
-                surnames[surname] += 1
-                representative_handle[surname] = person.handle
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        total_people = cnt
-        surname_sort = []
-        total = 0
-
-        cnt = 0
-        for surname in surnames:
-            surname_sort.append((surnames[surname], surname))
-            total += surnames[surname]
-            cnt += 1
-            if not cnt % _YIELD_INTERVAL:
-                yield True
-
-        total_surnames = cnt
-        surname_sort.sort(reverse=True)
-        line = 0
-        ### All done!
+        surnames = self.dbstate.db.surname_frequency()
+        total_people = self.dbstate.db.get_number_of_people()
+        total = sum(surnames.values())
+        surname_sort = sorted(
+            ((count, surname) for surname, count in surnames.items()), reverse=True
+        )
         self.set_text("")
         nosurname = config.get("preferences.no-surname-text")
-        for count, surname in surname_sort:
+        for line, (count, surname) in enumerate(surname_sort[: self.top_size]):
             text = "%s, " % (surname if surname else nosurname)
             text += "%d%% (%d)\n" % (int((float(count) / total) * 100), count)
             self.append_text(" %d. " % (line + 1))
-            self.link(text, "Surname", representative_handle[surname])
-            line += 1
-            if line >= self.top_size:
-                break
+            if surname:
+                self.link(text, "Surname", surname)
+            else:
+                self.append_text(text)
         self.append_text(
-            ("\n" + _("Total unique surnames") + ": %d\n") % total_surnames
+            ("\n" + _("Total unique surnames") + ": %d\n") % len(surname_sort)
         )
         self.append_text((_("Total people") + ": %d") % total_people, "begin")
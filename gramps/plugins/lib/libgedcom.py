@@ -2054,41 +2054,6 @@ class PlaceParser:
             return location
 
 
-# -------------------------------------------------------------------------
-#
-# IdFinder
-#
-# -------------------------------------------------------------------------
-class IdFinder:
-    """
-    Provide method of finding the next available ID.
-    """
-
-    def __init__(self, keys, prefix):
-        """
-        Initialize the object.
-        """
-        self.ids = set(keys)
-        self.index = 0
-        self.prefix = prefix
-
-    def find_next(self):
-        """
-        Return the next available GRAMPS' ID for a Event object based
-        off the person ID prefix.
-
-        @return: Returns the next available index
-        @rtype: str
-        """
-        index = self.prefix % self.index
-        while index in self.ids:
-            self.index += 1
-            index = self.prefix % self.index
-        self.ids.add(index)
-        self.index += 1
-        return index
-
-
 # -------------------------------------------------------------------------
 #
 # IdMapper
@@ -2103,13 +2068,14 @@ class IdMapper:
         self.find_next = find_next
         self.id2user_format = id2user_format
         self.swap = {}
+        self.swap_values = set()
 
     def __getitem__(self, gid):
         if gid == "":
             # We need to find the next gramps ID provided it is not already
             # the target of a swap
             new_val = self.find_next()
-            while new_val in list(self.swap.values()):
+            while new_val in self.swap_values:
                 new_val = self.find_next()
         else:
             # remove any @ signs
@@ -2124,17 +2090,16 @@ class IdMapper:
                 # have found it. If we had already encountered I0001 and we are
                 # now looking for I1, it wouldn't be in self.swap, and we now
                 # find that I0001 is in use, so we have to create a new id.
-                if self.has_gid(formatted_gid) or (
-                    formatted_gid in list(self.swap.values())
-                ):
+                if self.has_gid(formatted_gid) or (formatted_gid in self.swap_values):
                     new_val = self.find_next()
-                    while new_val in list(self.swap.values()):
+                    while new_val in self.swap_values:
                         new_val = self.find_next()
                 else:
                     new_val = formatted_gid
             # we need to distinguish between I1 and I0001, so we record the map
             # from the original format
             self.swap[gid] = new_val
+            self.swap_values.add(new_val)
         return new_val
 
     def clean(self, gid):
@@ -2234,10 +2199,6 @@ class GedcomParser(UpdateCallback):
         self.maxpeople = stage_one.get_person_count()
         self.dbase = dbase
         self.import_researcher = self.dbase.get_total() == 0
-        event_ids = []
-        for event in dbase.iter_events():
-            event_ids.append(event.gramps_id)
-        self.emapper = IdFinder(event_ids, dbase.event_prefix)
         self.famc_map = stage_one.get_famc_map()
         self.fams_map = stage_one.get_fams_map()
 
@@ -4389,7 +4350,7 @@ class GedcomParser(UpdateCallback):
         """
 
         event = line.data
-        event.set_gramps_id(self.emapper.find_next())
+        event.set_gramps_id(self.dbase.find_next_event_gramps_id())
         event_ref = EventRef()
         self.dbase.add_event(event, self.trans)
 
@@ -4639,7 +4600,7 @@ class GedcomParser(UpdateCallback):
         """
         event = Event()
         event_ref = EventRef()
-        event.set_gramps_id(self.emapper.find_next())
+        event.set_gramps_id(self.dbase.find_next_event_gramps_id())
         event.set_type(EventType.NOB_TITLE)
         event.set_description(line.data)
 
@@ -5518,7 +5479,7 @@ class GedcomParser(UpdateCallback):
         @type state: CurrentState
         """
         event = line.data
-        event.set_gramps_id(self.emapper.find_next())
+        event.set_gramps_id(self.dbase.find_next_event_gramps_id())
         event_ref = EventRef()
         event_ref.set_role(EventRoleType.FAMILY)
         self.dbase.add_event(event, self.trans)
@@ -5573,7 +5534,7 @@ class GedcomParser(UpdateCallback):
         event = Event()
         event_ref = EventRef()
         event_ref.set_role(EventRoleType.FAMILY)
-        event.set_gramps_id(self.emapper.find_next())
+        event.set_gramps_id(self.dbase.find_next_event_gramps_id())
         event.set_type(cust_type)
         # in case a description ever shows up
         if line.data and line.data != "Y":
@@ -8353,7 +8314,7 @@ class GedcomParser(UpdateCallback):
         """
         event = Event()
         event_ref = EventRef()
-        event.set_gramps_id(self.emapper.find_next())
+        event.set_gramps_id(self.dbase.find_next_event_gramps_id())
         event.set_type(event_type)
 
         if description and description != "Y":
@@ -8387,7 +8348,7 @@ class GedcomParser(UpdateCallback):
     def __build_family_event_pair(self, state, event_type, event_map, description):
         event = Event()
         event_ref = EventRef()
-        event.set_gramps_id(self.emapper.find_next())
+        event.set_gramps_id(self.dbase.find_next_event_gramps_id())
         event.set_type(event_type)
         if description and description != "Y":
             event.set_description(description)
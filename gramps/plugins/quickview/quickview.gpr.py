@@ -297,6 +297,21 @@ register(
     runfunc="run",
 )
 
+register(
+    QUICKREPORT,
+    id="samesurnames_misc",
+    name=_("Same Surnames - stand-alone"),
+    description=_("Display people with the same surname as a person."),
+    version="1.0",
+    gramps_target_version=MODULE_VERSION,
+    status=STABLE,
+    fname="samesurnames.py",
+    authors=["Douglas Blank"],
+    authors_email=["doug.blank@gmail.com"],
+    category=CATEGORY_QR_MISC,
+    runfunc="run",
+)
+
 register(
     QUICKREPORT,
     id="samegivens",
@@ -123,13 +123,14 @@ class ChangeTypes(tool.BatchTool, ManagedWindow):
             with self.user.progress(
                 _("Analyzing Events"), "", self.db.get_number_of_events()
             ) as step:
-                for event_handle in self.db.get_event_handles():
-                    event = self.db.get_event_from_handle(event_handle)
+                changed = []
+                for event in self.db.iter_events():
                     if event.get_type().xml_str() == fromtype:
                         event.type.set_from_xml_str(totype)
                         modified += 1
-                        self.db.commit_event(event, self.trans)
+                        changed.append(event)
                         step()
+                self.db.commit_many(changed, self.trans)
         self.db.enable_signals()
         self.db.request_rebuild()
 
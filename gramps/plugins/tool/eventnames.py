@@ -80,34 +80,39 @@ class EventNames(tool.BatchTool):
         """
         with DbTxn(_("Event name changes"), self.db, batch=True) as trans:
             self.db.disable_signals()
-            self.change = False
-            counter = 0
 
+            # Events are committed in bulk at the end, so keep the ones
+            # already named to avoid naming an event twice.
+            changed = {}
             with self.user.progress(_("Extract Event Description"), "", 2) as step:
                 for person in self.db.iter_people():
                     for event_ref in person.get_event_ref_list():
                         if event_ref.get_role() == EventRoleType.PRIMARY:
                             event_handle = event_ref.ref
+                            if event_handle in changed:
+                                continue
                             event = self.db.get_event_from_handle(event_handle)
                             if event.get_description() == "":
                                 person_event_name(event, person)
-                                self.db.commit_event(event, trans)
-                                self.change = True
-                                counter += 1
+                                changed[event_handle] = event
                 step()
 
                 for family in self.db.iter_families():
                     for event_ref in family.get_event_ref_list():
                         if event_ref.get_role() == EventRoleType.FAMILY:
                             event_handle = event_ref.ref
+                            if event_handle in changed:
+                                continue
                             event = self.db.get_event_from_handle(event_handle)
                             if event.get_description() == "":
                                 family_event_name(event, family, self.db)
-                                self.db.commit_event(event, trans)
-                                self.change = True
-                                counter += 1
+                                changed[event_handle] = event
                 step()
 
+            self.db.commit_many(changed.values(), trans)
+            counter = len(changed)
+            self.change = counter > 0
+
         self.db.enable_signals()
         self.db.request_rebuild()
 
@@ -317,9 +317,8 @@ class RemoveUnused(tool.Tool, ManagedWindow, UpdateCallback):
 
             with cursor_func() as cursor:
                 self.set_total(total_func())
-                fbh = db.find_backlink_handles
                 for handle, data in cursor:
-                    if not any(h for h in fbh(handle)):
+                    if not db.count_backlinks(handle):
                         if handle not in todo_list and handle not in link_list:
                             self.add_results((the_type, handle, data))
                     self.update()
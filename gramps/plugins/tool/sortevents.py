@@ -122,19 +122,23 @@ class SortEvents(PluginWindows.ToolManagedWindowBatch):
             _("Sorting personal events..."), self.db.get_number_of_people()
         )
         family_handles = []
-        for handle in people_handles:
-            person = self.db.get_person_from_handle(handle)
-            self.progress.step()
-            event_ref_list = person.get_event_ref_list()
-            event_ref_list.sort(key=lambda x: self.sort_func(x.ref))
-            if self.sort_desc:
-                event_ref_list.reverse()
-            if self.fam_events:
-                family_handles.extend(person.get_family_handle_list())
-            person.set_event_ref_list(event_ref_list)
-            self.db.set_birth_death_index(person)
-            self.db.commit_person(person, trans)
-            self.change = True
+
+        def sorted_people():
+            for handle in people_handles:
+                person = self.db.get_person_from_handle(handle)
+                self.progress.step()
+                event_ref_list = person.get_event_ref_list()
+                event_ref_list.sort(key=lambda x: self.sort_func(x.ref))
+                if self.sort_desc:
+                    event_ref_list.reverse()
+                if self.fam_events:
+                    family_handles.extend(person.get_family_handle_list())
+                person.set_event_ref_list(event_ref_list)
+                self.db.set_birth_death_index(person)
+                self.change = True
+                yield person
+
+        self.db.commit_many(sorted_people(), trans)
         return family_handles
 
     def sort_family_events(self, family_handles, trans):
@@ -142,16 +146,20 @@ class SortEvents(PluginWindows.ToolManagedWindowBatch):
         Sort the family events associated with the selected people.
         """
         self.progress.set_pass(_("Sorting family events..."), len(family_handles))
-        for handle in family_handles:
-            family = self.db.get_family_from_handle(handle)
-            self.progress.step()
-            event_ref_list = family.get_event_ref_list()
-            event_ref_list.sort(key=lambda x: self.sort_func(x.ref))
-            if self.sort_desc:
-                event_ref_list.reverse()
-            family.set_event_ref_list(event_ref_list)
-            self.db.commit_family(family, trans)
-            self.change = True
+
+        def sorted_families():
+            for handle in family_handles:
+                family = self.db.get_family_from_handle(handle)
+                self.progress.step()
+                event_ref_list = family.get_event_ref_list()
+                event_ref_list.sort(key=lambda x: self.sort_func(x.ref))
+                if self.sort_desc:
+                    event_ref_list.reverse()
+                family.set_event_ref_list(event_ref_list)
+                self.change = True
+                yield family
+
+        self.db.commit_many(sorted_families(), trans)
 
 
 # ------------------------------------------------------------------------
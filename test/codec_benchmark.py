@@ -0,0 +1,97 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# test/codec_benchmark.py
+
+"""
+Compare the size and the encode/decode speed of the database codec with
+pickle, using the serialized objects of the example tree.  Run from the
+root directory with:
+
+python3 test/codec_benchmark.py [example/gramps/example.gramps]
+"""
+import pickle
+import sys
+import time
+
+from gramps.gen.db.codec import encode, decode
+from gramps.gen.db.utils import import_as_dict
+from gramps.gen.user import User
+
+REPEAT = 5
+CLASSES = (
+    "Person",
+    "Family",
+    "Event",
+    "Place",
+    "Repository",
+    "Source",
+    "Citation",
+    "Media",
+    "Note",
+    "Tag",
+)
+
+
+def best_time(func, items):
+    """
+    Return the best time of REPEAT runs of func over all items.
+    """
+    best = None
+    for dummy in range(REPEAT):
+        start = time.perf_counter()
+        for item in items:
+            func(item)
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main(filename):
+    db = import_as_dict(filename, User())
+    rows = []
+    for obj_class in CLASSES:
+        for handle in db.method("get_%s_handles", obj_class)():
+            obj = db.method("get_%s_from_handle", obj_class)(handle)
+            rows.append(obj.serialize())
+
+    pickled = [pickle.dumps(data) for data in rows]
+    encoded = [encode(data) for data in rows]
+
+    print("%d objects from %s" % (len(rows), filename))
+    print("%-8s %12s %12s %12s" % ("", "bytes", "encode (s)", "decode (s)"))
+    for name, blobs, dumps, loads in (
+        ("pickle", pickled, pickle.dumps, pickle.loads),
+        ("codec", encoded, encode, decode),
+    ):
+        print(
+            "%-8s %12d %12.4f %12.4f"
+            % (
+                name,
+                sum(len(blob) for blob in blobs),
+                best_time(dumps, rows),
+                best_time(loads, blobs),
+            )
+        )
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "example/gramps/example.gramps")
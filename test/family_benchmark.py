@@ -0,0 +1,169 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# test/family_benchmark.py
+
+"""
+Time the sorted family list, the HasRelationship rule and the families of
+a sample of parents, with and without the indexes on the parents of the
+families, on a generated tree of two parents and a child per family.
+Run from the root directory with:
+
+python3 test/family_benchmark.py [FAMILIES]
+"""
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from gramps.gen.db import DbTxn
+from gramps.gen.db.utils import make_database
+from gramps.gen.filters import GenericFilterFactory
+from gramps.gen.filters.rules.person import HasRelationship
+from gramps.gen.lib import ChildRef, Family, Person, Surname
+from gramps.gen.utils.id import create_id
+
+PARENT_INDEXES = (
+    ("family_father_handle", "family(father_handle)"),
+    ("family_mother_handle", "family(mother_handle)"),
+)
+SAMPLE = 1000
+SURNAMES = ["Garner", "Zieliński", "Ödegaard", "Martel", "Cruz", "Lefebvre"]
+
+
+def make_person(rand, gender):
+    """
+    Return a new person with a random surname.
+    """
+    person = Person()
+    person.set_handle(create_id())
+    person.set_gender(gender)
+    surname = Surname()
+    surname.set_surname("%s %d" % (rand.choice(SURNAMES), rand.randrange(1000)))
+    person.primary_name.add_surname(surname)
+    person.primary_name.set_first_name("Given %d" % rand.randrange(1000))
+    return person
+
+
+def make_tree(db, number):
+    """
+    Add families of a father, a mother and a child to the database, and
+    return the handles of the fathers.
+    """
+    rand = random.Random(0)
+    people = []
+    families = []
+    for dummy in range(number):
+        father = make_person(rand, Person.MALE)
+        mother = make_person(rand, Person.FEMALE)
+        child = make_person(rand, Person.UNKNOWN)
+        family = Family()
+        family.set_handle(create_id())
+        family.set_father_handle(father.handle)
+        family.set_mother_handle(mother.handle)
+        child_ref = ChildRef()
+        child_ref.ref = child.handle
+        family.add_child_ref(child_ref)
+        father.add_family_handle(family.handle)
+        mother.add_family_handle(family.handle)
+        child.add_parent_family_handle(family.handle)
+        people += [father, mother, child]
+        families.append(family)
+    with DbTxn("Generate tree", db, batch=True) as trans:
+        db.commit_many(people, trans)
+        db.commit_many(families, trans)
+    return [family.get_father_handle() for family in families]
+
+
+def elapsed(func, *args):
+    """
+    Return the time a call takes.
+    """
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def families_of_parents(db, handles):
+    """
+    Look up the families of each of the parents.
+    """
+    for handle in handles:
+        db.get_families_of_parent(handle)
+
+
+def has_relationship(db):
+    """
+    Apply a filter of the people with a spouse and a child.
+    """
+    person_filter = GenericFilterFactory("Person")()
+    person_filter.add_rule(HasRelationship(["1", "", "1"]))
+    person_filter.apply(db)
+
+
+def run(db, fathers):
+    """
+    Return the times of the tasks.
+    """
+    return [
+        elapsed(db.get_family_handles, True),
+        elapsed(has_relationship, db),
+        elapsed(families_of_parents, db, fathers),
+    ]
+
+
+def main(number):
+    dirname = tempfile.mkdtemp()
+    try:
+        db = make_database("sqlite")
+        db.load(dirname)
+        start = time.perf_counter()
+        fathers = make_tree(db, number)
+        print("%d families generated in %.1f s" % (number, time.perf_counter() - start))
+        fathers = random.Random(1).sample(fathers, min(SAMPLE, number))
+
+        db._txn_begin()
+        db._drop_indexes(PARENT_INDEXES)
+        db._txn_commit()
+        without_index = run(db, fathers)
+        db._txn_begin()
+        db._create_indexes(PARENT_INDEXES)
+        db._txn_commit()
+        with_index = run(db, fathers)
+
+        print("%-28s %12s %12s" % ("time (s)", "no index", "index"))
+        for name, before, after in zip(
+            (
+                "sorted families",
+                "HasRelationship",
+                "families of %d parents" % len(fathers),
+            ),
+            without_index,
+            with_index,
+        ):
+            print("%-28s %12.4f %12.4f" % (name, before, after))
+        db.close()
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200000)
@@ -0,0 +1,105 @@
+#
+# Gramps - a GTK+/GNOME based genealogy program
+#
+# Copyright (C) 2024       Gramps Development Team
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 2 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA 02110-1301 USA.
+#
+
+# test/load_benchmark.py
+
+"""
+Compare the time a command line report takes on a family tree opened as
+usual and on a read-only copy of it in memory, opened with --in-memory.
+The tree is imported from a Gramps XML file into a temporary directory.
+Run from the root directory with:
+
+python3 test/load_benchmark.py [example/gramps/example.gramps [REPORT]]
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from gramps.cli.clidbman import NAME_FILE
+from gramps.gen.db.dbconst import DBBACKEND
+from gramps.gen.db.utils import make_database
+from gramps.gen.user import User
+from gramps.plugins.importer.importxml import importData
+
+REPEAT = 3
+
+
+def make_tree(filename, dirname):
+    """
+    Import a Gramps XML file into a new SQLite family tree.
+    """
+    with open(os.path.join(dirname, DBBACKEND), "w") as backend_file:
+        backend_file.write("sqlite")
+    with open(os.path.join(dirname, NAME_FILE), "w") as name_file:
+        name_file.write("Benchmark")
+    db = make_database("sqlite")
+    db.load(dirname)
+    importData(db, filename, User())
+    db.close()
+
+
+def best_time(args):
+    """
+    Return the best time of REPEAT runs of Gramps with the arguments.
+    """
+    best = None
+    for dummy in range(REPEAT):
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "gramps", "-q"] + args,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=True,
+        )
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def main(filename, report):
+    dirname = tempfile.mkdtemp()
+    try:
+        make_tree(filename, dirname)
+        output = os.path.join(dirname, "report.txt")
+        args = [
+            "-O",
+            dirname,
+            "-a",
+            "report",
+            "-p",
+            "name=%s,off=txt,of=%s" % (report, output),
+        ]
+        print("Report %s on %s" % (report, filename))
+        print("%-10s %12s" % ("", "time (s)"))
+        print("%-10s %12.4f" % ("on disk", best_time(args)))
+        print("%-10s %12.4f" % ("in memory", best_time(["--in-memory"] + args)))
+    finally:
+        shutil.rmtree(dirname)
+
+
+if __name__ == "__main__":
+    main(
+        sys.argv[1] if len(sys.argv) > 1 else "example/gramps/example.gramps",
+        sys.argv[2] if len(sys.argv) > 2 else "records",
+    )